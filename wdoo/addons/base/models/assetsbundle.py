@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from subprocess import Popen, PIPE
 import base64
@@ -6,9 +7,11 @@ import hashlib
 import itertools
 import json
 import logging
+import multiprocessing
 import os
 import re
 import textwrap
+import threading
 import uuid
 
 import psycopg2
@@ -23,12 +26,75 @@ from wdoo import SUPERUSER_ID
 from wdoo.http import request
 from wdoo.modules.module import get_resource_path
 from wdoo.tools import func, misc, transpile_javascript, is_wdoo_module, SourceMapGenerator, profiler
+from wdoo.tools.lru import LRU
 from wdoo.tools.misc import html_escape as escape
 from wdoo.tools.pycompat import to_text
 
 _logger = logging.getLogger(__name__)
 
 
+# Cache of compilation results (transpiled and minified javascript, compiled
+# and rtl-converted stylesheets) keyed by a hash of their input, so that a
+# change in one file of a bundle only recompiles that file. The cache is local
+# to the process: it is not shared between the workers of a multi-process
+# server, and is lost when the process restarts. It only saves the compilation
+# of the files that did not change when a process rebuilds a bundle, and the
+# generated bundles themselves remain stored as attachments.
+_compilation_cache = LRU(4096)
+
+# Minimum number of javascript files to compile before using a process pool,
+# below that the cost of forking is higher than the gain.
+PARALLEL_COMPILATION_THRESHOLD = 20
+
+
+def content_hash(*parts):
+    """ Return a hash of the given strings, used as compilation cache key. """
+    return hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def files_signature(paths):
+    """ Return a hash of the names and modification times of the files in the
+    given directories, used in the compilation cache key of the stylesheets
+    that import them.
+    """
+    parts = []
+    for path in filter(None, paths):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                filename = os.path.join(root, name)
+                try:
+                    parts.append('%s:%s' % (filename, os.path.getmtime(filename)))
+                except OSError:
+                    pass
+    return content_hash(*parts)
+
+
+def compile_javascript(url, content, transpile):
+    """ Transpile (if needed) and minify a javascript file.
+
+    This function is module-level so it can be sent to a worker process.
+
+    :returns: (transpiled content, minified content)
+    """
+    if transpile:
+        content = transpile_javascript(url, content)
+    return content, rjsmin(content)
+
+
+def _compilation_workers(count):
+    """ Return the number of worker processes to use for ``count`` compilations.
+    Only a single-threaded process is forked, as the children of a process
+    running other threads (e.g. the threaded HTTP server) may deadlock on the
+    locks held by those threads.
+    """
+    if os.name != 'posix' or count < PARALLEL_COMPILATION_THRESHOLD:
+        return 0
+    if threading.active_count() > 1:
+        return 0
+    return min(os.cpu_count() or 1, 8)
+
+
 class CompileError(RuntimeError): pass
 def rjsmin(script):
     """ Minify js with a clever regex.
@@ -359,6 +425,41 @@ class AssetsBundle(object):
 
         return attachments[0]
 
+    def precompile_javascripts(self):
+        """ Transpile and minify the javascript files of the bundle that are
+        not in the compilation cache yet, in a pool of processes when there
+        are enough of them and the current process is single-threaded. The
+        results are stored in the compilation cache, where
+        :meth:`JavascriptAsset.content` and :meth:`JavascriptAsset.minify` pick
+        them up.
+
+        This is meant for the ahead-of-time generation of bundles (see the
+        ``assets`` command): the bundles generated on demand compile their
+        files one by one in the current process.
+        """
+        todo = {}
+        for asset in self.javascripts:
+            raw = WebAsset.content.fget(asset)
+            key = asset.compilation_key(raw)
+            cached = _compilation_cache.get(key)
+            if (cached is None or cached[1] is None) and key not in todo:
+                todo[key] = (asset.url, raw, asset.is_transpiled)
+        if not todo:
+            return
+
+        workers = _compilation_workers(len(todo))
+        if workers:
+            _logger.info("Compiling %d javascript files of bundle %s with %d processes", len(todo), self.name, workers)
+            # fork the current process, the workers only need pure functions
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                results = executor.map(compile_javascript, *zip(*todo.values()), chunksize=8)
+                for key, result in zip(todo, results):
+                    _compilation_cache[key] = result
+        else:
+            for key, args in todo.items():
+                _compilation_cache[key] = compile_javascript(*args)
+
     def js_with_sourcemap(self):
         """Create the ir.attachment representing the not-minified content of the bundleJS
         and create/modify the ir.attachment representing the linked sourcemap.
@@ -622,6 +723,20 @@ class AssetsBundle(object):
             return ''
         source = re.sub(self.rx_preprocess_imports, sanitize, source)
 
+        # the asset ids embedded in the source are random, they must not be
+        # part of the cache key; they are substituted back after compilation.
+        # The files of the include paths (e.g. bootstrap) are part of the key,
+        # so that modifying them invalidates the cache.
+        ids = self.rx_css_split.findall(source)
+        asset = compiler.__self__
+        key = ('css', type(asset).__name__, files_signature(asset.include_paths),
+               content_hash(self.rx_css_split.sub('/*! */', source)))
+        cached = _compilation_cache.get(key)
+        if cached is not None:
+            placeholders, compiled = cached
+            if len(placeholders) == len(ids):
+                return self.rx_css_split.sub(lambda m, it=iter(ids): '/*! %s */' % next(it), compiled)
+
         compiled = ''
         try:
             compiled = compiler(source)
@@ -641,9 +756,20 @@ class AssetsBundle(object):
         compiled = re.sub(r'(flex-wrap: (\w+);)', r'-webkit-flex-wrap: \2; \1', compiled)
         compiled = re.sub(r'(flex: ((\d)+ \d+ (?:\d+|auto));)', r'-webkit-box-flex: \3; -webkit-flex: \2; \1', compiled)
 
+        if self.rx_css_split.findall(compiled) == ids:
+            _compilation_cache[key] = (ids, compiled)
         return compiled
 
     def run_rtlcss(self, source):
+        key = ('rtlcss', content_hash(source))
+        result = _compilation_cache.get(key)
+        if result is None:
+            result = self._run_rtlcss(source)
+            if not self.css_errors:
+                _compilation_cache[key] = result
+        return result
+
+    def _run_rtlcss(self, source):
         rtlcss = 'rtlcss'
         if os.name == 'nt':
             try:
@@ -797,17 +923,39 @@ class JavascriptAsset(WebAsset):
         self.is_transpiled = is_wdoo_module(super().content)
         self._converted_content = None
 
+    def compilation_key(self, content):
+        """ Return the compilation cache key of the asset for its given raw content. """
+        return ('js', self.url or '', self.is_transpiled, content_hash(content))
+
+    def _compiled(self, minify=True):
+        """ Return the (transpiled, minified) contents of the asset. The
+        minified content is only computed if ``minify`` is set, and is
+        ``None`` otherwise if it has not been computed before.
+        """
+        content = super().content
+        key = self.compilation_key(content)
+        result = _compilation_cache.get(key)
+        if result is None:
+            if minify:
+                result = compile_javascript(self.url, content, self.is_transpiled)
+            else:
+                transpiled = transpile_javascript(self.url, content) if self.is_transpiled else content
+                result = (transpiled, None)
+            _compilation_cache[key] = result
+        elif minify and result[1] is None:
+            result = _compilation_cache[key] = (result[0], rjsmin(result[0]))
+        return result
+
     @property
     def content(self):
-        content = super().content
         if self.is_transpiled:
             if not self._converted_content:
-                self._converted_content = transpile_javascript(self.url, content)
+                self._converted_content = self._compiled(minify=False)[0]
             return self._converted_content
-        return content
+        return super().content
 
     def minify(self):
-        return self.with_header(rjsmin(self.content))
+        return self.with_header(self._compiled()[1])
 
     def _fetch_content(self):
         try:
@@ -941,6 +1089,8 @@ class StylesheetAsset(WebAsset):
 
 class PreprocessedCSS(StylesheetAsset):
     rx_import = None
+    # directories where the compiler looks up the imported files
+    include_paths = ()
 
     def __init__(self, *args, **kw):
         super(PreprocessedCSS, self).__init__(*args, **kw)
@@ -1007,6 +1157,10 @@ class ScssStylesheetAsset(PreprocessedCSS):
     def bootstrap_path(self):
         return get_resource_path('web', 'static', 'lib', 'bootstrap', 'scss')
 
+    @property
+    def include_paths(self):
+        return [self.bootstrap_path]
+
     precision = 8
     output_style = 'expanded'
 
@@ -1018,9 +1172,7 @@ class ScssStylesheetAsset(PreprocessedCSS):
             profiler.force_hook()
             return libsass.compile(
                 string=source,
-                include_paths=[
-                    self.bootstrap_path,
-                ],
+                include_paths=self.include_paths,
                 output_style=self.output_style,
                 precision=self.precision,
             )
@@ -1036,6 +1188,10 @@ class ScssStylesheetAsset(PreprocessedCSS):
 
 
 class LessStylesheetAsset(PreprocessedCSS):
+    @property
+    def include_paths(self):
+        return [get_resource_path('web', 'static', 'lib', 'bootstrap', 'less')]
+
     def get_command(self):
         try:
             if os.name == 'nt':
@@ -1044,5 +1200,4 @@ class LessStylesheetAsset(PreprocessedCSS):
                 lessc = misc.find_in_path('lessc')
         except IOError:
             lessc = 'lessc'
-        lesspath = get_resource_path('web', 'static', 'lib', 'bootstrap', 'less')
-        return [lessc, '-', '--no-js', '--no-color', '--include-path=%s' % lesspath]
+        return [lessc, '-', '--no-js', '--no-color', '--include-path=%s' % self.include_paths[0]]
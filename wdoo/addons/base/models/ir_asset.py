@@ -13,6 +13,7 @@ from wdoo import tools
 from wdoo.addons import __path__ as ADDONS_PATH
 from wdoo import api, fields, http, models
 from wdoo.http import root
+from wdoo.modules.module import addon_files_index
 
 _logger = getLogger(__name__)
 
@@ -120,9 +121,28 @@ class IrAsset(models.Model):
         if addons is None:
             addons = self._get_active_addons_list()
 
+        return list(self._get_asset_paths_cache(
+            bundle, tuple(addons), frozenset(installed), css, js, xml, addon_files_index.generation,
+        ))
+
+    @tools.conditional(
+        # in xml dev mode, files added to the addons must be picked up without restart
+        'xml' not in tools.config['dev_mode'],
+        tools.ormcache('bundle', 'addons', 'installed', 'css', 'js', 'xml', 'generation'),
+    )
+    def _get_asset_paths_cache(self, bundle, addons, installed, css, js, xml, generation=0):
+        """ Memoized resolution of the paths of a bundle, see `_get_asset_paths`.
+        The cache is cleared when 'ir.asset' records are modified and when
+        the registry changes (module installation). The ``generation`` of the
+        addon files index is part of the key, so that the paths are resolved
+        again when a file system watcher reports a change in the addons
+        (``--dev=reload``).
+
+        :returns: tuple of (path, addon, bundle)
+        """
         asset_paths = AssetPaths()
-        self._fill_asset_paths(bundle, addons, installed, css, js, xml, asset_paths, [])
-        return asset_paths.list
+        self._fill_asset_paths(bundle, list(addons), installed, css, js, xml, asset_paths, [])
+        return tuple(asset_paths.list)
 
     def _fill_asset_paths(self, bundle, addons, installed, css, js, xml, asset_paths, seen):
         """
@@ -339,6 +359,8 @@ class IrAsset(models.Model):
             if addon not in full_path or addons_path not in full_path:
                 addon = None
                 safe_path = False
+            elif addon_files_index.enabled:
+                paths = addon_files_index.glob(os.path.join(addons_path, addon), full_path)
             else:
                 paths = [
                     path for path in sorted(glob(full_path, recursive=True))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Part of wdoo. See LICENSE file for full copyright and licensing details.
 
+import collections
 import functools
 import itertools
 
@@ -11,6 +12,9 @@ from wdoo import api, Command, fields, models, _
 from wdoo.tools import ustr
 
 REFERENCING_FIELDS = {None, 'id', '.id'}
+# types of fields whose conversion only depends on the value: the values
+# repeated in a column are converted once
+MEMOIZED_TYPES = {'boolean', 'integer', 'float', 'monetary', 'selection', 'date', 'datetime'}
 def only_ref_fields(record):
     return {k: v for k, v in record.items() if k in REFERENCING_FIELDS}
 def exclude_ref_fields(record):
@@ -94,6 +98,12 @@ class IrFieldsConverter(models.AbstractModel):
             name: self.to_field(model, field, fromtype)
             for name, field in model._fields.items()
         }
+        memoized = {
+            name for name, field in model._fields.items()
+            if field.type in MEMOIZED_TYPES
+        }
+        # {(field, value): converted value} for the conversions without warnings
+        memo = {}
 
         def fn(record, log):
             converted = {}
@@ -104,8 +114,13 @@ class IrFieldsConverter(models.AbstractModel):
                 if not value:
                     converted[field] = False
                     continue
+                if field in memoized and (field, value) in memo:
+                    converted[field] = memo[field, value]
+                    continue
                 try:
                     converted[field], ws = converters[field](value)
+                    if field in memoized and not ws:
+                        memo[field, value] = converted[field]
                     for w in ws:
                         if isinstance(w, str):
                             # wrap warning string in an ImportWarning for
@@ -379,7 +394,9 @@ class IrFieldsConverter(models.AbstractModel):
             try: tentative_id = int(value)
             except ValueError: tentative_id = value
             try:
-                if RelatedModel.search([('id', '=', tentative_id)]):
+                if (RelatedModel._name, tentative_id) in self._context.get('import_cache', {}):
+                    id = tentative_id
+                elif RelatedModel.search([('id', '=', tentative_id)]):
                     id = tentative_id
             except psycopg2.DataError:
                 # type error
@@ -403,7 +420,13 @@ class IrFieldsConverter(models.AbstractModel):
             if value == '':
                 return False, field_type, warnings
             flush(model=field.comodel_name)
-            ids = RelatedModel.name_search(name=value, operator='=')
+            # the results are reset by flush() when it loads records
+            name_cache = self._context.get('import_name_cache', {})
+            key = (RelatedModel._name, value)
+            if key in name_cache:
+                ids = name_cache[key]
+            else:
+                ids = name_cache[key] = RelatedModel.name_search(name=value, operator='=')
             if ids:
                 if len(ids) > 1:
                     warnings.append(ImportWarning(
@@ -415,6 +438,7 @@ class IrFieldsConverter(models.AbstractModel):
                 if name_create_enabled_fields.get(field.name):
                     try:
                         id, _name = RelatedModel.name_create(name=value)
+                        name_cache[key] = [(id, _name)]
                     except (Exception, psycopg2.IntegrityError):
                         error_msg = _(u"Cannot create new '%s' records from their name alone. Please create those records manually and try importing again.", RelatedModel._description)
         else:
@@ -451,6 +475,65 @@ class IrFieldsConverter(models.AbstractModel):
                 error_info_dict)
         return id, field_type, warnings
 
+    @api.model
+    def _prefetch_references(self, model, fields, data):
+        """ Resolve the external ids and the database ids referenced by the
+        many2one and many2many columns of ``data``, with one query per column.
+
+        :param fields: list of field paths, as in :meth:`~.BaseModel.load`
+        :returns: a dict to use as ``import_cache``, mapping the external
+            ids to ``(res_model, res_id)``, and the pairs ``(res_model, id)``
+            of the existing database ids to themselves
+        """
+        result = {}
+        current_module = self._context.get('_import_current_module', '')
+        for index, path in enumerate(fields):
+            if len(path) != 2 or path[1] not in ('id', '.id'):
+                continue
+            field = model._fields.get(path[0])
+            if field is None or field.type not in ('many2one', 'many2many'):
+                continue
+            comodel = self.env[field.comodel_name]
+
+            refs = set()
+            for row in data:
+                if row[index]:
+                    refs.update(row[index].split(',') if field.type == 'many2many' else [row[index]])
+
+            if path[1] == 'id':
+                xmlids = {ref if '.' in ref else "%s.%s" % (current_module, ref) for ref in refs}
+                result.update(self._lookup_import_xmlids(xmlids, comodel))
+            else:
+                ids = {int(ref) for ref in refs if ref.isdigit()}
+                for sub_ids in self._cr.split_for_in_conditions(ids):
+                    result.update(
+                        ((comodel._name, id_), (comodel._name, id_))
+                        for id_ in comodel.search([('id', 'in', list(sub_ids))]).ids
+                    )
+        return result
+
+    def _lookup_import_xmlids(self, xmlids, model):
+        """ Return a dict mapping the given external ids of existing records of
+        ``model`` to their ``(res_model, res_id)``. """
+        bymodule = collections.defaultdict(set)
+        for xmlid in xmlids:
+            module, name = xmlid.split('.', 1)
+            bymodule[module].add(name)
+
+        result = {}
+        query = """
+            SELECT d.module, d.name, d.model, d.res_id
+            FROM ir_model_data d
+            JOIN "{}" r ON d.res_id = r.id
+            WHERE d.module = %s AND d.name IN %s
+        """.format(model._table)
+        for module, names in bymodule.items():
+            for sub_names in self._cr.split_for_in_conditions(names):
+                self._cr.execute(query, [module, sub_names])
+                for module_, name, res_model, res_id in self._cr.fetchall():
+                    result["%s.%s" % (module_, name)] = (res_model, res_id)
+        return result
+
     def _xmlid_to_record_id(self, xmlid, model):
         """ Return the record id corresponding to the given external id,
         provided that the record actually exists; otherwise return ``None``.
@@ -459,15 +542,7 @@ class IrFieldsConverter(models.AbstractModel):
         result = import_cache.get(xmlid)
 
         if not result:
-            module, name = xmlid.split('.', 1)
-            query = """
-                SELECT d.model, d.res_id
-                FROM ir_model_data d
-                JOIN "{}" r ON d.res_id = r.id
-                WHERE d.module = %s AND d.name = %s
-            """.format(model._table)
-            self.env.cr.execute(query, [module, name])
-            result = self.env.cr.fetchone()
+            result = self._lookup_import_xmlids([xmlid], model).get(xmlid)
 
         if result:
             res_model, res_id = import_cache[xmlid] = result
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 # Part of wdoo. See LICENSE file for full copyright and licensing details.
+import functools
 import itertools
 import logging
 import re
@@ -1546,11 +1547,17 @@ class IrModelConstraint(models.Model):
             return
         assert type in ('f', 'u')
         cr = self._cr
-        query = """ SELECT c.id, type, definition, message
-                    FROM ir_model_constraint c, ir_module_module m
-                    WHERE c.module=m.id AND c.name=%s AND m.name=%s """
-        cr.execute(query, (conname, module))
-        cons = cr.dictfetchone()
+        existing = cr.cache.get('ir.model.constraint')
+        if existing is not None:
+            # the constraints have been fetched by _reflect_constraints()
+            cons = existing.get((conname, module))
+            cons = dict(cons) if cons else None
+        else:
+            query = """ SELECT c.id, type, definition, message
+                        FROM ir_model_constraint c, ir_module_module m
+                        WHERE c.module=m.id AND c.name=%s AND m.name=%s """
+            cr.execute(query, (conname, module))
+            cons = cr.dictfetchone()
         if not cons:
             query = """ INSERT INTO ir_model_constraint
                             (name, create_date, write_date, create_uid, write_uid, module, model, type, definition, message)
@@ -1564,7 +1571,10 @@ class IrModelConstraint(models.Model):
                         RETURNING id"""
             cr.execute(query,
                 (conname, self.env.uid, self.env.uid, module, model._name, type, definition, message))
-            return self.browse(cr.fetchone()[0])
+            cons_id = cr.fetchone()[0]
+            if existing is not None:
+                existing[(conname, module)] = dict(id=cons_id, type=type, definition=definition, message=message)
+            return self.browse(cons_id)
 
         cons_id = cons.pop('id')
         if cons != dict(type=type, definition=definition, message=message):
@@ -1573,12 +1583,33 @@ class IrModelConstraint(models.Model):
                             write_uid=%s, type=%s, definition=%s, message=%s
                         WHERE id=%s"""
             cr.execute(query, (self.env.uid, type, definition, message, cons_id))
+            if existing is not None:
+                existing[(conname, module)] = dict(id=cons_id, type=type, definition=definition, message=message)
         return self.browse(cons_id)
 
     def _reflect_constraints(self, model_names):
         """ Reflect the SQL constraints of the given models. """
-        for model_name in model_names:
-            self._reflect_model(self.env[model_name])
+        connames = [
+            '%s_%s' % (self.env[model_name]._table, constraint[0])
+            for model_name in model_names
+            for constraint in self.env[model_name]._sql_constraints
+        ]
+        # fetch the existing constraints at once instead of one by one in
+        # _reflect_constraint(); the dict is only valid during the reflection
+        existing = {}
+        for sub_names in self._cr.split_for_in_conditions(connames):
+            self._cr.execute(""" SELECT c.id, c.name, m.name, c.type, c.definition, c.message
+                                FROM ir_model_constraint c, ir_module_module m
+                                WHERE c.module=m.id AND c.name IN %s """, [sub_names])
+            for id_, conname, module, type_, definition, message in self._cr.fetchall():
+                existing[(conname, module)] = dict(id=id_, type=type_, definition=definition, message=message)
+
+        self._cr.cache['ir.model.constraint'] = existing
+        try:
+            for model_name in model_names:
+                self._reflect_model(self.env[model_name])
+        finally:
+            del self._cr.cache['ir.model.constraint']
 
     def _reflect_model(self, model):
         """ Reflect the _sql_constraints of the given model. """
@@ -1913,13 +1944,38 @@ class IrModelData(models.Model):
         return [(xid.id, model_id_name[xid.model][xid.res_id] or xid.complete_name)
                 for xid in self]
 
-    # NEW V8 API
+    @api.model
+    @tools.ormcache('module')
+    def _get_xmlid_map(self, module):
+        """ Return a frozendict mapping the names of the xmlids of ``module``
+        to their ``(id, res_model, res_id)``. The xmlids created after the
+        dict has been loaded are not in it, and are looked up in database.
+        """
+        self.env.cr.execute("SELECT name, id, model, res_id FROM ir_model_data WHERE module=%s", [module])
+        return tools.frozendict(
+            (name, (id_, model, res_id))
+            for name, id_, model, res_id in self.env.cr.fetchall()
+        )
+
+    def _get_cached_xmlid_map(self, module):
+        # the xmlids generated by exports and imports are not cached, as
+        # their number is unbounded; the map of a module whose xmlids have
+        # been written by the current transaction may contain uncommitted
+        # data, which must not be shared with other transactions
+        if module.startswith('__') or module in self._get_written_xmlid_modules():
+            return tools.frozendict()
+        return self._get_xmlid_map(module)
+
     @api.model
     @tools.ormcache('xmlid')
-    def _xmlid_lookup(self, xmlid):
-        """Low level xmlid lookup
-        Return (id, res_model, res_id) or raise ValueError if not found
+    def _get_xmlid_row(self, xmlid):
+        """ Return the ``(id, res_model, res_id)`` of ``xmlid``, for the
+        xmlids that are not in the cached maps. Missing xmlids raise a
+        ValueError, and are therefore not cached.
         """
+        return self._read_xmlid_row(xmlid)
+
+    def _read_xmlid_row(self, xmlid):
         module, name = xmlid.split('.', 1)
         query = "SELECT id, model, res_id FROM ir_model_data WHERE module=%s AND name=%s"
         self.env.cr.execute(query, [module, name])
@@ -1928,6 +1984,64 @@ class IrModelData(models.Model):
             raise ValueError('External ID not found in the system: %s' % xmlid)
         return result
 
+    def _get_written_xmlid_modules(self):
+        """ Return the set of modules whose xmlids have been written by the
+        current transaction. The set is discarded upon commit or rollback.
+        """
+        return self.env.cr.postcommit.data.setdefault('ir.model.data.modules', set())
+
+    def _get_written_xmlids(self):
+        """ Return the set of xmlids written by the current transaction. The
+        set is discarded upon commit or rollback.
+        """
+        return self.env.cr.postcommit.data.setdefault('ir.model.data.xmlids', set())
+
+    def _mark_xmlids_written(self, xmlids):
+        """ Stop using the cached maps of the modules of the given xmlids, and
+        the cached lookups of those xmlids, until the end of the current
+        transaction.
+        """
+        written = self._get_written_xmlids()
+        xmlids = {xmlid for xmlid in xmlids if xmlid not in written}
+        if not xmlids:
+            return
+        modules = self._get_written_xmlid_modules()
+        if not written:
+            # discard the data loaded by other transactions before the commit
+            self.env.cr.postcommit.add(functools.partial(self._discard_cached_xmlids, modules, written))
+        self._discard_cached_xmlids(
+            {xmlid.split('.', 1)[0] for xmlid in xmlids} - modules, xmlids,
+        )
+        written.update(xmlids)
+        modules.update(
+            module for module in (xmlid.split('.', 1)[0] for xmlid in xmlids)
+            if not module.startswith('__')
+        )
+
+    def _discard_cached_xmlids(self, modules, xmlids):
+        """ Remove the maps of the given modules and the lookups of the given
+        xmlids from the registry cache. """
+        for module in modules:
+            self._get_xmlid_map.discard(self, module)
+        for xmlid in xmlids:
+            self._get_xmlid_row.discard(self, xmlid)
+
+    # NEW V8 API
+    @api.model
+    def _xmlid_lookup(self, xmlid):
+        """Low level xmlid lookup
+        Return (id, res_model, res_id) or raise ValueError if not found
+        """
+        module, name = xmlid.split('.', 1)
+        result = self._get_cached_xmlid_map(module).get(name)
+        if result is None:
+            if xmlid in self._get_written_xmlids():
+                return self._read_xmlid_row(xmlid)
+            return self._get_xmlid_row(xmlid)
+        if not result[2]:
+            raise ValueError('External ID not found in the system: %s' % xmlid)
+        return result
+
     @api.model
     def _xmlid_to_res_model_res_id(self, xmlid, raise_if_not_found=False):
         """ Return (res_model, res_id)"""
@@ -1943,6 +2057,31 @@ class IrModelData(models.Model):
         """ Returns res_id """
         return self._xmlid_to_res_model_res_id(xmlid, raise_if_not_found)[1]
 
+    @api.model
+    def _xmlids_to_res_model_res_ids(self, xmlids):
+        """ Return a dict mapping the given xmlids that exist to their
+        ``(res_model, res_id)``, with one query per module. """
+        result = {}
+        missing = defaultdict(set)
+        for xmlid in xmlids:
+            module, name = xmlid.split('.', 1)
+            row = self._get_cached_xmlid_map(module).get(name)
+            if row is None:
+                missing[module].add(name)
+            elif row[2]:
+                result[xmlid] = row[1:3]
+
+        # xmlids that are not in the cached maps
+        cr = self.env.cr
+        query = "SELECT name, model, res_id FROM ir_model_data WHERE module=%s AND name IN %s"
+        for module, names in missing.items():
+            for subnames in cr.split_for_in_conditions(names):
+                cr.execute(query, [module, subnames])
+                for name, model, res_id in cr.fetchall():
+                    if res_id:
+                        result["%s.%s" % (module, name)] = (model, res_id)
+        return result
+
     @api.model
     def check_object_reference(self, module, xml_id, raise_on_access_error=False):
         """Returns (model, res_id) corresponding to a given module and xml_id (cached), if and only if the user has the necessary access rights
@@ -1955,9 +2094,25 @@ class IrModelData(models.Model):
             raise AccessError(_('Not enough access rights on the external ID:') + ' %s.%s' % (module, xml_id))
         return model, False
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Regular create method, but make sure to bypass the xmlid maps. """
+        self._mark_xmlids_written("%s.%s" % (vals.get('module'), vals.get('name')) for vals in vals_list)
+        return super(IrModelData, self).create(vals_list)
+
+    def write(self, values):
+        """ Regular write method, but make sure to clear the caches. """
+        self.clear_caches()
+        self._mark_xmlids_written(self.mapped('complete_name') + [
+            "%s.%s" % (values.get('module', data.module), values.get('name', data.name))
+            for data in self
+        ])
+        return super(IrModelData, self).write(values)
+
     def unlink(self):
         """ Regular unlink method, but make sure to clear the caches. """
         self.clear_caches()
+        self._mark_xmlids_written(self.mapped('complete_name'))
         return super(IrModelData, self).unlink()
 
     def _lookup_xmlids(self, xml_ids, model):
@@ -2004,7 +2159,27 @@ class IrModelData(models.Model):
             noupdate = bool(data.get('noupdate'))
             rows.add((prefix, suffix, record._name, record.id, noupdate))
 
-        for sub_rows in self.env.cr.split_for_in_conditions(rows):
+        # the xmlids that already point to the right record are left as is:
+        # this is the case of most of them when a module is upgraded
+        names_by_module = defaultdict(set)
+        for row in rows:
+            names_by_module[row[0]].add(row[1])
+        existing = set()
+        cr = self.env.cr
+        query = "SELECT module, name, model, res_id FROM ir_model_data WHERE module=%s AND name IN %s"
+        for module, names in names_by_module.items():
+            for subnames in cr.split_for_in_conditions(names):
+                cr.execute(query, [module, subnames])
+                existing.update(cr.fetchall())
+        changed = [row for row in rows if row[:4] not in existing]
+
+        self._mark_xmlids_written("%s.%s" % row[:2] for row in changed)
+        existing_names = {row[:2] for row in existing}
+        if any(row[:2] in existing_names for row in changed):
+            # xmlids pointing to another record, which may be cached by other
+            # processes, like in write()
+            self.clear_caches()
+        for sub_rows in self.env.cr.split_for_in_conditions(changed):
             # insert rows or update them
             query = self._build_update_xmlids_query(sub_rows, update)
             try:
@@ -2,12 +2,15 @@
 from __future__ import print_function
 from textwrap import dedent
 import copy
+import hashlib
 import logging
+import os
 import re
+import sys
 import markupsafe
 from lxml import html, etree
 
-from wdoo import api, models, tools
+from wdoo import api, models, release, tools
 from wdoo.tools.safe_eval import check_values, assert_valid_codeobj, _BUILTINS, to_opcodes, _EXPR_OPCODES, _BLACKLIST
 from wdoo.tools.misc import get_lang
 from wdoo.http import request
@@ -20,6 +23,24 @@ from wdoo.addons.base.models.ir_asset import can_aggregate, STYLE_EXTENSIONS, SC
 
 _logger = logging.getLogger(__name__)
 
+# maximum age in seconds of the unused compiled templates stored in data_dir
+COMPILED_CODE_MAX_AGE = 30 * 24 * 3600
+# whether the compiled templates of other versions and the ones unused for
+# COMPILED_CODE_MAX_AGE have been removed by the current process
+_compiled_code_pruned = False
+# whether storing a compiled template failed, e.g. in a read-only data_dir
+_compiled_code_readonly = False
+
+
+def _compiled_code_root():
+    return os.path.join(tools.config['data_dir'], 'qweb')
+
+
+def _compiled_code_version():
+    """ Return the directory of the compiled templates of the current version
+    of wdoo and python, as the stored code is only valid for them. """
+    return '%s-%s' % (release.version, sys.implementation.cache_tag)
+
 
 _SAFE_QWEB_OPCODES = _EXPR_OPCODES.union(to_opcodes([
     'MAKE_FUNCTION', 'CALL_FUNCTION', 'CALL_FUNCTION_KW', 'CALL_FUNCTION_EX',
@@ -50,8 +71,8 @@ class IrQWeb(models.AbstractModel, QWeb):
 
     _available_objects = dict(_BUILTINS)
     _empty_lines = re.compile(r'\n\s*\n')
+    _stream_chunk_size = 16384
 
-    @QwebTracker.wrap_render
     @api.model
     def _render(self, template, values=None, **options):
         """ render(template, values, **options)
@@ -68,13 +89,7 @@ class IrQWeb(models.AbstractModel, QWeb):
                   instead of `str`)
         :rtype: MarkupSafe
         """
-        compile_options = dict(self.env.context, dev_mode='qweb' in tools.config['dev_mode'])
-        compile_options.update(options)
-
-        result = super()._render(template, values=values, **compile_options)
-
-        if not values or not values.get('__keep_empty_lines'):
-            result = markupsafe.Markup(IrQWeb._empty_lines.sub('\n', result.strip()))
+        result = markupsafe.Markup(''.join(self._render_stream(template, values, **options)))
 
         if 'data-pagebreak=' not in result:
             return result
@@ -107,6 +122,54 @@ class IrQWeb(models.AbstractModel, QWeb):
 
         return markupsafe.Markup(''.join(html.tostring(f).decode() for f in fragments))
 
+    @QwebTracker.wrap_render
+    @api.model
+    def _render_stream(self, template, values=None, **options):
+        """ render_stream(template, values, **options)
+
+        Render the template specified by the given name as an iterator of
+        strings, with the empty lines collapsed like :meth:`_render`. The
+        rows marked with ``data-pagebreak`` are not split, as this requires
+        the whole document; use :meth:`_render` for the html of reports.
+        """
+        compile_options = dict(self.env.context, dev_mode='qweb' in tools.config['dev_mode'])
+        compile_options.update(options)
+
+        rendering = super()._render_stream(template, values=values, **compile_options)
+
+        if values and values.get('__keep_empty_lines'):
+            return rendering
+        return self._collapse_empty_lines(rendering)
+
+    def _collapse_empty_lines(self, rendering):
+        """ Strip the given rendering and collapse its empty lines, by chunks
+        of about ``_stream_chunk_size`` characters.
+        """
+        buffer = []
+        size = 0
+        started = False
+        for fragment in rendering:
+            buffer.append(fragment)
+            size += len(fragment)
+            if size < self._stream_chunk_size:
+                continue
+            text = ''.join(buffer)
+            if not started:
+                text = text.lstrip()
+            # keep the trailing whitespace, it may be an empty line continued
+            # by the next fragments
+            end = len(text.rstrip())
+            if end:
+                started = True
+                yield IrQWeb._empty_lines.sub('\n', text[:end])
+            buffer = [text[end:]]
+            size = len(buffer[0])
+        text = ''.join(buffer).rstrip()
+        if not started:
+            text = text.lstrip()
+        if text:
+            yield IrQWeb._empty_lines.sub('\n', text)
+
     # assume cache will be invalidated by third party on write to ir.ui.view
     def _get_template_cache_keys(self):
         """ Return the list of context keys to use for caching ``_get_template``. """
@@ -125,6 +188,93 @@ class IrQWeb(models.AbstractModel, QWeb):
             pass
         return super()._compile(id_or_xml_id, options=options)
 
+    # persistent cache of the compiled templates, shared by all the processes
+    # using the same data directory; entries are keyed by their content so
+    # they never need to be invalidated, but the entries of other versions and
+    # the ones unused for COMPILED_CODE_MAX_AGE are removed on registry load.
+    # As the stored code is executed, the entries are signed with a key
+    # derived from the secret of the database, and never loaded without a
+    # valid signature.
+
+    _compiler_signatures = {}
+
+    def _get_compiler_signature(self):
+        """ Return a hash of the source of the modules defining the class of
+        ``self``, as any change of the code generation must invalidate the
+        compiled templates.
+        """
+        cls = type(self)
+        signature = self._compiler_signatures.get(cls)
+        if signature is None:
+            sha = hashlib.sha256()
+            sha.update(release.version.encode())
+            sha.update(sys.implementation.cache_tag.encode())
+            for path in sorted({getattr(sys.modules.get(klass.__module__), '__file__', None) or '' for klass in cls.mro()}):
+                if path.endswith('.py'):
+                    with open(path, 'rb') as f:
+                        sha.update(f.read())
+            signature = self._compiler_signatures[cls] = sha.hexdigest()
+        return signature
+
+    def _get_compiled_code_key(self):
+        """ Return the key signing the compiled templates of the database. """
+        return tools.hmac(self.sudo().env, 'ir.qweb.compiled_code', _compiled_code_version()).encode()
+
+    def _get_compiled_code_path(self, template, def_name, document, options):
+        """ Return the file caching the code compiled for the given template
+        document and options, or ``None`` if it must not be cached. """
+        if options.get('load') or options.get('dev_mode') or 'qweb' in tools.config['dev_mode']:
+            return None
+        if isinstance(document, str):
+            document = document.encode()
+        if not isinstance(document, bytes) or not document.lstrip().startswith(b'<'):
+            return None
+        sha = hashlib.sha256(document)
+        sha.update(repr((
+            self._get_compiler_signature(), self._get_compiled_code_key(), str(template), def_name,
+            tuple(options.get(k) for k in self._get_template_cache_keys()),
+        )).encode())
+        key = sha.hexdigest()
+        return os.path.join(_compiled_code_root(), _compiled_code_version(), key[:2], key)
+
+    def _load_compiled_code(self, template, def_name, document, options):
+        path = self._get_compiled_code_path(template, def_name, document, options)
+        if not path:
+            return None
+        try:
+            code, compiled = tools.read_marshal_file(path, self._get_compiled_code_key())
+        except FileNotFoundError:
+            return None
+        except Exception:
+            _logger.warning("Could not load compiled template %s from %s", template, path, exc_info=True)
+            return None
+        # keep the entries in use from being pruned
+        with tools.ignore(OSError):
+            os.utime(path)
+        return code, compiled
+
+    def _store_compiled_code(self, template, def_name, document, options, code, compiled):
+        global _compiled_code_readonly
+        if _compiled_code_readonly:
+            return
+        path = self._get_compiled_code_path(template, def_name, document, options)
+        if not path:
+            return
+        try:
+            tools.write_marshal_file(path, (code, compiled), self._get_compiled_code_key())
+        except OSError:
+            # do not try again for every template, e.g. in a read-only data_dir
+            _compiled_code_readonly = True
+            _logger.warning("Could not store compiled template %s in %s, compiled templates will not be stored",
+                            template, path, exc_info=True)
+
+    def _register_hook(self):
+        super()._register_hook()
+        global _compiled_code_pruned
+        if not _compiled_code_pruned:
+            _compiled_code_pruned = True
+            tools.prune_cache_directory(_compiled_code_root(), _compiled_code_version(), COMPILED_CODE_MAX_AGE)
+
     def _load(self, name, options):
         lang = options.get('lang', get_lang(self.env).code)
         env = self.env
@@ -230,6 +380,38 @@ class IrQWeb(models.AbstractModel, QWeb):
 
     # method called by computing code
 
+    def _get_cached_fragment(self, options, path, cache_key, render):
+        template_key = (options.get('ref'), path, tuple(options.get(k) for k in self._get_template_cache_keys()))
+        missed = []
+
+        def render_missing():
+            missed.append(True)
+            return render()
+
+        fragment = self._load_cached_fragment(template_key, self._get_fragment_cache_key(cache_key), render_missing)
+        qweb_tracker = self.env.context.get('qweb_tracker')
+        if qweb_tracker:
+            qweb_tracker.cache_fragment(hit=not missed)
+        return fragment
+
+    def _get_fragment_cache_key(self, value):
+        """ Return the given `t-cache` key, with the records replaced by their
+        model and ids so that the cache does not keep their environment. """
+        if isinstance(value, models.BaseModel):
+            return (value._name, value._ids)
+        if isinstance(value, (list, tuple)):
+            return tuple(self._get_fragment_cache_key(item) for item in value)
+        return value
+
+    # the cache is cleared with the other caches of the registry, e.g. when a
+    # view is modified
+    @tools.conditional(
+        'xml' not in tools.config['dev_mode'],
+        tools.ormcache('template_key', 'cache_key'),
+    )
+    def _load_cached_fragment(self, template_key, cache_key, render):
+        return render()
+
     def get_asset_bundle(self, bundle_name, files, env=None, css=True, js=True):
         return AssetsBundle(bundle_name, files, env=env, css=css, js=js)
 
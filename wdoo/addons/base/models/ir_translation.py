@@ -321,6 +321,18 @@ class IrTranslation(models.Model):
             return tools.ustr(source)
         return trad
 
+    @tools.ormcache('lang')
+    def _get_code_translations(self, lang):
+        """ Return the code translations of ``lang`` as a dict ``{source: value}``.
+        The catalog is loaded once per registry and language, and cleared with
+        the caches of the registry when translations are modified.
+        """
+        # ordered so that the oldest translation of a term wins
+        self._cr.execute(""" SELECT src, value FROM ir_translation
+                            WHERE lang=%s AND type='code' AND value != ''
+                            ORDER BY id DESC """, [lang])
+        return dict(self._cr.fetchall())
+
     @api.model
     def _get_source(self, name, types, lang, source=None, res_id=None):
         """ Return the translation for the given combination of ``name``,
@@ -342,6 +354,10 @@ class IrTranslation(models.Model):
             return tools.ustr(source or '')
         if isinstance(types, str):
             types = (types,)
+        if source and not name and not res_id and types == ('code',):
+            # code terms, e.g. from _(), are looked up in the catalog of lang
+            source = tools.ustr(source)
+            return self._get_code_translations(lang).get(source) or source
         if res_id:
             if isinstance(res_id, int):
                 res_id = (res_id,)
@@ -880,29 +896,50 @@ class IrTranslation(models.Model):
 
         # Regional languages (ll_CC) must inherit/override their parent lang (ll), but this is
         # done server-side when the language is loaded, so we only need to load the user's lang.
-        translations_per_module = {}
+        translations_per_module = {
+            mod: {'messages': messages}
+            for mod, messages in self._get_web_translations(lang, tuple(mods)).items()
+            if messages
+        }
+
+        return translations_per_module, lang_params
+
+    @tools.ormcache_multi('lang', multi='mods')
+    def _get_web_translations(self, lang, mods):
+        """ Return the web client messages of the given modules, as a dict
+        ``{module: [{'id': source, 'string': value}]}``. The messages of each
+        module are cached separately, and the missing ones are read at once.
+        """
+        translations = {mod: [] for mod in mods}
         messages = self.env['ir.translation'].sudo().search_read([
-            ('module', 'in', mods), ('lang', '=', lang),
+            ('module', 'in', list(mods)), ('lang', '=', lang),
             ('comments', 'like', 'openerp-web'), ('value', '!=', False),
             ('value', '!=', '')],
             ['module', 'src', 'value', 'lang'], order='module')
         for mod, msg_group in itertools.groupby(messages, key=operator.itemgetter('module')):
-            translations_per_module.setdefault(mod, {'messages': []})
-            translations_per_module[mod]['messages'].extend({
+            translations[mod].extend({
                 'id': m['src'],
                 'string': m['value']}
                 for m in msg_group)
-
-        return translations_per_module, lang_params
+        return translations
 
     @api.model
-    @tools.ormcache('frozenset(mods)', 'lang')
-    def get_web_translations_hash(self, mods, lang):
-        translations, lang_params = self.get_translations_for_webclient(mods, lang)
-        translation_cache = {
+    def get_web_translations(self, mods, lang):
+        """ Return the web client translations of the given modules as a
+        JSON document, and its hash. """
+        return self._get_web_translations_payload(frozenset(mods), lang or self._context.get('lang'))
+
+    @tools.ormcache('mods', 'lang')
+    def _get_web_translations_payload(self, mods, lang):
+        translations, lang_params = self.get_translations_for_webclient(sorted(mods), lang)
+        payload = json.dumps({
             'lang_parameters': lang_params,
             'modules': translations,
             'lang': lang,
             'multi_lang': len(self.env['res.lang'].sudo().get_installed()) > 1,
-        }
-        return hashlib.sha1(json.dumps(translation_cache, sort_keys=True).encode()).hexdigest()
+        }, sort_keys=True)
+        return payload, hashlib.sha1(payload.encode()).hexdigest()
+
+    @api.model
+    def get_web_translations_hash(self, mods, lang):
+        return self.get_web_translations(mods, lang)[1]
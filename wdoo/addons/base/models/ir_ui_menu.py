@@ -199,8 +199,9 @@ class IrUiMenu(models.Model):
     def _load_menus_blacklist(self):
         return []
 
+    # the visible menus only depend on the groups of the user, see _visible_menu_ids
     @api.model
-    @tools.ormcache_context('self._uid', keys=('lang',))
+    @tools.ormcache_context('frozenset(self.env.user.groups_id.ids)', keys=('lang',))
     def load_menus_root(self):
         fields = ['name', 'sequence', 'parent_id', 'action', 'web_icon_data']
         menu_roots = self.get_user_roots()
@@ -221,7 +222,7 @@ class IrUiMenu(models.Model):
         return menu_root
 
     @api.model
-    @tools.ormcache_context('self._uid', 'debug', keys=('lang',))
+    @tools.ormcache_context('frozenset(self.env.user.groups_id.ids)', 'debug', keys=('lang',))
     def load_menus(self, debug):
         """ Loads all menu items (all applications and their sub-menus).
 
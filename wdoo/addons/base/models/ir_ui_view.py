@@ -3,8 +3,11 @@
 
 import ast
 import collections
+import copy
 import datetime
 import fnmatch
+import functools
+import hashlib
 import inspect
 import json
 import logging
@@ -33,6 +36,7 @@ from wdoo.tools import safe_eval, lazy_property, frozendict
 from wdoo.tools.view_validation import valid_view, get_variable_names, get_domain_identifiers, get_dict_asts
 from wdoo.tools.translate import xml_translate, TRANSLATED_ATTRS
 from wdoo.tools.image import image_data_uri
+from wdoo.tools.lru import LRU
 from wdoo.models import check_method_name
 from wdoo.osv.expression import expression
 
@@ -40,6 +44,10 @@ _logger = logging.getLogger(__name__)
 
 MOVABLE_BRANDING = ['data-oe-model', 'data-oe-id', 'data-oe-field', 'data-oe-xpath', 'data-oe-source-id']
 
+# combined archs of view hierarchies, keyed by the content of their views: a
+# modified view only changes the key of the hierarchies it belongs to
+_combined_archs = LRU(512)
+
 
 def quick_eval(expr, globals_dict):
     """ Functionally identical to safe_eval(), but optimized with special-casing. """
@@ -79,13 +87,22 @@ def transfer_field_to_modifiers(field, modifiers):
             modifiers[attr] = default_value
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_attrs(attrs):
+    """ Return the items of the given ``attrs`` attribute (cached). """
+    return tuple(ast.literal_eval(attrs.strip()).items())
+
+
 def transfer_node_to_modifiers(node, modifiers, context=None):
     # Don't deal with groups, it is done by check_group().
     # Need the context to evaluate the invisible attribute on tree views.
     # For non-tree views, the context shouldn't be given.
     if node.get('attrs'):
-        attrs = node.get('attrs').strip()
-        modifiers.update(ast.literal_eval(attrs))
+        # copy the domains, as they may be modified below
+        modifiers.update(
+            (attr, list(value) if isinstance(value, list) else value)
+            for attr, value in _parse_attrs(node.get('attrs'))
+        )
 
     if node.get('states'):
         if 'invisible' in modifiers and isinstance(modifiers['invisible'], list):
@@ -290,12 +307,24 @@ actual arch.
     @api.depends_context('read_arch_from_file', 'lang')
     def _compute_arch(self):
         def resolve_external_ids(arch_fs, view_xml_id):
-            def replacer(m):
-                xmlid = m.group('xmlid')
+            pattern = re.compile(r'(?P<prefix>[^%])%\((?P<xmlid>.*?)\)[ds]')
+
+            def full_xmlid(xmlid):
                 if '.' not in xmlid:
                     xmlid = '%s.%s' % (view_xml_id.split('.')[0], xmlid)
-                return m.group('prefix') + str(self.env['ir.model.data']._xmlid_to_res_id(xmlid))
-            return re.sub(r'(?P<prefix>[^%])%\((?P<xmlid>.*?)\)[ds]', replacer, arch_fs)
+                return xmlid
+
+            # resolve all the xmlids of the arch at once
+            res_ids = {
+                xmlid: res_id
+                for xmlid, (_model, res_id) in self.env['ir.model.data']._xmlids_to_res_model_res_ids(
+                    {full_xmlid(m.group('xmlid')) for m in pattern.finditer(arch_fs)}
+                ).items()
+            }
+
+            def replacer(m):
+                return m.group('prefix') + str(res_ids.get(full_xmlid(m.group('xmlid')), False))
+            return pattern.sub(replacer, arch_fs)
 
         for view in self:
             arch_fs = None
@@ -981,9 +1010,34 @@ actual arch.
             hierarchy[view.inherit_id].append(view)
 
         # optimization: make root part of the prefetch set, too
-        arch = root.with_prefetch(tree_views._prefetch_ids)._combine(hierarchy)
+        root = root.with_prefetch(tree_views._prefetch_ids)
+        key = root._get_combined_arch_key(tree_views)
+        if key is None:
+            return root._combine(hierarchy)
+        arch = _combined_archs.get(key)
+        if arch is None:
+            combined_arch = root.with_context(validate_view_ids=False)._combine(hierarchy)
+            arch = _combined_archs[key] = etree.tostring(combined_arch)
+        # callers modify the tree they get
+        arch = etree.fromstring(arch)
+        # a full validation only flags the root node
+        root._add_validation_flag(arch)
         return arch
 
+    def _get_combined_arch_key(self, tree_views):
+        """ Return the key of the combination of ``self`` with ``tree_views``
+        in the cache of combined archs, or ``None`` if it must not be cached.
+        """
+        validate_view_ids = self.env.context.get('validate_view_ids')
+        if validate_view_ids and validate_view_ids is not True:
+            # the nodes to validate are flagged while combining the views
+            return None
+        sha = hashlib.sha256()
+        for view in self | tree_views:
+            sha.update(repr((view.id, view.inherit_id.id, view.mode)).encode())
+            sha.update(view.arch.encode())
+        return (self.env.cr.dbname, self.id, bool(self.env.context.get('inherit_branding')), sha.hexdigest())
+
     def _apply_groups(self, node, name_manager, node_info):
         #pylint: disable=unused-argument
         """ Apply group restrictions: elements with a 'groups' attribute should
@@ -1023,6 +1077,39 @@ actual arch.
         arch = etree.tostring(node, encoding="unicode").replace('\t', '')
         return arch, dict(name_manager.available_fields)
 
+    # matches the modifiers evaluated with the context, see transfer_node_to_modifiers
+    _context_modifiers = re.compile(r'\b(?:invisible|readonly|required)="[^"]*\bcontext\b')
+
+    def _postprocess_arch(self, arch, model=None):
+        """ Same as :meth:`postprocess_and_fields`, given the architecture
+        as a string. The result only depends on the architecture, the groups
+        of the user, the superuser mode (see :meth:`~.fields_get`) and a few
+        context keys, and is cached accordingly, unless some modifiers are
+        evaluated with the context.
+        """
+        self and self.ensure_one()      # self is at most one view
+        if self._context_modifiers.search(arch):
+            return self.postprocess_and_fields(etree.fromstring(arch), model=model)
+        key = (
+            self.id, model or self.model, hashlib.sha1(arch.encode()).hexdigest(),
+            frozenset(self.env.user.groups_id.ids), self.env.su, bool(request and request.session.debug),
+            tuple(self._context.get(k) for k in self._postprocess_arch_keys()),
+        )
+        xarch, xfields = self._postprocess_arch_cached(key, arch, model)
+        # the caller may modify the field descriptions
+        return xarch, copy.deepcopy(xfields)
+
+    def _postprocess_arch_keys(self):
+        """ Return the list of context keys to use for caching ``_postprocess_arch``. """
+        return ['lang', 'base_model_name', 'create', 'delete', 'edit', 'group_create', 'group_delete', 'group_edit']
+
+    @tools.conditional(
+        'xml' not in config['dev_mode'],
+        tools.ormcache('key'),
+    )
+    def _postprocess_arch_cached(self, key, arch, model):
+        return self.postprocess_and_fields(etree.fromstring(arch), model=model)
+
     def _postprocess_view(self, node, model_name, editable=True):
         """ Process the given architecture, modifying it in-place to add and
         remove stuff.
@@ -1813,30 +1900,48 @@ actual arch.
         correspond to actual sequences of fields on the given model.
         """
         for field_path in field_paths:
-            names = field_path.split('.')
-            Model = self.pool[model_name]
-            for index, name in enumerate(names):
-                if Model is None:
-                    msg = _(
-                        'Non-relational field %(field)r in path %(field_path)r in %(use)s)',
-                        field=names[index - 1], field_path=field_path, use=use,
-                    )
-                    self._raise_view_error(msg, node)
-                try:
-                    field = Model._fields[name]
-                except KeyError:
-                    msg = _(
-                        'Unknown field "%(model)s.%(field)s" in %(use)s)',
-                        model=Model._name, field=name, use=use,
-                    )
-                    self._raise_view_error(msg, node)
-                if not field._description_searchable:
-                    msg = _(
-                        'Unsearchable field %(field)r in path %(field_path)r in %(use)s)',
-                        field=name, field_path=field_path, use=use,
-                    )
-                    self._raise_view_error(msg, node)
-                Model = self.pool.get(field.comodel_name)
+            # the resolution of paths is kept until the models change
+            key = (model_name, field_path)
+            try:
+                error = self.pool.field_paths[key]
+            except KeyError:
+                error = self.pool.field_paths[key] = self._get_field_path_error(model_name, field_path)
+            if error is None:
+                continue
+            kind, model, name = error
+            if kind == 'non_relational':
+                msg = _(
+                    'Non-relational field %(field)r in path %(field_path)r in %(use)s)',
+                    field=name, field_path=field_path, use=use,
+                )
+            elif kind == 'unknown':
+                msg = _(
+                    'Unknown field "%(model)s.%(field)s" in %(use)s)',
+                    model=model, field=name, use=use,
+                )
+            else:
+                msg = _(
+                    'Unsearchable field %(field)r in path %(field_path)r in %(use)s)',
+                    field=name, field_path=field_path, use=use,
+                )
+            self._raise_view_error(msg, node)
+
+    def _get_field_path_error(self, model_name, field_path):
+        """ Return why the given field path is invalid on the given model, as
+        a tuple ``(kind, model, field_name)``, or ``None`` if it is valid.
+        """
+        names = field_path.split('.')
+        Model = self.pool[model_name]
+        for index, name in enumerate(names):
+            if Model is None:
+                return ('non_relational', None, names[index - 1])
+            field = Model._fields.get(name)
+            if field is None:
+                return ('unknown', Model._name, name)
+            if not field._description_searchable:
+                return ('unsearchable', Model._name, name)
+            Model = self.pool.get(field.comodel_name)
+        return None
 
     #------------------------------------------------------
     # QWeb template views
@@ -1983,6 +2088,18 @@ actual arch.
 
         return self.env[engine]._render(self.id, qcontext)
 
+    def _render_template_stream(self, template, values=None, engine='ir.qweb'):
+        return self.browse(self.get_view_id(template))._render_stream(values, engine)
+
+    def _render_stream(self, values=None, engine='ir.qweb', minimal_qcontext=False):
+        """ Same as :meth:`_render`, as an iterator of strings. """
+        assert isinstance(self.id, int)
+
+        qcontext = dict() if minimal_qcontext else self._prepare_qcontext()
+        qcontext.update(values or {})
+
+        return self.env[engine]._render_stream(self.id, qcontext)
+
     @api.model
     def _prepare_qcontext(self):
         """ Returns the qcontext : rendering context with website specific value (required
@@ -126,14 +126,26 @@ class QWeb(object):
         :returns: str as Markup
         :rtype: markupsafe.Markup
         """
+        return Markup(''.join(self._render_stream(template, values, **options)))
+
+    def _render_stream(self, template, values=None, **options):
+        """ _render_stream(template, values, **options)
+
+        Render the template specified by the given name, as an iterator of
+        strings. The template is compiled right away, and rendered while the
+        iterator is consumed.
+
+        :param template: template identifier, name or etree (see ``_get_template``)
+        :param dict values: template values to be used for rendering
+        :param options: used to compile the template (see ``_render``)
+
+        :returns: iterator of str
+        """
         if values and 0 in values:
             raise ValueError('values[0] should be unset when call the _render method and only set into the template.')
 
         render_template = self._compile(template, options)
-        rendering = render_template(self, values or {})
-        result = ''.join(rendering)
-
-        return Markup(result)
+        return render_template(self, values or {})
 
     def _compile(self, template, options):
         """ Compile the given template into a rendering function (generator)::
@@ -173,6 +185,46 @@ class QWeb(object):
 
         def_name = f"template_{ref}" if isinstance(ref, int) else "template"
 
+        cached = self._load_compiled_code(template, def_name, document, options)
+        if cached is None:
+            code, compiled = self._generate_code(template, element, def_name, options, _options)
+            self._store_compiled_code(template, def_name, document, options, code, compiled)
+        else:
+            code, compiled = cached
+
+        try:
+            # noinspection PyBroadException
+            globals_dict = self._prepare_globals({}, options)
+            globals_dict['__builtins__'] = globals_dict # So that unknown/unsafe builtins are never added.
+            unsafe_eval(compiled, globals_dict)
+            compiled_fn = globals_dict[def_name]
+        except QWebException as e:
+            raise e
+        except Exception as e:
+            raise QWebException("Error when compiling xml template", self, options,
+                error=e, template=template, code=code)
+
+        # return the wrapped function
+
+        def render_template(self, values):
+            try:
+                log = {'last_path_node': None}
+                values = self._prepare_values(values, options)
+                yield from compiled_fn(self, values, log)
+            except (QWebException, TransactionRollbackError) as e:
+                raise e
+            except Exception as e:
+                raise QWebException("Error when render the template", self, options,
+                    error=e, template=template, path=log.get('last_path_node'), code=code)
+
+        return render_template
+
+    def _generate_code(self, template, element, def_name, options, _options):
+        """ Generate the python code of the rendering function ``def_name``
+        of the given template element, and compile it.
+
+        :returns: (code, code object)
+        """
         try:
             _options['_text_concat'] = []
             self._appendText("", _options) # To ensure the template function is a generator and doesn't become a regular function
@@ -195,35 +247,26 @@ class QWeb(object):
             raise QWebException("Error when compiling xml template", self, options,
                 error=e, template=template, code=code)
 
-        # compile code and defined default values
+        # compile code
 
         try:
             # noinspection PyBroadException
-            compiled = compile(code, f'<{def_name}>', 'exec')
-            globals_dict = self._prepare_globals({}, options)
-            globals_dict['__builtins__'] = globals_dict # So that unknown/unsafe builtins are never added.
-            unsafe_eval(compiled, globals_dict)
-            compiled_fn = globals_dict[def_name]
-        except QWebException as e:
-            raise e
+            return code, compile(code, f'<{def_name}>', 'exec')
         except Exception as e:
             raise QWebException("Error when compiling xml template", self, options,
                 error=e, template=template, code=code)
 
-        # return the wrapped function
-
-        def render_template(self, values):
-            try:
-                log = {'last_path_node': None}
-                values = self._prepare_values(values, options)
-                yield from compiled_fn(self, values, log)
-            except (QWebException, TransactionRollbackError) as e:
-                raise e
-            except Exception as e:
-                raise QWebException("Error when render the template", self, options,
-                    error=e, template=template, path=log.get('last_path_node'), code=code)
+    def _load_compiled_code(self, template, def_name, document, options):
+        """ Return the pair ``(code, code object)`` previously generated for
+        the given template document and options, or ``None``. Meant to be
+        overridden to provide a cache of compiled templates.
+        """
+        return None
 
-        return render_template
+    def _store_compiled_code(self, template, def_name, document, options, code, compiled):
+        """ Store the code generated for the given template document and
+        options, and its code object, see :meth:`_load_compiled_code`.
+        """
 
     def _get_template(self, template, options):
         """ Retrieve the given template, and return it as a tuple ``(etree,
@@ -273,6 +316,16 @@ class QWeb(object):
         """ Load a given template and return a tuple ``(xml, ref)``` """
         return (template, None)
 
+    def _get_cached_fragment(self, options, path, cache_key, render):
+        """ Return the rendering of the `t-cache` element at ``path`` of the
+        template compiled with ``options``, for the given key. Meant to be
+        overridden to provide the cache.
+
+        :param cache_key: value of the `t-cache` expression
+        :param render: function returning the rendering of the element
+        """
+        return render()
+
     # values for running time
 
     def _prepare_values(self, values, options):
@@ -614,6 +667,7 @@ class QWeb(object):
             'debug',
             'foreach',
             'if', 'elif', 'else',
+            'cache',
             'field', 'esc', 'raw', 'out',
             'tag',
             'call',
@@ -1015,6 +1069,37 @@ class QWeb(object):
             code.extend(orelse)
         return code
 
+    def _compile_directive_cache(self, el, options, indent):
+        """Compile `t-cache` expressions into a python code as a list of
+        strings.
+
+        The rest of the element is rendered once per value of the key
+        expression, then taken from the cache (see ``_get_cached_fragment``).
+        A falsy key disables the cache. The key must change whenever the
+        rendered content does, and the values set with `t-set` inside the
+        element are not set when the content is taken from the cache.
+        """
+        expr = el.attrib.pop('t-cache')
+        path = options['last_path_node']
+
+        code = self._flushText(options, indent)
+        content = self._compile_directives(el, options, indent + 1) + self._flushText(options, indent + 1)
+        if not content:
+            return code
+
+        def_name = f"qweb_t_cache_{re.sub(_VARNAME_REGEX, '_', path)}"
+        key_name = self._make_name('cache_key')
+        code.append(self._indent(f"def {def_name}():", indent))
+        code.extend(content)
+        code.append(self._indent(dedent(f"""
+            {key_name} = {self._compile_expr(expr)}
+            if {key_name}:
+                yield self._get_cached_fragment(compile_options, {path!r}, {key_name}, lambda: ''.join({def_name}()))
+            else:
+                yield from {def_name}()
+        """).strip(), indent))
+        return code
+
     def _compile_directive_foreach(self, el, options, indent):
         """Compile `t-foreach` expressions into a python code as a list of
         strings.
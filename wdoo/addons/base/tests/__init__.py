@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+from . import test_ir_model_data
+from . import test_ir_ui_view
+from . import test_module
+from . import test_qweb
+from . import test_safe_eval
+from . import test_convert
+from . import test_import
+from . import test_sql
+from . import test_sql_db
+from . import test_importtime
+from . import test_translate
+from . import test_registry
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import psycopg2
+from lxml import etree
+
+from wdoo.tests.common import TransactionCase
+from wdoo.tools import convert, mute_logger
+from wdoo.tools.convert import convert_xml_import, prevalidate_xml_files, xml_import, ParseError
+
+
+class TestXmlImportBatch(TransactionCase):
+
+    def import_xml(self, xml, mode='init', noupdate=False):
+        obj = xml_import(self.env.cr, 'base', {}, mode, noupdate=noupdate)
+        obj.parse(etree.fromstring(xml))
+        return obj
+
+    def test_reference_within_batch(self):
+        load_records = type(self.env['res.groups'])._load_records
+        batches = []
+
+        def _load_records(model, data_list, update=False):
+            batches.append([data['xml_id'] for data in data_list])
+            return load_records(model, data_list, update)
+
+        self.patch(type(self.env['res.groups']), '_load_records', _load_records)
+        self.import_xml("""
+            <wdoo>
+                <record id="test_convert_a" model="res.groups">
+                    <field name="name">Test Convert A</field>
+                </record>
+                <record id="test_convert_b" model="res.groups">
+                    <field name="name">Test Convert B</field>
+                </record>
+                <record id="test_convert_c" model="res.groups">
+                    <field name="name">Test Convert C</field>
+                    <field name="implied_ids" eval="[Command.link(ref('test_convert_a')), Command.link(test_convert_b)]"/>
+                </record>
+                <record id="test_convert_d" model="res.groups">
+                    <field name="name">Test Convert D</field>
+                </record>
+            </wdoo>
+        """)
+        # the batch is loaded before the record referencing its records
+        self.assertEqual(batches, [
+            ['base.test_convert_a', 'base.test_convert_b'],
+            ['base.test_convert_c', 'base.test_convert_d'],
+        ])
+        group_a = self.env.ref('base.test_convert_a')
+        group_b = self.env.ref('base.test_convert_b')
+        group_c = self.env.ref('base.test_convert_c')
+        self.assertEqual(group_a.name, 'Test Convert A')
+        self.assertEqual(group_c.implied_ids, group_a + group_b)
+        self.assertEqual(self.env.ref('base.test_convert_d').name, 'Test Convert D')
+
+    def test_failing_record_in_batch(self):
+        xml = """
+            <wdoo>
+                <record id="test_convert_ok" model="res.groups">
+                    <field name="name">Test Convert</field>
+                    <field name="category_id" ref="base.module_category_hidden"/>
+                </record>
+                <record id="test_convert_duplicate" model="res.groups">
+                    <field name="name">Test Convert</field>
+                    <field name="category_id" ref="base.module_category_hidden"/>
+                </record>
+                <record id="test_convert_after" model="res.groups">
+                    <field name="name">Test Convert After</field>
+                </record>
+            </wdoo>
+        """
+        with self.assertRaises(ParseError) as catcher, mute_logger('wdoo.sql_db'), self.env.cr.savepoint():
+            self.import_xml(xml)
+        # the error is reported on the faulty record, with its original cause
+        message = str(catcher.exception)
+        self.assertIn('test_convert_duplicate', message)
+        self.assertNotIn('test_convert_ok', message)
+        self.assertNotIn('test_convert_after', message)
+        self.assertIsInstance(catcher.exception.__cause__, psycopg2.IntegrityError)
+
+        # without the faulty record, the records before and after it are loaded
+        root = etree.fromstring(xml)
+        root.remove(root[1])
+        self.import_xml(etree.tostring(root))
+        self.assertEqual(self.env.ref('base.test_convert_ok').name, 'Test Convert')
+        self.assertEqual(self.env.ref('base.test_convert_after').name, 'Test Convert After')
+        self.assertFalse(self.env.ref('base.test_convert_duplicate', raise_if_not_found=False))
+
+    def test_noupdate(self):
+        xml = """
+            <wdoo>
+                <data noupdate="1">
+                    <record id="test_convert_noupdate" model="res.groups">
+                        <field name="name">Test Convert Noupdate</field>
+                    </record>
+                    <record id="test_convert_forcecreate" model="res.groups" forcecreate="0">
+                        <field name="name">Test Convert Forcecreate</field>
+                    </record>
+                </data>
+                <record id="test_convert_update" model="res.groups">
+                    <field name="name">Test Convert Update</field>
+                </record>
+            </wdoo>
+        """
+        self.import_xml(xml)
+        noupdate = self.env.ref('base.test_convert_noupdate')
+        update = self.env.ref('base.test_convert_update')
+        self.assertEqual(noupdate.name, 'Test Convert Noupdate')
+        self.assertTrue(self.env.ref('base.test_convert_forcecreate'))
+        imd = self.env['ir.model.data'].search([('module', '=', 'base'), ('name', 'like', 'test_convert_%')])
+        self.assertEqual(
+            {data.name: data.noupdate for data in imd},
+            {'test_convert_noupdate': True, 'test_convert_forcecreate': True, 'test_convert_update': False},
+        )
+
+        # in update mode, the noupdate records are not updated, and missing
+        # ones are only created without forcecreate="0"
+        noupdate.name = 'Modified Noupdate'
+        update.name = 'Modified Update'
+        self.env.ref('base.test_convert_forcecreate').unlink()
+        self.import_xml(xml, mode='update')
+        self.assertEqual(noupdate.name, 'Modified Noupdate')
+        self.assertEqual(update.name, 'Test Convert Update')
+        self.assertFalse(self.env.ref('base.test_convert_forcecreate', raise_if_not_found=False))
+
+        noupdate.unlink()
+        self.import_xml(xml, mode='update')
+        self.assertEqual(self.env.ref('base.test_convert_noupdate').name, 'Test Convert Noupdate')
+
+
+class TestXmlPrevalidation(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.valid = os.path.join(tmpdir.name, 'valid.xml')
+        self.invalid = os.path.join(tmpdir.name, 'invalid.xml')
+        with open(self.valid, 'w') as fp:
+            fp.write("""
+                <wdoo>
+                    <record id="test_prevalidation" model="res.groups">
+                        <field name="name">Test Prevalidation</field>
+                    </record>
+                </wdoo>
+            """)
+        with open(self.invalid, 'w') as fp:
+            fp.write("""
+                <wdoo>
+                    <record id="test_prevalidation" model="res.groups">
+                        <bogus name="name">Test Prevalidation</bogus>
+                    </record>
+                </wdoo>
+            """)
+        # validate in threads rather than in forked processes
+        self.patch(convert, 'ProcessPoolExecutor', lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+
+    def test_no_pool_with_threads(self):
+        self.patch(threading, 'active_count', lambda: 2)
+        with prevalidate_xml_files(self.env.cr, [self.valid, self.invalid]):
+            self.assertFalse(self.env.cr.cache['xml_validations'])
+
+    def test_prevalidation(self):
+        self.patch(threading, 'active_count', lambda: 1)
+        with prevalidate_xml_files(self.env.cr, [self.valid, self.invalid]):
+            validations = self.env.cr.cache['xml_validations']
+            self.assertEqual(validations.keys(), {os.path.realpath(self.valid), os.path.realpath(self.invalid)})
+            self.assertTrue(validations[os.path.realpath(self.valid)].result())
+            self.assertFalse(validations[os.path.realpath(self.invalid)].result())
+
+            # the file validated ahead is not validated again
+            def _get_relaxng(schema):
+                raise AssertionError("The file is validated again")
+            with patch.object(convert, '_get_relaxng', _get_relaxng), open(self.valid, 'rb') as fp:
+                convert_xml_import(self.env.cr, 'base', fp)
+            self.assertTrue(self.env.ref('base.test_prevalidation', raise_if_not_found=False))
+
+            # the file whose validation failed is validated again to report its errors
+            with self.assertRaises(Exception), mute_logger('wdoo.tools.convert'), open(self.invalid, 'rb') as fp:
+                convert_xml_import(self.env.cr, 'base', fp)
+
+        # the validations are local to the context
+        self.assertFalse(self.env.cr.cache['xml_validations'])
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+from wdoo.tests.common import TransactionCase
+from wdoo.tools import mute_logger
+
+
+class TestImportChunks(TransactionCase):
+    """ Import with small chunks, to check that the chunks are loaded
+    independently of each other. """
+
+    def import_(self, fields, rows, chunk_size=2):
+        Groups = self.env['res.groups'].with_context(import_chunk_size=chunk_size)
+        return Groups.load(fields, rows)
+
+    def test_errors_in_several_chunks(self):
+        with mute_logger('wdoo.sql_db'):
+            result = self.import_(['name', 'comment'], [
+                ['Test Import 0', ''],
+                ['', 'row 1'],              # error in the first chunk
+                ['Test Import 2', ''],
+                ['Test Import 3', ''],
+                ['', 'row 4'],              # error in the third chunk
+                ['Test Import 5', ''],
+            ])
+        self.assertIs(result['ids'], False)
+        errors = [message for message in result['messages'] if message['type'] == 'error']
+        self.assertEqual([error['rows'] for error in errors], [
+            {'from': 1, 'to': 1},
+            {'from': 4, 'to': 4},
+        ])
+        self.assertEqual([error.get('field') for error in errors], ['name', 'name'])
+        # the import is rolled back
+        self.assertFalse(self.env['res.groups'].search([('name', '=like', 'Test Import %')]))
+
+    def test_errors_at_chunk_boundary(self):
+        with mute_logger('wdoo.sql_db'):
+            result = self.import_(['name'], [
+                ['Test Import 0'],
+                [''],
+                [''],
+                ['Test Import 3'],
+            ])
+        self.assertIs(result['ids'], False)
+        self.assertEqual(
+            [message['rows'] for message in result['messages'] if message['type'] == 'error'],
+            [{'from': 1, 'to': 1}, {'from': 2, 'to': 2}],
+        )
+
+    def test_no_error(self):
+        result = self.import_(['id', 'name'], [
+            ['test_import_%s' % index, 'Test Import %s' % index]
+            for index in range(5)
+        ])
+        self.assertEqual(result['messages'], [])
+        self.assertEqual(len(result['ids']), 5)
+        self.assertEqual(
+            self.env['res.groups'].browse(result['ids']).mapped('name'),
+            ['Test Import %s' % index for index in range(5)],
+        )
+
+    def test_reference_to_earlier_records(self):
+        result = self.import_(['id', 'name', 'implied_ids/id'], [
+            ['test_import_a', 'Test Import A', ''],
+            # reference to a record of the same chunk
+            ['test_import_b', 'Test Import B', 'test_import_a'],
+            # references to records of the previous chunk
+            ['test_import_c', 'Test Import C', 'test_import_a,__import__.test_import_b'],
+            ['test_import_d', 'Test Import D', ''],
+            # references to records of the previous chunks, and to an existing one
+            ['test_import_e', 'Test Import E', 'test_import_c,test_import_d,base.group_user'],
+        ])
+        self.assertEqual(result['messages'], [])
+        self.assertEqual(len(result['ids']), 5)
+
+        group_a = self.env.ref('__import__.test_import_a')
+        group_b = self.env.ref('__import__.test_import_b')
+        group_c = self.env.ref('__import__.test_import_c')
+        group_d = self.env.ref('__import__.test_import_d')
+        group_e = self.env.ref('__import__.test_import_e')
+        self.assertEqual(group_b.implied_ids, group_a)
+        self.assertEqual(group_c.implied_ids, group_a + group_b)
+        self.assertEqual(group_e.implied_ids, group_c + group_d + self.env.ref('base.group_user'))
+
+    def test_reference_to_later_record(self):
+        result = self.import_(['id', 'name', 'implied_ids/id'], [
+            ['test_import_a', 'Test Import A', 'test_import_c'],
+            ['test_import_b', 'Test Import B', ''],
+            ['test_import_c', 'Test Import C', ''],
+        ])
+        self.assertIs(result['ids'], False)
+        self.assertEqual(
+            [message['rows'] for message in result['messages'] if message['type'] == 'error'],
+            [{'from': 0, 'to': 0}],
+        )
+
+
+class TestImportCaches(TransactionCase):
+
+    def test_prefetch_references(self):
+        """ The external ids of a column are resolved at once, not row by row. """
+        Converter = type(self.env['ir.fields.converter'])
+        queries = []
+        _xmlid_to_record_id = Converter._xmlid_to_record_id
+        def xmlid_to_record_id(converter, xmlid, model):
+            count = self.cr.sql_log_count
+            result = _xmlid_to_record_id(converter, xmlid, model)
+            queries.append(self.cr.sql_log_count - count)
+            return result
+        self.patch(Converter, '_xmlid_to_record_id', xmlid_to_record_id)
+
+        result = self.env['res.groups'].load(['name', 'implied_ids/id'], [
+            ['Test Import %s' % index, 'base.group_user,base.group_system']
+            for index in range(10)
+        ])
+        self.assertEqual(result['messages'], [])
+        self.assertEqual(len(result['ids']), 10)
+        self.assertEqual(queries, [0] * 20)
+
+    def test_name_cache_reset(self):
+        """ The records loaded by a flush are found by the next name searches. """
+        with mute_logger('wdoo.sql_db'):
+            result = self.env['res.groups'].load(['name', 'implied_ids'], [
+                # 'Test Import Z' does not exist yet
+                ['Test Import A', 'Test Import Z'],
+                ['Test Import Z', ''],
+                # 'Test Import Z' is loaded by the flush before the search
+                ['Test Import C', 'Test Import Z'],
+            ])
+        self.assertEqual(
+            [message['rows'] for message in result['messages'] if message['type'] == 'error'],
+            [{'from': 0, 'to': 0}],
+        )
+
+    def test_memoized_conversions(self):
+        """ The conversions with warnings are not memoized, so that every row
+        gets its warning. """
+        Converter = type(self.env['ir.fields.converter'])
+        values = []
+        _str_to_boolean = Converter._str_to_boolean
+        def str_to_boolean(converter, model, field, value):
+            values.append(value)
+            return _str_to_boolean(converter, model, field, value)
+        self.patch(Converter, '_str_to_boolean', str_to_boolean)
+
+        convert = self.env['ir.fields.converter'].for_model(self.env['res.groups'])
+        warnings = []
+        log = lambda field, warning: warnings.append(field)
+        for value in ['yes', 'maybe', 'yes', 'maybe']:
+            convert({'share': value}, log)
+        self.assertEqual(values, ['yes', 'maybe', 'maybe'])
+        self.assertEqual(warnings, ['share', 'share'])
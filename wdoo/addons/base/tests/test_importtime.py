@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+from wdoo.cli.importtime import IMPORTTIME_RE, parse_importtime
+from wdoo.tests.common import BaseCase
+
+OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       142 |        142 |   _io
+import time:        61 |         61 |     marshal
+import time:      1204 |       1407 |   encodings.utf_8
+import time:     10203 |      13561 | wdoo.tools.misc
+Traceback (most recent call last):
+ModuleNotFoundError: No module named 'babel'
+"""
+
+
+class TestImportTime(BaseCase):
+
+    def test_regex(self):
+        match = IMPORTTIME_RE.match("import time:      1204 |       1407 |     encodings.utf_8")
+        self.assertEqual(match.groups(), ('1204', '1407', 'encodings.utf_8'))
+        self.assertIsNone(IMPORTTIME_RE.match("import time: self [us] | cumulative | imported package"))
+
+    def test_parse(self):
+        timings, errors = parse_importtime(OUTPUT)
+        self.assertEqual(timings, {
+            '_io': (142, 142),
+            'marshal': (61, 61),
+            'encodings.utf_8': (1204, 1407),
+            'wdoo.tools.misc': (10203, 13561),
+        })
+        # the header is not an error, the traceback is
+        self.assertEqual(errors, [
+            "Traceback (most recent call last):",
+            "ModuleNotFoundError: No module named 'babel'",
+        ])
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+from wdoo.tests.common import TransactionCase
+
+
+class TestXmlidMaps(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.IrModelData = self.env['ir.model.data']
+        self.group = self.env['res.groups'].create({'name': 'Test Xmlid Maps'})
+
+    def test_lookup_after_savepoint_rollback(self):
+        # load the map of the module before creating the xmlid
+        self.assertIsNone(self.env.ref('base.test_xmlid_maps', raise_if_not_found=False))
+
+        with self.assertRaises(ZeroDivisionError), self.env.cr.savepoint():
+            self.IrModelData._update_xmlids([{'xml_id': 'base.test_xmlid_maps', 'record': self.group}])
+            self.assertEqual(self.env.ref('base.test_xmlid_maps'), self.group)
+            1 / 0
+
+        self.assertIsNone(self.env.ref('base.test_xmlid_maps', raise_if_not_found=False))
+        self.assertFalse(self.IrModelData._xmlids_to_res_model_res_ids(['base.test_xmlid_maps']))
+        # the shared map does not contain the rolled back xmlid
+        self.assertNotIn('test_xmlid_maps', self.IrModelData._get_xmlid_map('base'))
+
+    def test_update_after_savepoint_rollback(self):
+        group_user = self.env.ref('base.group_user')
+
+        with self.assertRaises(ZeroDivisionError), self.env.cr.savepoint():
+            self.IrModelData._update_xmlids([{'xml_id': 'base.group_user', 'record': self.group}])
+            self.assertEqual(self.env.ref('base.group_user'), self.group)
+            1 / 0
+
+        self.assertEqual(self.env.ref('base.group_user'), group_user)
+        self.assertEqual(self.IrModelData._get_xmlid_map('base')['group_user'][1:],
+                         ('res.groups', group_user.id))
+
+    def test_cached_map_is_immutable(self):
+        xmlid_map = self.IrModelData._get_xmlid_map('base')
+        with self.assertRaises(NotImplementedError):
+            xmlid_map['test_xmlid_maps'] = (0, 'res.groups', self.group.id)
+
+    def test_update_xmlids_ignores_cached_maps(self):
+        # a map holding an xmlid that does not exist in database, like a map
+        # loaded by a transaction that has been rolled back since
+        stale_map = {'test_xmlid_maps': (0, 'res.groups', self.group.id)}
+        self.patch(type(self.IrModelData), '_get_xmlid_map', lambda self, module: stale_map)
+
+        self.IrModelData._update_xmlids([{'xml_id': 'base.test_xmlid_maps', 'record': self.group}])
+        self.env.cr.execute("SELECT model, res_id FROM ir_model_data WHERE module='base' AND name='test_xmlid_maps'")
+        self.assertEqual(self.env.cr.fetchall(), [('res.groups', self.group.id)])
+
+    def test_update_xmlids_unchanged(self):
+        self.IrModelData._update_xmlids([{'xml_id': 'base.test_xmlid_maps', 'record': self.group}])
+        self.env.cr.execute("SELECT id, write_date FROM ir_model_data WHERE module='base' AND name='test_xmlid_maps'")
+        before = self.env.cr.fetchall()
+
+        # an xmlid that already points to the record is not written again
+        self.env.cr.execute("UPDATE ir_model_data SET write_date = write_date - interval '1 day' WHERE id=%s", [before[0][0]])
+        self.env.cr.execute("SELECT id, write_date FROM ir_model_data WHERE id=%s", [before[0][0]])
+        before = self.env.cr.fetchall()
+        self.IrModelData._update_xmlids([{'xml_id': 'base.test_xmlid_maps', 'record': self.group}])
+        self.env.cr.execute("SELECT id, write_date FROM ir_model_data WHERE id=%s", [before[0][0]])
+        self.assertEqual(self.env.cr.fetchall(), before)
+
+        # an xmlid pointing to another record is updated
+        other = self.env['res.groups'].create({'name': 'Test Xmlid Maps 2'})
+        self.IrModelData._update_xmlids([{'xml_id': 'base.test_xmlid_maps', 'record': other}])
+        self.assertEqual(self.env.ref('base.test_xmlid_maps'), other)
+
+    def test_lookup_cache(self):
+        # an xmlid written by another transaction is not in the map
+        self.env.cr.execute("""
+            INSERT INTO ir_model_data (module, name, model, res_id, noupdate)
+            VALUES ('__import__', 'test_xmlid_maps', 'res.groups', %s, false)
+        """, [self.group.id])
+        self.registry.clear_caches()
+        with self.assertQueryCount(1):
+            self.assertEqual(self.IrModelData._xmlid_to_res_id('__import__.test_xmlid_maps'), self.group.id)
+        with self.assertQueryCount(0):
+            self.assertEqual(self.IrModelData._xmlid_to_res_id('__import__.test_xmlid_maps'), self.group.id)
+
+        # writing an xmlid discards its cached lookup
+        other = self.env['res.groups'].create({'name': 'Test Xmlid Maps 2'})
+        self.IrModelData._update_xmlids([{'xml_id': '__import__.test_xmlid_maps', 'record': other}])
+        self.assertEqual(self.env.ref('__import__.test_xmlid_maps'), other)
+
+        # the xmlids written by the transaction are not cached, but the other
+        # xmlids of their module are
+        self.IrModelData._update_xmlids([{'xml_id': 'base.test_xmlid_maps', 'record': self.group}])
+        group_user = self.env.ref('base.group_user')
+        for _i in range(2):
+            with self.assertQueryCount(1):
+                self.assertEqual(self.IrModelData._xmlid_to_res_id('base.test_xmlid_maps'), self.group.id)
+            with self.assertQueryCount(0):
+                self.assertEqual(self.IrModelData._xmlid_to_res_id('base.group_user'), group_user.id)
+
+    def test_refs(self):
+        self.IrModelData._update_xmlids([{'xml_id': '__import__.test_xmlid_maps', 'record': self.group}])
+        partner = self.env.ref('base.main_partner')
+        group_user = self.env.ref('base.group_user')
+
+        # xmlids of several modules and models, resolved in the given order
+        xml_ids = ['__import__.test_xmlid_maps', 'base.main_partner', 'base.group_user']
+        self.assertEqual(self.env.refs(xml_ids), [self.group, partner, group_user])
+        self.assertEqual(self.env.refs(xml_ids[::-1]), [group_user, partner, self.group])
+        self.assertEqual(self.env.refs([]), [])
+
+        # missing xmlids are None, or raise
+        xml_ids = ['base.group_user', 'base.test_xmlid_missing', '__import__.test_xmlid_maps']
+        self.assertEqual(self.env.refs(xml_ids, raise_if_not_found=False), [group_user, None, self.group])
+        with self.assertRaisesRegex(ValueError, 'base.test_xmlid_missing'):
+            self.env.refs(xml_ids)
+        with self.assertRaisesRegex(ValueError, 'base.test_xmlid_missing'):
+            self.env.refs(xml_ids, raise_if_not_found=True)
+
+        # so are xmlids of deleted records
+        self.group.unlink()
+        self.assertEqual(self.env.refs(xml_ids, raise_if_not_found=False), [group_user, None, None])
+        with self.assertRaisesRegex(ValueError, '__import__.test_xmlid_maps'):
+            self.env.refs(['__import__.test_xmlid_maps'])
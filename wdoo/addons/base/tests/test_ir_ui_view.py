@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+from lxml import etree
+
+from wdoo.addons.base.models import ir_ui_view
+from wdoo.exceptions import ValidationError
+from wdoo.tests.common import TransactionCase, new_test_user
+from wdoo.tools import mute_logger
+from wdoo.tools.lru import LRU
+
+
+class TestPostprocessArchCache(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.arch = """
+            <form>
+                <field name="name"/>
+                <field name="model_id"/>
+                <field name="code"/>
+            </form>
+        """
+        self.view = self.env['ir.ui.view'].create({
+            'name': 'test_postprocess_arch_cache',
+            'model': 'ir.actions.server',
+            'arch': self.arch,
+        })
+        self.user = new_test_user(self.env, login='test_postprocess_arch', groups='base.group_user')
+
+        # count the actual postprocessings
+        self.calls = []
+        View = type(self.env['ir.ui.view'])
+        postprocess_and_fields = View.postprocess_and_fields
+
+        def patched(view, node, model=None):
+            self.calls.append((view.env.uid, view.env.su))
+            return postprocess_and_fields(view, node, model=model)
+
+        self.patch(View, 'postprocess_and_fields', patched)
+
+    def postprocess(self, view):
+        """ Return the cached and uncached results of the postprocessing. """
+        cached = view._postprocess_arch(self.arch, model='ir.actions.server')
+        expected = view.postprocess_and_fields(etree.fromstring(self.arch), model='ir.actions.server')
+        return cached, expected
+
+    def test_sudo_then_user(self):
+        view = self.view.with_user(self.user)
+        self.env.registry.clear_caches()
+
+        cached, expected = self.postprocess(view.sudo())
+        self.assertEqual(cached, expected)
+        cached, expected = self.postprocess(view)
+        self.assertEqual(cached, expected)
+        # the result computed in superuser mode has not been reused
+        self.assertEqual(self.calls, [
+            (self.user.id, True), (self.user.id, True),
+            (self.user.id, False), (self.user.id, False),
+        ])
+
+    def test_user_then_sudo(self):
+        view = self.view.with_user(self.user)
+        self.env.registry.clear_caches()
+
+        cached, expected = self.postprocess(view)
+        self.assertEqual(cached, expected)
+        cached, expected = self.postprocess(view.sudo())
+        self.assertEqual(cached, expected)
+        self.assertEqual(self.calls, [
+            (self.user.id, False), (self.user.id, False),
+            (self.user.id, True), (self.user.id, True),
+        ])
+
+    def test_cache_hit(self):
+        view = self.view.with_user(self.user)
+        self.env.registry.clear_caches()
+
+        first = view._postprocess_arch(self.arch, model='ir.actions.server')
+        second = view._postprocess_arch(self.arch, model='ir.actions.server')
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+
+
+class TestCombinedArchCache(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        View = self.env['ir.ui.view']
+        self.root = View.create({
+            'name': 'test_combined_arch_cache',
+            'model': 'ir.actions.server',
+            'arch': '<form><field name="name"/></form>',
+        })
+        self.child = View.create({
+            'name': 'test_combined_arch_cache_child',
+            'model': 'ir.actions.server',
+            'inherit_id': self.root.id,
+            'arch': '<field name="name" position="after"><field name="model_id"/></field>',
+        })
+
+        # the validation of the views above fills the cache
+        self.patch(ir_ui_view, '_combined_archs', LRU(16))
+
+        # count the actual combinations
+        self.combined = []
+        _combine = type(View)._combine
+        def combine(view, hierarchy):
+            self.combined.append(view.id)
+            return _combine(view, hierarchy)
+        self.patch(type(View), '_combine', combine)
+
+    def field_names(self):
+        arch = self.root._get_combined_arch()
+        return [node.get('name') for node in arch.iter('field')]
+
+    def test_cache_hit(self):
+        self.assertEqual(self.field_names(), ['name', 'model_id'])
+        self.assertEqual(self.field_names(), ['name', 'model_id'])
+        self.assertEqual(self.combined, [self.root.id])
+
+    def test_inherited_arch_changed(self):
+        # the combination is cached by the content of the views, the cached
+        # arch of the former content is not returned
+        self.assertEqual(self.field_names(), ['name', 'model_id'])
+        self.child.arch = '<field name="name" position="after"><field name="code"/></field>'
+        self.assertEqual(self.field_names(), ['name', 'code'])
+
+    def test_inheriting_view_added(self):
+        self.assertEqual(self.field_names(), ['name', 'model_id'])
+        self.env['ir.ui.view'].create({
+            'name': 'test_combined_arch_cache_child2',
+            'model': 'ir.actions.server',
+            'inherit_id': self.root.id,
+            'arch': '<field name="model_id" position="after"><field name="code"/></field>',
+        })
+        self.assertEqual(self.field_names(), ['name', 'model_id', 'code'])
+
+
+class TestFieldPathsCache(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.patch(self.registry, 'field_paths', {})
+
+        # count the actual resolutions of field paths
+        self.resolved = []
+        View = type(self.env['ir.ui.view'])
+        _get_field_path_error = View._get_field_path_error
+        def get_field_path_error(view, model_name, field_path):
+            self.resolved.append((model_name, field_path))
+            return _get_field_path_error(view, model_name, field_path)
+        self.patch(View, '_get_field_path_error', get_field_path_error)
+
+    def create_view(self, field_path):
+        return self.env['ir.ui.view'].create({
+            'name': 'test_field_paths_cache',
+            'model': 'res.partner',
+            'arch': """
+                <search>
+                    <filter name="test" domain="[('%s', '=', 'test')]"/>
+                </search>
+            """ % field_path,
+        })
+
+    def test_valid_path(self):
+        self.create_view('parent_id.name')
+        self.create_view('parent_id.name')
+        self.assertEqual(self.resolved, [('res.partner', 'parent_id.name')])
+        self.assertIsNone(self.registry.field_paths['res.partner', 'parent_id.name'])
+
+    def test_invalid_path(self):
+        # the cached resolution raises the same error
+        for _index in range(2):
+            with self.assertRaises(ValidationError), mute_logger('wdoo.addons.base.models.ir_ui_view'), \
+                    self.cr.savepoint():
+                self.create_view('parent_id.test_missing')
+        self.assertEqual(self.resolved, [('res.partner', 'parent_id.test_missing')])
+        self.assertEqual(
+            self.registry.field_paths['res.partner', 'parent_id.test_missing'],
+            ('unknown', 'res.partner', 'test_missing'),
+        )
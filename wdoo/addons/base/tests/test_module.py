@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+import glob
+import os
+import tempfile
+
+from wdoo.modules.module import AddonFilesIndex
+from wdoo.tests.common import BaseCase
+
+
+class TestAddonFilesIndex(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.addon_dir = os.path.join(tmpdir.name, 'test_addon')
+        for path in [
+            'static/src/a.js',
+            'static/src/b.js',
+            'static/src/ab.js',
+            'static/src/.hidden.js',
+            'static/src/style.scss',
+            'static/src/js/c.js',
+            'static/src/js/deep/d.js',
+            'static/src/js/deep/e.xml',
+            'static/src/.hidden/f.js',
+            'static/lib/g.js',
+        ]:
+            self.touch(path)
+        self.index = AddonFilesIndex()
+
+    def touch(self, path):
+        path = os.path.join(self.addon_dir, *path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w'):
+            pass
+
+    def assertGlob(self, pattern, expected):
+        pattern = os.path.join(self.addon_dir, *pattern.split('/'))
+        result = self.index.glob(self.addon_dir, pattern)
+        globbed = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        self.assertEqual(result, globbed)
+        self.assertEqual(result, [os.path.join(self.addon_dir, *path.split('/')) for path in expected])
+
+    def test_glob_recursive(self):
+        self.assertGlob('static/src/**/*.js', [
+            'static/src/a.js', 'static/src/ab.js', 'static/src/b.js',
+            'static/src/js/c.js', 'static/src/js/deep/d.js',
+        ])
+        self.assertGlob('static/**/deep/*', ['static/src/js/deep/d.js', 'static/src/js/deep/e.xml'])
+        self.assertGlob('static/src/js/**', [
+            'static/src/js/c.js', 'static/src/js/deep/d.js', 'static/src/js/deep/e.xml',
+        ])
+        self.assertGlob('**/g.js', ['static/lib/g.js'])
+
+    def test_glob_star(self):
+        self.assertGlob('static/src/*.js', ['static/src/a.js', 'static/src/ab.js', 'static/src/b.js'])
+        self.assertGlob('static/*/*.js', [
+            'static/lib/g.js', 'static/src/a.js', 'static/src/ab.js', 'static/src/b.js',
+        ])
+        self.assertGlob('static/src/*', [
+            'static/src/a.js', 'static/src/ab.js', 'static/src/b.js', 'static/src/style.scss',
+        ])
+
+    def test_glob_question_mark(self):
+        self.assertGlob('static/src/?.js', ['static/src/a.js', 'static/src/b.js'])
+        self.assertGlob('static/src/a?.js', ['static/src/ab.js'])
+        self.assertGlob('static/src/[!a].js', ['static/src/b.js'])
+
+    def test_glob_no_match(self):
+        self.assertGlob('static/src/*.css', [])
+        self.assertGlob('static/missing/**/*.js', [])
+        self.assertGlob('static/src/??.scss', [])
+        self.assertGlob('static/src/*.js/*', [])
+        # hidden files and directories never match wildcards
+        self.assertGlob('static/src/.hidden/*.js', ['static/src/.hidden/f.js'])
+        self.assertGlob('static/src/*/f.js', [])
+
+    def test_glob_literal(self):
+        self.assertGlob('static/src/a.js', ['static/src/a.js'])
+        self.assertGlob('static/src/missing.js', [])
+        self.assertGlob('static/src/js', [])
+
+    def test_invalidate(self):
+        pattern = os.path.join(self.addon_dir, 'static', 'src', '*.js')
+        self.assertEqual(len(self.index.glob(self.addon_dir, pattern)), 3)
+        generation = self.index.generation
+
+        self.touch('static/src/new.js')
+        self.assertEqual(len(self.index.glob(self.addon_dir, pattern)), 3)
+
+        self.index.invalidate(os.path.join(self.addon_dir, 'static', 'src', 'new.js'))
+        self.assertGreater(self.index.generation, generation)
+        self.assertEqual(len(self.index.glob(self.addon_dir, pattern)), 4)
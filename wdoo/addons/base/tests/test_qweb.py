@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+import os
+import tempfile
+
+from lxml import etree
+
+from wdoo import tools
+from wdoo.addons.base.models import ir_qweb
+from wdoo.tests.common import TransactionCase
+from wdoo.tools import config, mute_logger
+
+
+class TestQWebEmptyLines(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.IrQweb = self.env['ir.qweb']
+        self.size = self.IrQweb._stream_chunk_size
+
+    def collapse(self, fragments):
+        """ Return the result of collapsing the empty lines of the given
+        fragments all at once. """
+        return self.IrQweb._empty_lines.sub('\n', ''.join(fragments).strip())
+
+    def assertCollapsed(self, fragments):
+        result = list(self.IrQweb._collapse_empty_lines(iter(fragments)))
+        self.assertEqual(''.join(result), self.collapse(fragments))
+        self.assertNotIn('', result)
+
+    def test_empty_lines_across_chunks(self):
+        size = self.size
+        # a run of empty lines starting before the end of the first chunk and
+        # ending after it, split over several fragments
+        self.assertCollapsed(['a' * (size - 3), '\n  \n', '  \n\n', 'b'])
+        self.assertCollapsed(['a' * (size - 1) + '\n', ' ' * size, '\n\nb\n\n\nc'])
+        # fragments of exactly one chunk, ending in the middle of a run
+        self.assertCollapsed(['a' * (size - 2) + '\n ', '\n' + 'b' * (size - 1), 'c\n\n\nd'])
+
+    def test_leading_trailing_whitespace_across_chunks(self):
+        size = self.size
+        self.assertCollapsed(['\n' * 10, ' ' * size, '\n \n', 'text', ' \n' * size, '\n'])
+        self.assertCollapsed([' \n' * size, 'a\n\nb', '\n' * (size + 1)])
+        self.assertCollapsed([' ' * (size * 2)])
+        self.assertCollapsed([])
+
+    def test_render_stream_matches_render(self):
+        size = self.size
+        template = etree.fromstring("""
+            <t t-name="test_qweb_empty_lines">
+                <t t-foreach="lines" t-as="line"><t t-out="line"/></t>
+            </t>
+        """)
+        values = {'lines': [
+            '\n  \n', 'a' * (size - 3), '\n  \n', '  \n\n', 'b', ' \n' * size, 'c', '\n \n' * 3,
+        ]}
+        stream = ''.join(self.IrQweb._render_stream(template, values))
+        result = self.IrQweb._render(template, values)
+        self.assertEqual(stream, str(result))
+        self.assertEqual(stream, self.collapse(values['lines']))
+
+
+class TestQWebCache(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        if 'xml' in config['dev_mode']:
+            self.skipTest("t-cache is disabled in xml dev mode")
+        self.view = self.env['ir.ui.view'].create({
+            'name': 'test_qweb_t_cache',
+            'type': 'qweb',
+            'arch': """
+                <t t-name="test_qweb_t_cache">
+                    <div t-cache="key"><t t-out="render_count()"/></div>
+                </t>
+            """,
+        })
+        self.renderings = []
+        self.env.registry.clear_caches()
+
+    def render(self, key, **context):
+        def render_count():
+            self.renderings.append(key)
+            return str(len(self.renderings))
+
+        values = {'key': key, 'render_count': render_count}
+        return str(self.env['ir.qweb'].with_context(**context)._render(self.view.id, values))
+
+    def test_hit(self):
+        self.assertEqual(self.render(1), '<div>1</div>')
+        self.assertEqual(self.render(1), '<div>1</div>')
+        self.assertEqual(self.renderings, [1])
+
+    def test_miss(self):
+        self.assertEqual(self.render(1), '<div>1</div>')
+        self.assertEqual(self.render(2), '<div>2</div>')
+        self.assertEqual(self.render(1), '<div>1</div>')
+        self.assertEqual(self.render(2), '<div>2</div>')
+        self.assertEqual(self.renderings, [1, 2])
+
+        # a falsy key disables the cache
+        self.assertEqual(self.render(False), '<div>3</div>')
+        self.assertEqual(self.render(False), '<div>4</div>')
+
+    def test_records_key(self):
+        groups = self.env['res.groups'].search([], limit=2)
+        self.assertEqual(self.render(groups), '<div>1</div>')
+        self.assertEqual(self.render(groups.with_context(test_qweb_cache=True)), '<div>1</div>')
+        self.assertEqual(self.render(groups[:1]), '<div>2</div>')
+
+    def test_context_keys(self):
+        self.env['res.lang']._activate_lang('fr_FR')
+        self.assertEqual(self.render(1, lang='en_US'), '<div>1</div>')
+        self.assertEqual(self.render(1, lang='fr_FR'), '<div>2</div>')
+        self.assertEqual(self.render(1, lang='en_US'), '<div>1</div>')
+
+        self.assertEqual(self.render(1, lang='en_US', website_id=1), '<div>3</div>')
+        self.assertEqual(self.render(1, lang='en_US', website_id=2), '<div>4</div>')
+        self.assertEqual(self.render(1, lang='en_US', website_id=1), '<div>3</div>')
+
+    def test_invalidation(self):
+        self.assertEqual(self.render(1), '<div>1</div>')
+        self.view.write({'arch': """
+            <t t-name="test_qweb_t_cache">
+                <span t-cache="key"><t t-out="render_count()"/></span>
+            </t>
+        """})
+        self.assertEqual(self.render(1), '<span>2</span>')
+        self.assertEqual(self.render(1), '<span>2</span>')
+        self.assertEqual(self.renderings, [1, 1])
+
+
+class TestQWebCompiledCode(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.patch(config, 'options', dict(config.options, data_dir=tmpdir.name, dev_mode=[]))
+        self.patch(ir_qweb, '_compiled_code_readonly', False)
+        self.IrQweb = self.env['ir.qweb']
+        self.document = b'<t t-name="test_qweb_compiled_code"><p t-out="value"/></t>'
+        self.code = "def template_1(self, values, log):\n    yield 'compiled'"
+        self.compiled = compile(self.code, '<template_1>', 'exec')
+
+    def load(self, document=None, options=None):
+        return self.IrQweb._load_compiled_code(1, 'template_1', document or self.document, options or {})
+
+    def store(self, document=None, options=None):
+        self.IrQweb._store_compiled_code(1, 'template_1', document or self.document, options or {}, self.code, self.compiled)
+
+    def test_store_load(self):
+        self.assertIsNone(self.load())
+        self.store()
+        # the source of the code is kept for the error messages
+        self.assertEqual(self.load(), (self.code, self.compiled))
+
+        # another document, or other options, are not the same entry
+        self.assertIsNone(self.load(document=b'<t t-name="test_qweb_compiled_code"><p/></t>'))
+        self.assertIsNone(self.load(options={'lang': 'fr_FR'}))
+        # nor is the same document signed with another database secret
+        self.env['ir.config_parameter'].sudo().set_param('database.secret', 'test_qweb_compiled_code')
+        self.assertIsNone(self.load())
+
+    def test_invalid_signature(self):
+        self.store()
+        path = self.IrQweb._get_compiled_code_path(1, 'template_1', self.document, {})
+
+        # an entry not signed with the key of the database is not loaded
+        tools.write_marshal_file(path, (self.code, self.compiled), b'other key')
+        with mute_logger('wdoo.addons.base.models.ir_qweb'):
+            self.assertIsNone(self.load())
+
+        # neither is a modified entry
+        self.store()
+        with open(path, 'rb') as f:
+            data = bytearray(f.read())
+        data[-1] ^= 1
+        with open(path, 'wb') as f:
+            f.write(data)
+        with mute_logger('wdoo.addons.base.models.ir_qweb'):
+            self.assertIsNone(self.load())
+
+    def test_render_from_stored_code(self):
+        template = etree.fromstring(self.document)
+        self.assertEqual(str(self.IrQweb._render(template, {'value': 'a'})), '<p>a</p>')
+        self.assertTrue(os.listdir(ir_qweb._compiled_code_root()))
+
+        # the template is not generated again
+        def _generate_code(*args, **kwargs):
+            raise AssertionError("The template is compiled again")
+        self.patch(type(self.IrQweb), '_generate_code', _generate_code)
+        self.registry.clear_caches()
+        self.assertEqual(str(self.IrQweb._render(template, {'value': 'b'})), '<p>b</p>')
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from wdoo.tests.common import TransactionCase
+from wdoo.tools import config, write_marshal_file
+
+
+class TestModelsSetUp(TransactionCase):
+
+    def test_models_set_up(self):
+        """ The models are set up again only after a module has been loaded. """
+        registry = self.registry
+        registry.setup_models(self.cr)
+        self.assertTrue(registry.models_set_up)
+
+        registry.load(self.cr, SimpleNamespace(name='test_models_set_up'))
+        self.assertFalse(registry.models_set_up)
+
+        registry.setup_models(self.cr)
+        self.assertTrue(registry.models_set_up)
+
+
+class TestFieldTriggersSnapshot(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patcher = patch.dict(config.options, {'data_dir': tmpdir.name, 'dev_mode': []})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_store_and_load(self):
+        registry = self.registry
+        signature = registry._get_field_triggers_signature()
+        self.assertIsNone(registry._load_field_triggers(signature))
+        registry._store_field_triggers(signature, registry.field_triggers)
+        self.assertEqual(registry._load_field_triggers(signature), registry.field_triggers)
+
+    def test_signature_mismatch(self):
+        registry = self.registry
+        signature = registry._get_field_triggers_signature()
+
+        # the signature follows the dependencies of the fields
+        field = self.env['res.partner']._fields['display_name']
+        with patch.dict(registry.field_depends, {field: ('name', 'ref')}):
+            self.assertNotEqual(registry._get_field_triggers_signature(), signature)
+        self.assertEqual(registry._get_field_triggers_signature(), signature)
+
+        # stored triggers that do not match the fields are ignored
+        path = registry._get_field_triggers_path(signature)
+        write_marshal_file(path, {
+            'triggers': {('res.partner', 'test_missing'): {None: [('res.partner', 'name')]}},
+            'recursive': [],
+        })
+        with self.assertLogs('wdoo.modules.registry', 'WARNING'):
+            self.assertIsNone(registry._load_field_triggers(signature))
+
+        # as well as invalid files
+        write_marshal_file(path, ['invalid'])
+        with self.assertLogs('wdoo.modules.registry', 'WARNING'):
+            self.assertIsNone(registry._load_field_triggers(signature))
+        with open(path, 'wb') as f:
+            f.write(b'')
+        with self.assertLogs('wdoo.modules.registry', 'WARNING'):
+            self.assertIsNone(registry._load_field_triggers(signature))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+import logging
+import time
+
+from wdoo.tests.common import BaseCase, tagged
+from wdoo.tools import safe_eval as safe_eval_module
+from wdoo.tools.safe_eval import safe_eval
+
+_logger = logging.getLogger(__name__)
+
+
+class TestSafeEvalCache(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        safe_eval_module._safe_code_cache.clear()
+
+    def test_cache_hit(self):
+        self.assertEqual(safe_eval("[('id', 'in', ids)]", {'ids': [1, 2]}), [('id', 'in', [1, 2])])
+        code = safe_eval_module._get_safe_code("[('id', 'in', ids)]", 'eval')
+        self.assertEqual(safe_eval("[('id', 'in', ids)]", {'ids': [3]}), [('id', 'in', [3])])
+        self.assertIs(safe_eval_module._get_safe_code("[('id', 'in', ids)]", 'eval'), code)
+
+    def test_cache_mode(self):
+        # the code compiled for one mode is not reused for the other one
+        self.assertEqual(safe_eval("1 + 1", mode='eval'), 2)
+        self.assertIsNone(safe_eval("1 + 1", mode='exec'))
+        self.assertEqual(safe_eval("1 + 1", mode='eval'), 2)
+        self.assertIsNot(
+            safe_eval_module._get_safe_code("1 + 1", 'eval'),
+            safe_eval_module._get_safe_code("1 + 1", 'exec'),
+        )
+
+        # a statement is valid in exec mode only, in any order
+        values = {}
+        safe_eval("result = 42", locals_dict=values, mode='exec', nocopy=True)
+        self.assertEqual(values['result'], 42)
+        with self.assertRaises(SyntaxError):
+            safe_eval("result = 42", mode='eval')
+
+    def test_cache_locals_builtins(self):
+        expr = "result = sorted(values)"
+        with_builtins = {'values': [2, 1]}
+        safe_eval(expr, locals_dict=with_builtins, mode='exec', nocopy=True, locals_builtins=True)
+        self.assertEqual(with_builtins['result'], [1, 2])
+        self.assertIn('sorted', with_builtins)
+
+        # the cached code does not carry the builtins of the previous call
+        without_builtins = {'values': [3, 1]}
+        safe_eval(expr, locals_dict=without_builtins, mode='exec', nocopy=True)
+        self.assertEqual(without_builtins['result'], [1, 3])
+        self.assertNotIn('sorted', without_builtins)
+
+        with_builtins = {'values': [4, 1]}
+        safe_eval(expr, locals_dict=with_builtins, mode='exec', nocopy=True, locals_builtins=True)
+        self.assertEqual(with_builtins['result'], [1, 4])
+        self.assertIn('sorted', with_builtins)
+
+    def test_invalid_expression_not_cached(self):
+        with self.assertRaises(NameError):
+            safe_eval("__import__('os')")
+        self.assertNotIn(("__import__('os')", 'eval'), safe_eval_module._safe_code_cache)
+
+
+@tagged('-standard', 'safe_eval_benchmark')
+class TestSafeEvalBenchmark(BaseCase):
+    """ Compare the evaluation of the same expressions with and without the
+    cache of the validated code objects. Run it with
+    ``--test-tags /base:TestSafeEvalBenchmark``.
+    """
+    ROUNDS = 2000
+    EXPRESSIONS = [
+        "[('state', '=', 'done'), ('partner_id', 'child_of', [uid]), '|', ('active', '=', True), ('active', '=', False)]",
+        "{'default_type': 'out_invoice', 'search_default_partner_id': active_id, 'lang': context.get('lang')}",
+        "{'invisible': [('state', 'not in', ('draft', 'sent'))], 'readonly': [('locked', '=', True)]}",
+    ]
+
+    def run_rounds(self, clear):
+        values = {'uid': 1, 'active_id': 2, 'context': {'lang': 'en_US'}}
+        start = time.perf_counter()
+        for _ in range(self.ROUNDS):
+            for expr in self.EXPRESSIONS:
+                if clear:
+                    safe_eval_module._safe_code_cache.clear()
+                safe_eval(expr, values)
+        return time.perf_counter() - start
+
+    def test_benchmark(self):
+        uncached = self.run_rounds(clear=True)
+        cached = self.run_rounds(clear=False)
+        _logger.info(
+            "safe_eval of %d expressions: %.3fs without cache, %.3fs with cache (x%.1f)",
+            self.ROUNDS * len(self.EXPRESSIONS), uncached, cached, uncached / cached,
+        )
+        self.assertLess(cached, uncached)
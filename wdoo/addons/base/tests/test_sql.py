@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+from wdoo.models import BaseModel
+from wdoo.tests.common import TransactionCase
+from wdoo.tools import sql
+
+TABLES = ['test_sql_a', 'test_sql_b', 'test_sql_v', 'test_sql_missing']
+
+
+class TestSchemaSnapshot(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cr.execute("""
+            CREATE TABLE test_sql_b (id SERIAL PRIMARY KEY);
+            CREATE TABLE test_sql_a (
+                id SERIAL PRIMARY KEY,
+                name VARCHAR(16) NOT NULL,
+                b_id INTEGER REFERENCES test_sql_b(id) ON DELETE CASCADE
+            );
+            CREATE INDEX test_sql_a_b_id_index ON test_sql_a (b_id);
+            CREATE VIEW test_sql_v AS SELECT id FROM test_sql_a;
+        """)
+        sql.add_constraint(self.cr, 'test_sql_a', 'test_sql_a_name_uniq', 'unique(name)')
+        self.addCleanup(sql.drop_schema_snapshot, self.cr)
+
+    def describe(self):
+        """ Return the schema of the test tables, as read by the helpers. """
+        cr = self.cr
+        return {
+            'tables': sorted(sql.existing_tables(cr, TABLES)),
+            'kinds': [sql.table_kind(cr, table) for table in TABLES],
+            'columns': [sql.table_columns(cr, table) for table in TABLES],
+            'column_exists': [
+                sql.column_exists(cr, 'test_sql_a', 'name'),
+                sql.column_exists(cr, 'test_sql_a', 'missing'),
+                sql.column_exists(cr, 'test_sql_missing', 'id'),
+            ],
+            'constraints': [
+                sql.constraint_definition(cr, 'test_sql_a', 'test_sql_a_name_uniq'),
+                sql.constraint_definition(cr, 'test_sql_a', 'test_sql_a_missing'),
+            ],
+            'foreign_keys': sql.existing_foreign_keys(cr, TABLES),
+            'indexes': {
+                name: table
+                for name, table in sql.existing_indexes(cr, TABLES).items()
+            },
+        }
+
+    def test_snapshot_matches_catalog(self):
+        expected = self.describe()
+        self.assertEqual(expected['tables'], ['test_sql_a', 'test_sql_b', 'test_sql_v'])
+        self.assertEqual(expected['kinds'], ['r', 'r', 'v', None])
+        self.assertEqual(expected['column_exists'], [1, 0, 0])
+        self.assertEqual(expected['constraints'], ['unique(name)', None])
+        self.assertEqual(expected['columns'][0]['name']['character_maximum_length'], 16)
+        self.assertEqual(expected['columns'][0]['name']['is_nullable'], 'NO')
+        self.assertEqual(
+            expected['foreign_keys'][('test_sql_a', 'b_id')][1:],
+            ('test_sql_b', 'id', 'c'),
+        )
+        self.assertEqual(expected['indexes']['test_sql_a_b_id_index'], 'test_sql_a')
+
+        sql.load_schema_snapshot(self.cr, TABLES)
+        count = self.cr.sql_log_count
+        self.assertEqual(self.describe(), expected)
+        # everything was read from the snapshot
+        self.assertEqual(self.cr.sql_log_count, count)
+
+    def test_helpers_drop_modified_table(self):
+        cr = self.cr
+        sql.load_schema_snapshot(cr, TABLES)
+
+        sql.create_column(cr, 'test_sql_a', 'code', 'VARCHAR')
+        self.assertNotIn('test_sql_a', cr.cache['schema_snapshot'])
+        self.assertIn('test_sql_b', cr.cache['schema_snapshot'])
+        self.assertTrue(sql.column_exists(cr, 'test_sql_a', 'code'))
+
+        sql.load_schema_snapshot(cr, TABLES)
+        sql.rename_column(cr, 'test_sql_a', 'code', 'ref')
+        self.assertFalse(sql.column_exists(cr, 'test_sql_a', 'code'))
+        self.assertTrue(sql.column_exists(cr, 'test_sql_a', 'ref'))
+
+        sql.load_schema_snapshot(cr, TABLES)
+        sql.drop_not_null(cr, 'test_sql_a', 'name')
+        self.assertEqual(sql.table_columns(cr, 'test_sql_a')['name']['is_nullable'], 'YES')
+
+        sql.load_schema_snapshot(cr, TABLES)
+        sql.add_constraint(cr, 'test_sql_a', 'test_sql_a_ref_uniq', 'unique(ref)')
+        self.assertEqual(sql.constraint_definition(cr, 'test_sql_a', 'test_sql_a_ref_uniq'), 'unique(ref)')
+
+        sql.load_schema_snapshot(cr, TABLES)
+        sql.drop_constraint(cr, 'test_sql_a', 'test_sql_a_ref_uniq')
+        self.assertIsNone(sql.constraint_definition(cr, 'test_sql_a', 'test_sql_a_ref_uniq'))
+
+        sql.load_schema_snapshot(cr, TABLES)
+        sql.create_model_table(cr, 'test_sql_missing')
+        self.assertEqual(sql.table_kind(cr, 'test_sql_missing'), 'r')
+
+        sql.load_schema_snapshot(cr, TABLES)
+        sql.add_foreign_key(cr, 'test_sql_missing', 'id', 'test_sql_b', 'id', 'restrict')
+        self.assertIn(('test_sql_missing', 'id'), sql.existing_foreign_keys(cr, TABLES))
+
+    def test_raw_changes(self):
+        cr = self.cr
+        sql.load_schema_snapshot(cr, TABLES)
+        cr.execute('ALTER TABLE test_sql_a ADD COLUMN raw INTEGER')
+        # the snapshot does not see changes made with raw queries...
+        self.assertFalse(sql.column_exists(cr, 'test_sql_a', 'raw'))
+        # ...until the table is dropped from it
+        sql.drop_schema_snapshot(cr, 'test_sql_a')
+        self.assertTrue(sql.column_exists(cr, 'test_sql_a', 'raw'))
+
+    def test_init_models_overrides(self):
+        """ The overrides of _auto_init() and init() may change the tables of
+        their model with raw queries. """
+        cr = self.cr
+        Groups = type(self.env['res.groups'])
+        seen = []
+
+        def _auto_init(model):
+            cr.execute('ALTER TABLE res_groups ADD COLUMN test_sql_raw INTEGER')
+            seen.append(sql.column_exists(cr, 'res_groups', 'test_sql_raw'))
+            return BaseModel._auto_init(model)
+
+        def init(model):
+            seen.append(sql.column_exists(cr, 'res_groups', 'test_sql_raw'))
+            cr.execute('ALTER TABLE res_groups_implied_rel ADD COLUMN test_sql_raw INTEGER')
+
+        self.patch(Groups, '_auto_init', _auto_init)
+        self.patch(Groups, 'init', init)
+        self.registry.init_models(cr, ['res.groups', 'res.users'], {'module': 'base'}, install=False)
+
+        self.assertEqual(seen, [1, 1])
+        self.assertNotIn('schema_snapshot', cr.cache)
+        self.assertTrue(sql.column_exists(cr, 'res_groups_implied_rel', 'test_sql_raw'))
+
+    def test_init_models_reload(self):
+        """ Only the tables dropped for an override are reloaded after it. """
+        cr = self.cr
+        Groups = type(self.env['res.groups'])
+        self.patch(Groups, 'init', lambda model: None)
+
+        loaded = []
+        load_schema_snapshot = sql.load_schema_snapshot
+        def load(cr, tablenames):
+            loaded.append(set(tablenames))
+            return load_schema_snapshot(cr, tablenames)
+        self.patch(sql, 'load_schema_snapshot', load)
+
+        self.registry.init_models(cr, ['res.groups', 'res.users'], {'module': 'base'}, install=False)
+
+        groups = self.env['res.groups']
+        expected = {groups._table} | {
+            field.relation
+            for field in groups._fields.values()
+            if field.type == 'many2many' and field.store
+        }
+        # the first load is the whole snapshot, then res.groups is initialized
+        self.assertIn('res_users', loaded[0])
+        self.assertEqual(loaded[1], expected)
+
+    def test_load_merges_snapshot(self):
+        cr = self.cr
+        sql.load_schema_snapshot(cr, ['test_sql_a'])
+        sql.load_schema_snapshot(cr, ['test_sql_b'])
+        self.assertIn('test_sql_a', cr.cache['schema_snapshot'])
+        self.assertIn('test_sql_b', cr.cache['schema_snapshot'])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+import threading
+import time
+from unittest.mock import patch
+
+from wdoo.sql_db import ConnectionPool, PoolError
+from wdoo.tests.common import BaseCase
+
+
+class FakeConnection:
+    closed = False
+    dsn = 'fake'
+
+    def reset(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch('psycopg2.connect', lambda **kw: FakeConnection())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait_for_waiters(self, pool, count):
+        deadline = time.time() + 5
+        while len(pool._available._waiters) < count:
+            self.assertLess(time.time(), deadline, "the pool has no waiter")
+            time.sleep(0.01)
+
+    def test_full_pool_without_waiting(self):
+        pool = ConnectionPool(maxconn=1)
+        pool.borrow({'database': 'db1'})
+        with self.assertRaisesRegex(PoolError, 'The Connection Pool Is Full'):
+            pool.borrow({'database': 'db2'})
+
+    def test_wait_timeout(self):
+        pool = ConnectionPool(maxconn=2, wait_timeout=0.1, maxconn_per_db=1)
+        pool.borrow({'database': 'db1'})
+        with self.assertRaisesRegex(PoolError, 'The Connection Pool Is Full'):
+            pool.borrow({'database': 'db1'})
+        # the other database is not limited
+        pool.borrow({'database': 'db2'})
+
+    def test_give_back_wakes_waiter_of_other_database(self):
+        db1, db2 = {'database': 'db1'}, {'database': 'db2'}
+        pool = ConnectionPool(maxconn=2, wait_timeout=5, maxconn_per_db=1)
+        cnx1 = pool.borrow(db1)
+        cnx2 = pool.borrow(db2)
+
+        borrowed = {}
+
+        def borrow(name, connection_info):
+            borrowed[name] = pool.borrow(connection_info)
+
+        # a waiter for db2 waits first, then a waiter for db1
+        waiter2 = threading.Thread(target=borrow, args=('db2', db2))
+        waiter2.start()
+        self.wait_for_waiters(pool, 1)
+        waiter1 = threading.Thread(target=borrow, args=('db1', db1))
+        waiter1.start()
+        self.wait_for_waiters(pool, 2)
+
+        # the connection to db1 is given to its waiter, although the waiter
+        # of db2 is the first one waiting
+        pool.give_back(cnx1)
+        waiter1.join(2)
+        self.assertFalse(waiter1.is_alive(), "the waiter of db1 did not get the connection")
+        self.assertIs(borrowed['db1'], cnx1)
+        self.assertNotIn('db2', borrowed)
+
+        pool.give_back(cnx2)
+        waiter2.join(2)
+        self.assertFalse(waiter2.is_alive())
+        self.assertIs(borrowed['db2'], cnx2)
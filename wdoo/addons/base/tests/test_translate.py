@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+
+from wdoo.tests.common import TransactionCase
+from wdoo.tools import translate
+from wdoo.tools.translate import _
+
+
+def translate_term(self, source):
+    """ Translate ``source`` like a method of the model ``self``. """
+    return _(source)
+
+
+def translate_term_with_context(self, context, source):
+    """ Translate ``source`` like a method of the model ``self`` with a context. """
+    return _(source)
+
+
+class TestCodeTranslations(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.env['res.lang']._activate_lang('fr_FR')
+        self.translation = self.env['ir.translation'].create({
+            'type': 'code',
+            'name': 'addons/base/tests/test_translate.py',
+            'module': 'base',
+            'lang': 'fr_FR',
+            'src': 'Test Code Term',
+            'value': 'Terme de code de test',
+            'state': 'translated',
+        })
+
+    def test_catalog(self):
+        IrTranslation = self.env['ir.translation']
+        catalog = IrTranslation._get_code_translations('fr_FR')
+        self.assertEqual(catalog.get('Test Code Term'), 'Terme de code de test')
+
+        # the terms are looked up in the catalog, without any query
+        count = self.cr.sql_log_count
+        self.assertEqual(IrTranslation._get_source(None, ('code',), 'fr_FR', 'Test Code Term'), 'Terme de code de test')
+        self.assertEqual(IrTranslation._get_source(None, ('code',), 'fr_FR', 'Test Missing Term'), 'Test Missing Term')
+        self.assertEqual(self.cr.sql_log_count, count)
+
+        # the catalog is reloaded when translations are modified
+        self.translation.value = 'Autre terme de test'
+        self.assertEqual(IrTranslation._get_source(None, ('code',), 'fr_FR', 'Test Code Term'), 'Autre terme de test')
+
+    def test_fast_path(self):
+        """ The language of _() in a model method is the one of its environment. """
+        frames = []
+        _get_lang = translate.GettextAlias._get_lang
+        def get_lang(alias, frame):
+            frames.append(frame)
+            return _get_lang(alias, frame)
+        self.patch(translate.GettextAlias, '_get_lang', get_lang)
+
+        partner = self.env['res.partner'].with_context(lang='fr_FR')
+        self.assertEqual(translate_term(partner, 'Test Code Term'), 'Terme de code de test')
+        self.assertEqual(translate_term(partner.with_context(lang='en_US'), 'Test Code Term'), 'Test Code Term')
+        self.assertEqual(frames, [])
+
+        # a context in the caller's frame takes precedence over the environment
+        self.assertEqual(
+            translate_term_with_context(partner.with_context(lang='en_US'), {'lang': 'fr_FR'}, 'Test Code Term'),
+            'Terme de code de test',
+        )
+        self.assertEqual(len(frames), 1)
@@ -36,7 +36,8 @@ from wdoo.modules import get_resource_path, module
 from wdoo.tools import html_escape, pycompat, ustr, apply_inheritance_specs, lazy_property, float_repr, osutil
 from wdoo.tools.mimetypes import guess_mimetype
 from wdoo.tools.translate import _
-from wdoo.tools.misc import str2bool, xlsxwriter, file_open, file_path
+from wdoo.tools import misc
+from wdoo.tools.misc import str2bool, file_open, file_path, split_every
 from wdoo.tools.safe_eval import safe_eval, time
 from wdoo import http
 from wdoo.http import content_disposition, dispatch_rpc, request, serialize_exception as _serialize_exception
@@ -52,6 +53,24 @@ DBNAME_PATTERN = '^[a-zA-Z0-9][a-zA-Z0-9_.-]+$'
 
 COMMENT_PATTERN = r'Modified by [\s\w\-.]+ from [\s\w\-.]+'
 
+# number of records read at once when exporting data
+EXPORT_CHUNK_SIZE = 1000
+
+def stream_file_response(fp, headers):
+    """ Return a response sending the content of the binary file ``fp`` by
+    chunks; the file is closed once sent.
+    """
+    fp.seek(0, 2)
+    size = fp.tell()
+    fp.seek(0)
+    response = request.make_response(
+        werkzeug.wsgi.wrap_file(request.httprequest.environ, fp),
+        headers=headers + [('Content-Length', size)],
+    )
+    response.direct_passthrough = True
+    return response
+
+
 def none_values_filtered(func):
     @functools.wraps(func)
     def wrap(iterable):
@@ -680,18 +699,23 @@ class ExportXlsxWriter:
 
     def __init__(self, field_names, row_count=0):
         self.field_names = field_names
-        self.output = io.BytesIO()
-        self.workbook = xlsxwriter.Workbook(self.output, {'in_memory': True})
+        # Rows are written in order: in constant memory mode, xlsxwriter
+        # flushes each row to disk instead of keeping the sheet in memory, and
+        # the resulting file is a temporary file streamed to the client.
+        self.output = tempfile.TemporaryFile()
+        self.workbook = misc.xlsxwriter.Workbook(self.output, {'constant_memory': True})
         self.base_style = self.workbook.add_format({'text_wrap': True})
         self.header_style = self.workbook.add_format({'bold': True})
         self.header_bold_style = self.workbook.add_format({'text_wrap': True, 'bold': True, 'bg_color': '#e9ecef'})
         self.date_style = self.workbook.add_format({'text_wrap': True, 'num_format': 'yyyy-mm-dd'})
         self.datetime_style = self.workbook.add_format({'text_wrap': True, 'num_format': 'yyyy-mm-dd hh:mm:ss'})
         self.worksheet = self.workbook.add_worksheet()
-        self.value = False
 
         if row_count > self.worksheet.xls_rowmax:
-            raise UserError(_('There are too many rows (%s rows, limit: %s) to export as Excel 2007-2013 (.xlsx) format. Consider splitting the export.') % (row_count, self.worksheet.xls_rowmax))
+            self._raise_too_many_rows(row_count)
+
+    def _raise_too_many_rows(self, row_count):
+        raise UserError(_('There are too many rows (%s rows, limit: %s) to export as Excel 2007-2013 (.xlsx) format. Consider splitting the export.') % (row_count, self.worksheet.xls_rowmax))
 
     def __enter__(self):
         self.write_header()
@@ -708,10 +732,23 @@ class ExportXlsxWriter:
 
     def close(self):
         self.workbook.close()
+        self.output.seek(0)
+
+    @lazy_property
+    def value(self):
+        """ The content of the file, loaded in memory. Prefer streaming
+        :attr:`output` for large files.
+        """
         with self.output:
-            self.value = self.output.getvalue()
+            self.output.seek(0)
+            return self.output.read()
 
     def write(self, row, column, cell_value, style=None):
+        # the row count given at creation may be a lower bound of the rows
+        # actually written; xlsxwriter silently ignores the rows beyond its
+        # limit
+        if row >= self.worksheet.xls_rowmax:
+            self._raise_too_many_rows(row + 1)
         self.worksheet.write(row, column, cell_value, style)
 
     def write_cell(self, row, column, cell_value):
@@ -826,15 +863,15 @@ class Home(http.Controller):
         :param unique: this parameters is not used, but mandatory: it is used by the HTTP stack to make a unique request
         :return: the menus (including the images in Base64)
         """
-        menus = request.env["ir.ui.menu"].load_web_menus(request.session.debug)
-        body = json.dumps(menus, default=ustr)
+        body, body_hash = request.env["ir.ui.menu"]._load_web_menus_json(request.session.debug)
         response = request.make_response(body, [
             # this method must specify a content-type application/json instead of using the default text/html set because
             # the type of the route is set to HTTP, but the rpc is made with a get and expects JSON
             ('Content-Type', 'application/json'),
-            ('Cache-Control', 'public, max-age=' + str(CONTENT_MAXAGE)),
+            ('Cache-Control', 'public'),
         ])
-        return response
+        # answer 304 Not Modified to clients already having the same menus
+        return make_conditional(response, etag=body_hash, max_age=CONTENT_MAXAGE)
 
     def _login_redirect(self, uid, redirect=None):
         return _get_login_redirect_url(uid, redirect)
@@ -987,21 +1024,18 @@ class WebClient(http.Controller):
         elif mods is None:
             mods = list(request.env.registry._init_modules) + (wdoo.conf.server_wide_modules or [])
 
-        translations_per_module, lang_params = request.env["ir.translation"].get_translations_for_webclient(mods, lang)
+        # the document is built once per set of modules and language, and its
+        # hash is the one given to the web client in the session info
+        body, body_hash = request.env["ir.translation"].get_web_translations(mods, lang)
 
-        body = json.dumps({
-            'lang': lang,
-            'lang_parameters': lang_params,
-            'modules': translations_per_module,
-            'multi_lang': len(request.env['res.lang'].sudo().get_installed()) > 1,
-        })
         response = request.make_response(body, [
             # this method must specify a content-type application/json instead of using the default text/html set because
             # the type of the route is set to HTTP, but the rpc is made with a get and expects JSON
             ('Content-Type', 'application/json'),
-            ('Cache-Control', 'public, max-age=' + str(CONTENT_MAXAGE)),
+            ('Cache-Control', 'public'),
         ])
-        return response
+        # answer 304 Not Modified to clients already having the same translations
+        return make_conditional(response, etag=body_hash, max_age=CONTENT_MAXAGE)
 
     @http.route('/web/webclient/version_info', type='json', auth="none")
     def version_info(self):
@@ -1569,7 +1603,7 @@ class Export(http.Controller):
         :rtype: [(str, str)]
         """
         return [
-            {'tag': 'xlsx', 'label': 'XLSX', 'error': None if xlsxwriter else "XlsxWriter 0.9.3 required"},
+            {'tag': 'xlsx', 'label': 'XLSX', 'error': None if misc.xlsxwriter else "XlsxWriter 0.9.3 required"},
             {'tag': 'csv', 'label': 'CSV'},
         ]
 
@@ -1703,6 +1737,29 @@ class Export(http.Controller):
             (prefix + '/' + k, prefix_string + '/' + v)
             for k, v in self.fields_info(model, export_fields).items())
 
+class ExportRows(object):
+    """ Lazy iterable of the exported rows of ``records``, read by chunks of
+    records so that the whole export never stays in memory.
+
+    Its length is the number of records, which is a lower bound of the number
+    of rows when one2many fields are exported.
+    """
+    def __init__(self, records, field_names, chunk_size=EXPORT_CHUNK_SIZE):
+        self.records = records
+        self.field_names = field_names
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        for ids in split_every(self.chunk_size, self.records.ids):
+            yield from self.records.browse(ids).export_data(self.field_names).get('datas', [])
+            # drop the values read for the chunk from the cache, including the
+            # ones of the related records
+            self.records.invalidate_cache()
+
+
 class ExportFormat(object):
 
     @property
@@ -1729,9 +1786,9 @@ class ExportFormat(object):
         current export class outputs
 
         :params list fields: a list of fields to export
-        :params list rows: a list of records to export
-        :returns:
-        :rtype: bytes
+        :params rows: an iterable of records to export, see :class:`ExportRows`
+        :returns: the content, or a binary file object positioned at its start
+        :rtype: bytes or file
         """
         raise NotImplementedError()
 
@@ -1770,16 +1827,17 @@ class ExportFormat(object):
             Model = Model.with_context(import_compat=import_compat)
             records = Model.browse(ids) if ids else Model.search(domain, offset=0, limit=False, order=False)
 
-            export_data = records.export_data(field_names).get('datas',[])
+            export_data = ExportRows(records, field_names)
             response_data = self.from_data(columns_headers, export_data)
 
         # TODO: call `clean_filename` directly in `content_disposition`?
-        return request.make_response(response_data,
-            headers=[('Content-Disposition',
-                            content_disposition(
-                                osutil.clean_filename(self.filename(model) + self.extension))),
-                     ('Content-Type', self.content_type)],
-        )
+        headers = [
+            ('Content-Disposition', content_disposition(osutil.clean_filename(self.filename(model) + self.extension))),
+            ('Content-Type', self.content_type),
+        ]
+        if isinstance(response_data, bytes):
+            return request.make_response(response_data, headers=headers)
+        return stream_file_response(response_data, headers)
 
 class CSVExport(ExportFormat, http.Controller):
 
@@ -1800,7 +1858,7 @@ class CSVExport(ExportFormat, http.Controller):
         raise UserError(_("Exporting grouped data to csv is not supported."))
 
     def from_data(self, fields, rows):
-        fp = io.BytesIO()
+        fp = tempfile.TemporaryFile()
         writer = pycompat.csv_writer(fp, quoting=1)
 
         writer.writerow(fields)
@@ -1815,7 +1873,8 @@ class CSVExport(ExportFormat, http.Controller):
                 row.append(pycompat.to_text(d))
             writer.writerow(row)
 
-        return fp.getvalue()
+        fp.seek(0)
+        return fp
 
 class ExcelExport(ExportFormat, http.Controller):
 
@@ -1838,7 +1897,7 @@ class ExcelExport(ExportFormat, http.Controller):
             for group_name, group in groups.children.items():
                 x, y = xlsx_writer.write_group(x, y, group_name, group)
 
-        return xlsx_writer.value
+        return xlsx_writer.output
 
     def from_data(self, fields, rows):
         with ExportXlsxWriter(fields, len(rows)) as xlsx_writer:
@@ -1848,5 +1907,5 @@ class ExcelExport(ExportFormat, http.Controller):
                         cell_value = pycompat.to_text(cell_value)
                     xlsx_writer.write_cell(row_index + 1, cell_index, cell_value)
 
-        return xlsx_writer.value
+        return xlsx_writer.output
 
@@ -2,26 +2,27 @@
 # Part of Wdoo. See LICENSE file for full copyright and licensing details.
 
 from collections import deque
-import io
 import json
+import tempfile
 
 from wdoo import http, _
 from wdoo.http import content_disposition, request
-from wdoo.tools import ustr, osutil
-from wdoo.tools.misc import xlsxwriter
+from wdoo.tools import misc, ustr, osutil
+from .main import stream_file_response
 
 
 class TableExporter(http.Controller):
 
     @http.route('/web/pivot/check_xlsxwriter', type='json', auth='none')
     def check_xlsxwriter(self):
-        return xlsxwriter is not None
+        return misc.xlsxwriter is not None
 
     @http.route('/web/pivot/export_xlsx', type='http', auth="user")
     def export_xlsx(self, data, **kw):
         jdata = json.loads(data)
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        # the sheet is written row by row: flush rows to disk as they are done
+        output = tempfile.TemporaryFile()
+        workbook = misc.xlsxwriter.Workbook(output, {'constant_memory': True})
         worksheet = workbook.add_worksheet(jdata['title'])
 
         header_bold = workbook.add_format({'bold': True, 'pattern': 1, 'bg_color': '#AAAAAA'})
@@ -101,11 +102,8 @@ class TableExporter(http.Controller):
             x, y = 0, y + 1
 
         workbook.close()
-        xlsx_data = output.getvalue()
         filename = osutil.clean_filename(_("Pivot %(title)s (%(model_name)s)", title=jdata['title'], model_name=jdata['model']))
-        response = request.make_response(xlsx_data,
+        return stream_file_response(output,
             headers=[('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
                     ('Content-Disposition', content_disposition(filename + '.xlsx'))],
         )
-
-        return response
@@ -2,13 +2,11 @@
 # Part of Wdoo. See LICENSE file for full copyright and licensing details.
 
 import base64
-import hashlib
-import json
 
 import wdoo
 from wdoo import api, http, models
 from wdoo.http import request
-from wdoo.tools import file_open, image_process, ustr
+from wdoo.tools import file_open, image_process
 
 from wdoo.addons.web.controllers.main import HomeStaticTemplateHelpers
 
@@ -32,9 +30,12 @@ class Http(models.AbstractModel):
             'web.max_file_upload_size',
             default=128 * 1024 * 1024,  # 128MiB
         ))
+        # same modules as the default of /web/webclient/translations, so that
+        # the hash changes with the translations the web client loads
         mods = wdoo.conf.server_wide_modules or []
+        translation_mods = list(self.env.registry._init_modules) + mods
         lang = user_context.get("lang")
-        translation_hash = request.env['ir.translation'].sudo().get_web_translations_hash(mods, lang)
+        translation_hash = request.env['ir.translation'].sudo().get_web_translations_hash(translation_mods, lang)
         session_info = {
             "uid": request.session.uid,
             "is_system": user._is_system() if request.session.uid else False,
@@ -67,11 +68,10 @@ class Http(models.AbstractModel):
             if request.db:
                 mods = list(request.registry._init_modules) + mods
             qweb_checksum = HomeStaticTemplateHelpers.get_qweb_templates_checksum(debug=request.session.debug, bundle="web.assets_qweb")
-            menus = request.env['ir.ui.menu'].load_menus(request.session.debug)
-            ordered_menus = {str(k): v for k, v in menus.items()}
-            menu_json_utf8 = json.dumps(ordered_menus, default=ustr, sort_keys=True).encode()
+            # same document as /web/webclient/load_menus, built once per group set
+            menus_hash = request.env['ir.ui.menu']._load_web_menus_json(request.session.debug)[1]
             session_info['cache_hashes'].update({
-                "load_menus": hashlib.sha512(menu_json_utf8).hexdigest()[:64], # sha512/256
+                "load_menus": menus_hash,
                 "qweb": qweb_checksum,
             })
             session_info.update({
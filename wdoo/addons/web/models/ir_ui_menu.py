@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 # Part of Wdoo. See LICENSE file for full copyright and licensing details.
 
-from wdoo import models
+import hashlib
+import json
+
+from wdoo import models, tools
+from wdoo.tools import ustr
 
 
 class IrUiMenu(models.Model):
@@ -59,3 +63,11 @@ class IrUiMenu(models.Model):
                 }
 
         return web_menus
+
+    @tools.ormcache_context('frozenset(self.env.user.groups_id.ids)', 'debug', keys=('lang',))
+    def _load_web_menus_json(self, debug):
+        """ Return the menus of :meth:`load_web_menus` serialized in JSON, and
+        the hash of the result, shared by the users having the same groups.
+        """
+        body = json.dumps(self.load_web_menus(debug), default=ustr)
+        return body, hashlib.sha512(body.encode()).hexdigest()[:64]  # sha512/256
@@ -8,3 +8,6 @@ from . import test_serving_base
 from . import test_click_everywhere
 from . import test_load_menus
 from . import test_assets
+from . import test_export
+from . import test_warmup
+from . import test_webclient_cache
@@ -1,13 +1,19 @@
 # Part of Wdoo. See LICENSE file for full copyright and licensing details.
 
 import logging
+import os
+import tempfile
 import time
 
 import wdoo
 import wdoo.tests
 
+from wdoo.addons.base.models import assetsbundle
+from wdoo.addons.base.models.assetsbundle import AssetsBundle, ScssStylesheetAsset
+from wdoo.cli.assets import Assets
 from wdoo.modules.module import read_manifest
 from wdoo.tools import mute_logger
+from wdoo.tools.lru import LRU
 
 _logger = logging.getLogger(__name__)
 
@@ -61,3 +67,89 @@ class TestAssetsGenerateTime(TestAssetsGenerateTimeCommon):
         for bundle, duration in self.generate_bundles():
             threshold = 2
             self.assertLess(duration, threshold, "Bundle %r took more than %s sec" % (bundle, threshold))
+
+
+class TestAssetsCompilationCache(wdoo.tests.TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.patch(assetsbundle, '_compilation_cache', LRU(16))
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.include_path = tmpdir.name
+        self.variables = os.path.join(self.include_path, '_variables.scss')
+        with open(self.variables, 'w') as f:
+            f.write('$color: red;')
+        self.patch(ScssStylesheetAsset, 'include_paths', [self.include_path])
+
+        # the compiler only keeps the source, which contains the asset ids
+        self.compiled = []
+        def compile(asset, source):
+            self.compiled.append(source)
+            return source
+        self.patch(ScssStylesheetAsset, 'compile', compile)
+
+    def compile_css(self, content):
+        bundle = AssetsBundle('test.bundle', [{
+            'atype': 'text/scss', 'url': '/test/static/a.scss', 'filename': None,
+            'content': content, 'media': None,
+        }], env=self.env, js=False)
+        [asset] = bundle.stylesheets
+        result = bundle.compile_css(asset.compile, asset.get_source())
+        self.assertFalse(bundle.css_errors)
+        # the ids of the assets of the bundle are in the result, even if cached
+        self.assertIn('/*! %s */' % asset.id, result)
+        return result
+
+    def test_cache_hit(self):
+        self.compile_css('a { color: $color; }')
+        self.assertEqual(len(self.compiled), 1)
+        self.compile_css('a { color: $color; }')
+        self.assertEqual(len(self.compiled), 1, "the same source should not be compiled again")
+
+    def test_cache_invalidation(self):
+        self.compile_css('a { color: $color; }')
+        self.compile_css('b { color: $color; }')
+        self.assertEqual(len(self.compiled), 2, "a modified source should be compiled")
+
+        # modify a file of the include path
+        mtime = os.path.getmtime(self.variables) + 10
+        os.utime(self.variables, (mtime, mtime))
+        self.compile_css('b { color: $color; }')
+        self.assertEqual(len(self.compiled), 3, "a modified include path should invalidate the cache")
+
+        # a new file in the include path
+        with open(os.path.join(self.include_path, '_mixins.scss'), 'w') as f:
+            f.write('')
+        self.compile_css('b { color: $color; }')
+        self.assertEqual(len(self.compiled), 4, "a modified include path should invalidate the cache")
+        self.compile_css('b { color: $color; }')
+        self.assertEqual(len(self.compiled), 4)
+
+
+@wdoo.tests.tagged('post_install', '-at_install')
+class TestAssetsCommand(wdoo.tests.TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        # the command opens its own cursors on the registry
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+
+    def test_build_bundle(self):
+        command = Assets()
+        name, _timing, sizes, error = command.build_bundle(self.registry, 'web.assets_common', 'en_US')
+        self.assertIsNone(error)
+        self.assertEqual(name, 'web.assets_common (ltr)')
+        self.assertEqual(sorted(extension for extension, _size in sizes), ['min.css', 'min.js'])
+        self.assertTrue(all(size for _extension, size in sizes))
+
+        attachments = self.env['ir.attachment'].search([('name', 'in', [
+            'web.assets_common.min.js', 'web.assets_common.min.css',
+        ])])
+        self.assertEqual(len(attachments), 2)
+
+        # the other directions only build the stylesheets
+        name, _timing, sizes, error = command.build_bundle(self.registry, 'web.assets_common', 'en_US', js=False)
+        self.assertIsNone(error)
+        self.assertEqual([extension for extension, _size in sizes], ['min.css'])
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Part of Wdoo. See LICENSE file for full copyright and licensing details.
+
+from wdoo.exceptions import UserError
+from wdoo.tests.common import TransactionCase
+from ..controllers import main
+
+
+class TestExport(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        Partner = self.env['res.partner']
+        self.partners = Partner.create([{
+            'name': 'Parent A',
+            'child_ids': [(0, 0, {'name': 'Child %s' % i}) for i in range(3)],
+        }, {
+            'name': 'Parent B',
+        }])
+        self.field_names = ['name', 'child_ids/name']
+
+    def test_export_rows(self):
+        rows = main.ExportRows(self.partners, self.field_names, chunk_size=1)
+        self.assertEqual(len(rows), 2)
+        # one row per child of the first partner, one for the second partner
+        self.assertEqual(list(rows), [
+            ['Parent A', 'Child 0'],
+            ['', 'Child 1'],
+            ['', 'Child 2'],
+            ['Parent B', ''],
+        ])
+
+        # the records read for the export, related ones included, are no
+        # longer in cache
+        name = self.env['res.partner']._fields['name']
+        for partner in self.partners | self.partners.child_ids:
+            self.assertFalse(self.env.cache.contains(partner, name))
+
+    def test_xlsx_row_limit(self):
+        init = main.ExportXlsxWriter.__init__
+
+        def __init__(writer, *args, **kwargs):
+            init(writer, *args, **kwargs)
+            writer.worksheet.xls_rowmax = 4
+
+        self.patch(main.ExportXlsxWriter, '__init__', __init__)
+        headers = ['Name', 'Contacts/Name']
+
+        # the header and the 4 rows of 2 records exceed the limit
+        rows = main.ExportRows(self.partners, self.field_names)
+        with self.assertRaisesRegex(UserError, 'too many rows'):
+            main.ExcelExport().from_data(headers, rows)
+
+        rows = main.ExportRows(self.partners[1], self.field_names)
+        output = main.ExcelExport().from_data(headers, rows)
+        self.assertTrue(output.read())
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Part of Wdoo. See LICENSE file for full copyright and licensing details.
+
+import os
+
+import wdoo
+from wdoo.service import server
+from wdoo.tests.common import TransactionCase
+
+
+class TestWarmup(TransactionCase):
+
+    def test_warmup_registries(self):
+        self.registry.clear_caches()
+        server.warmup_registries([self.env.cr.dbname])
+
+        def fail(*args, **kwargs):
+            raise AssertionError("The cache has not been warmed up")
+
+        # the requests of the web client hit the caches filled by the warmup
+        Menu = type(self.env['ir.ui.menu'])
+        self.patch(Menu, 'load_web_menus', fail)
+        self.patch(Menu, 'get_user_roots', fail)
+        self.patch(type(self.env['ir.translation']), 'get_translations_for_webclient', fail)
+
+        admin = self.env.ref('base.user_admin')
+        menus = self.env['ir.ui.menu'].with_user(admin).with_context(lang=admin.lang)
+        menus._load_web_menus_json('')
+        menus.load_menus('')
+
+        mods = list(self.registry._init_modules) + (wdoo.conf.server_wide_modules or [])
+        for lang, _name in self.env['res.lang'].get_installed():
+            self.env['ir.translation'].get_web_translations(mods, lang)
+
+    def test_memory_report(self):
+        prefork = server.PreforkServer(None)
+        prefork.workers = {os.getpid(): server.WorkerHTTP.__new__(server.WorkerHTTP)}
+
+        # the memory of the workers is reported once per interval
+        prefork.memory_report_time = 0
+        with self.assertLogs('wdoo.service.server', 'INFO') as capture:
+            prefork.process_memory_report()
+        self.assertIn('1 workers, private memory:', capture.output[0])
+        self.assertIn('shared memory:', capture.output[0])
+        self.assertGreater(prefork.memory_report_time, 0)
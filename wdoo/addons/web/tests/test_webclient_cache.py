@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Part of Wdoo. See LICENSE file for full copyright and licensing details.
+
+from wdoo.tests.common import HttpCase, TransactionCase, new_test_user
+
+
+class TestWebClientCache(TransactionCase):
+
+    def test_menus_per_group_set(self):
+        group = self.env['res.groups'].create({'name': 'Test Menu Cache'})
+        self.env['ir.ui.menu'].create({
+            'name': 'Test Menu Cache',
+            'groups_id': [(6, 0, group.ids)],
+            'action': 'ir.actions.act_window,%d' % self.env.ref('base.action_res_users').id,
+        })
+        user1 = new_test_user(self.env, login='test_menu_cache_1')
+        user2 = new_test_user(self.env, login='test_menu_cache_2')
+        user3 = new_test_user(self.env, login='test_menu_cache_3')
+        user3.groups_id += group
+
+        Menu = self.env['ir.ui.menu']
+        body1, hash1 = Menu.with_user(user1)._load_web_menus_json('')
+        self.assertNotIn('Test Menu Cache', body1)
+        # the menus of another group set are not the same
+        body3, hash3 = Menu.with_user(user3)._load_web_menus_json('')
+        self.assertIn('Test Menu Cache', body3)
+        self.assertNotEqual(hash3, hash1)
+
+        # users with the same groups share the same cached menus
+        def load_web_menus(self, debug):
+            raise AssertionError("The menus are not shared")
+        self.patch(type(Menu), 'load_web_menus', load_web_menus)
+        self.assertEqual(Menu.with_user(user2)._load_web_menus_json(''), (body1, hash1))
+
+    def test_web_translations_invalidation(self):
+        Translation = self.env['ir.translation']
+        body, body_hash = Translation.get_web_translations(['base'], 'en_US')
+        self.assertNotIn('Test Web Translation', body)
+
+        translation = Translation.create({
+            'type': 'code',
+            'name': 'addons/base/static/src/test_web_translation.js',
+            'module': 'base',
+            'lang': 'en_US',
+            'src': 'Test Web Translation',
+            'value': 'Test Web Translation Value',
+            'comments': 'openerp-web',
+        })
+        body2, body_hash2 = Translation.get_web_translations(['base'], 'en_US')
+        self.assertIn('Test Web Translation Value', body2)
+        self.assertNotEqual(body_hash2, body_hash)
+
+        translation.value = 'Test Web Translation Other Value'
+        body3, body_hash3 = Translation.get_web_translations(['base'], 'en_US')
+        self.assertIn('Test Web Translation Other Value', body3)
+        self.assertNotEqual(body_hash3, body_hash2)
+
+        translation.unlink()
+        self.assertEqual(Translation.get_web_translations(['base'], 'en_US'), (body, body_hash))
+
+
+class TestWebClientConditional(HttpCase):
+
+    def assertNotModified(self, url):
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+        # a client having other content gets the new one
+        response = self.url_open(url, headers={'If-None-Match': '"other"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_load_menus_not_modified(self):
+        self.authenticate('admin', 'admin')
+        self.assertNotModified('/web/webclient/load_menus/1234')
+
+    def test_translations_not_modified(self):
+        self.assertNotModified('/web/webclient/translations/1234?lang=en_US')
@@ -511,6 +511,36 @@ class Environment(Mapping):
                 raise ValueError('No record found for unique ID %s. It may have been deleted.' % (xml_id))
         return None
 
+    def refs(self, xml_ids, raise_if_not_found=True):
+        """Return the records corresponding to the given ``xml_ids``, in the
+        same order, resolving them at once. Missing records are ``None`` unless
+        ``raise_if_not_found`` is set.
+        """
+        found = self['ir.model.data']._xmlids_to_res_model_res_ids(xml_ids)
+
+        # check the existence of the records once per model
+        ids_by_model = defaultdict(list)
+        for res_model, res_id in found.values():
+            ids_by_model[res_model].append(res_id)
+        existing = {
+            (res_model, res_id)
+            for res_model, ids in ids_by_model.items()
+            for res_id in self[res_model].browse(ids).exists()._ids
+        }
+
+        result = []
+        for xml_id in xml_ids:
+            res_model_res_id = found.get(xml_id)
+            if res_model_res_id in existing:
+                result.append(self[res_model_res_id[0]].browse(res_model_res_id[1]))
+            elif not raise_if_not_found:
+                result.append(None)
+            elif res_model_res_id is None:
+                raise ValueError('External ID not found in the system: %s' % xml_id)
+            else:
+                raise ValueError('No record found for unique ID %s. It may have been deleted.' % (xml_id))
+        return result
+
     def is_superuser(self):
         """ Return whether the environment is in superuser mode. """
         return self.su
@@ -13,3 +13,5 @@ from . import server
 from . import shell
 from . import start
 from . import populate
+from . import assets
+from . import importtime
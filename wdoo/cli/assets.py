@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Ahead-of-time generation of the asset bundles of a database, so that the
+first requests after a deployment do not have to build them.
+"""
+import functools
+import logging
+import optparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import wdoo
+from wdoo.tools import human_size
+
+from . import Command
+
+_logger = logging.getLogger(__name__)
+
+
+class Assets(Command):
+    """Prebuild the asset bundles of a database"""
+
+    def run(self, cmdargs):
+        parser = wdoo.tools.config.parser
+        group = optparse.OptionGroup(parser, "Assets Configuration")
+        group.add_option("--bundles", dest="bundles",
+                         help="Comma separated list of bundles to build (default: all the bundles "
+                              "declared by the installed modules and the ir.asset records)")
+        group.add_option("--jobs", dest="jobs", type="int", default=4,
+                         help="Number of bundles built in parallel (default: 4)")
+        group.add_option("--debug-assets", dest="debug_assets", action="store_true", default=False,
+                         help="Also build the non-minified bundles used in debug=assets mode")
+        parser.add_option_group(group)
+        opt = wdoo.tools.config.parse_config(cmdargs)
+
+        dbname = wdoo.tools.config['db_name']
+        if not dbname:
+            parser.error("the assets command requires a database (-d)")
+
+        registry = wdoo.registry(dbname)
+        with registry.cursor() as cr:
+            env = wdoo.api.Environment(cr, wdoo.SUPERUSER_ID, {})
+            bundles = opt.bundles.split(',') if opt.bundles else self._get_bundles(env)
+            langs = self._get_direction_langs(env)
+
+        t0 = time.time()
+        # compile the javascript files before starting the threads, as the
+        # compilation forks a pool of processes
+        self.precompile_javascripts(registry, bundles)
+
+        # javascript does not depend on the text direction: build it once per
+        # bundle, and the stylesheets once per bundle and direction
+        jobs = [
+            functools.partial(self.build_bundle, registry, bundle, langs[0],
+                              js=True, css=True, debug_assets=opt.debug_assets)
+            for bundle in bundles
+        ]
+        jobs += [
+            functools.partial(self.build_bundle, registry, bundle, lang,
+                              js=False, css=True, debug_assets=opt.debug_assets)
+            for bundle in bundles
+            for lang in langs[1:]
+        ]
+        jobs.append(functools.partial(self.build_qweb_templates, registry))
+        _logger.info("Building %d bundles with %d jobs", len(jobs), max(opt.jobs, 1))
+        with ThreadPoolExecutor(max_workers=max(opt.jobs, 1)) as executor:
+            futures = [executor.submit(job) for job in jobs]
+            reports = [future.result() for future in futures]
+
+        failed = 0
+        for name, timing, sizes, error in reports:
+            if error:
+                failed += 1
+                _logger.error("%-40s failed: %s", name, error)
+            else:
+                _logger.info("%-40s %6.2fs %s", name, timing, ', '.join(
+                    '%s: %s' % (extension, human_size(size)) for extension, size in sizes
+                ))
+        _logger.info("Built %d bundles in %.2fs", len(reports) - failed, time.time() - t0)
+        if failed:
+            sys.exit(1)
+
+    @staticmethod
+    def _get_bundles(env):
+        """ Return the names of the bundles declared by the installed modules
+        manifests and by the ``ir.asset`` records.
+        """
+        addons_manifest = wdoo.http.addons_manifest
+        if not wdoo.http.root._loaded:
+            wdoo.http.root.load_addons()
+            wdoo.http.root._loaded = True
+        bundles = {}
+        for addon in env['ir.asset']._get_installed_addons_list():
+            for bundle in addons_manifest.get(addon, {}).get('assets', {}):
+                bundles[bundle] = None
+        for asset in env['ir.asset']._get_related_assets([('active', '=', True)]):
+            bundles[asset.bundle] = None
+        # template bundles are served by /web/webclient/qweb, not as attachments
+        return [bundle for bundle in bundles if not bundle.endswith('_qweb')]
+
+    @staticmethod
+    def _get_direction_langs(env):
+        """ Return one language per text direction used by the installed
+        languages, as css bundles are built for each direction.
+        """
+        langs = {}
+        for code, _name in env['res.lang'].get_installed():
+            direction = env['res.lang']._lang_get(code).direction
+            langs.setdefault(direction, code)
+        return list(langs.values()) or ['en_US']
+
+    def precompile_javascripts(self, registry, bundles):
+        """ Transpile and minify the javascript files of the given bundles in
+        the compilation cache of the process. The errors are ignored here, and
+        reported by :meth:`build_bundle`.
+        """
+        with registry.cursor() as cr:
+            env = wdoo.api.Environment(cr, wdoo.SUPERUSER_ID, {})
+            IrQweb = env['ir.qweb']
+            for bundle in bundles:
+                try:
+                    files, _remains = IrQweb._get_asset_content(bundle)
+                    assets = IrQweb.get_asset_bundle(bundle, files, env=env)
+                    if assets.javascripts and not assets.get_attachments('min.js'):
+                        assets.precompile_javascripts()
+                except Exception:
+                    _logger.debug("Error while compiling the javascript of bundle %s", bundle, exc_info=True)
+
+    def build_bundle(self, registry, bundle, lang, js=True, css=True, debug_assets=False):
+        """ Generate and store the attachments of the given bundle: its
+        javascript if ``js`` is set, and its stylesheets for the text direction
+        of ``lang`` if ``css`` is set.
+
+        :returns: (name, timing, [(extension, size)], error)
+        """
+        threading.current_thread().dbname = registry.db_name
+        t0 = time.time()
+        try:
+            with registry.cursor() as cr:
+                env = wdoo.api.Environment(cr, wdoo.SUPERUSER_ID, {'lang': lang})
+                IrQweb = env['ir.qweb']
+                files, _remains = IrQweb._get_asset_content(bundle)
+                assets = IrQweb.get_asset_bundle(bundle, files, env=env)
+                name = '%s (%s)' % (bundle, assets.user_direction if css else 'js')
+                attachments = env['ir.attachment']
+                if js and assets.javascripts:
+                    attachments |= assets.js()
+                    if debug_assets:
+                        attachments |= assets.js(is_minified=False)
+                if css and assets.stylesheets:
+                    attachments |= assets.css()
+                    if debug_assets:
+                        attachments |= assets.css(is_minified=False)
+                if assets.css_errors:
+                    return name, time.time() - t0, [], '\n'.join(assets.css_errors)
+                sizes = [(attachment.name.rpartition(bundle + '.')[2], attachment.file_size) for attachment in attachments]
+                return name, time.time() - t0, sizes, None
+        except Exception as e:
+            _logger.debug("Error while building bundle %s", bundle, exc_info=True)
+            return bundle, time.time() - t0, [], str(e)
+
+    def build_qweb_templates(self, registry, bundle='web.assets_qweb'):
+        """ Build the static qweb templates of the web client. They are not
+        stored, but building them checks their inheritance and reports their
+        size before any user requests them.
+        """
+        from wdoo.addons.web.controllers.main import HomeStaticTemplateHelpers
+
+        class Helpers(HomeStaticTemplateHelpers):
+            def _get_asset_paths(self, bundle):
+                return env['ir.asset']._get_asset_paths(addons=self.addons, bundle=bundle, xml=True)
+
+        threading.current_thread().dbname = registry.db_name
+        t0 = time.time()
+        try:
+            with registry.cursor() as cr:
+                env = wdoo.api.Environment(cr, wdoo.SUPERUSER_ID, {})
+                addons = env['ir.asset']._get_active_addons_list()
+                content = Helpers(addons, registry.db_name)._get_qweb_templates(bundle)[0]
+                return bundle, time.time() - t0, [('xml', len(content))], None
+        except Exception as e:
+            _logger.debug("Error while building bundle %s", bundle, exc_info=True)
+            return bundle, time.time() - t0, [], str(e)
@@ -3,7 +3,6 @@
 from __future__ import print_function
 import argparse
 import os
-import requests
 import sys
 import tempfile
 import zipfile
@@ -14,6 +13,7 @@ class Deploy(Command):
     """Deploy a module on an wdoo instance"""
     def __init__(self):
         super(Deploy, self).__init__()
+        import requests
         self.session = requests.session()
 
     def deploy_module(self, module_path, url, login, password, db='', force=False):
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Part of wdoo. See LICENSE file for full copyright and licensing details.
+import argparse
+import collections
+import os
+import re
+import subprocess
+import sys
+import textwrap
+
+import wdoo
+
+from . import Command
+
+# line format of `python -X importtime`: self and cumulative times in
+# microseconds, then the module name indented by its nesting level
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)$')
+
+
+def parse_importtime(output):
+    """ Parse the output of ``python -X importtime``, and return a dict
+    mapping the names of the imported modules to their import time and
+    cumulative import time in microseconds, and the list of the other lines
+    of the output (e.g. a traceback), except for the header.
+    """
+    timings = {}
+    errors = []
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us))
+        elif not line.startswith('import time:'):
+            errors.append(line)
+    return timings, errors
+
+
+class ImportTime(Command):
+    """\
+    Report the time spent importing the python modules needed by a command.
+
+    The given modules are imported in a fresh interpreter run with
+    ``python -X importtime``, and the modules that take the most time to
+    import are listed. By default, the modules imported by wdoo-bin before
+    running any command are measured:
+
+        wdoo-bin importtime
+
+    Measure the import of other modules, grouped by top-level package:
+
+        wdoo-bin importtime -m wdoo.service.server -m wdoo.addons.base --packages
+    """
+    def run(self, args):
+        parser = argparse.ArgumentParser(
+            prog="%s importtime" % sys.argv[0].split(os.path.sep)[-1],
+            description=textwrap.dedent(self.__doc__),
+            formatter_class=argparse.RawDescriptionHelpFormatter
+        )
+        parser.add_argument('--module', '-m', dest='modules', action='append',
+                            help="Module to import (default: wdoo.cli)")
+        parser.add_argument('--limit', '-n', type=int, default=25,
+                            help="Number of modules to list (default: 25)")
+        parser.add_argument('--sort', choices=['self', 'cumulative'], default='cumulative',
+                            help="Sort the modules on their own import time or on the one "
+                                 "including their imports (default: cumulative)")
+        parser.add_argument('--packages', action='store_true',
+                            help="Sum the import times by top-level package (ignores --sort)")
+        opt = parser.parse_args(args)
+
+        timings = self.measure(opt.modules or ['wdoo.cli'])
+        total = sum(self_us for self_us, cumulative_us in timings.values())
+
+        if opt.packages:
+            packages = collections.Counter()
+            for name, (self_us, cumulative_us) in timings.items():
+                packages[name.split('.')[0]] += self_us
+            print("%10s  %s" % ("time [ms]", "package"))
+            for name, self_us in packages.most_common(opt.limit):
+                print("%10.1f  %s" % (self_us / 1000, name))
+        else:
+            key = 0 if opt.sort == 'self' else 1
+            rows = sorted(timings.items(), key=lambda item: item[1][key], reverse=True)
+            print("%10s %10s  %s" % ("self [ms]", "cumul [ms]", "module"))
+            for name, (self_us, cumulative_us) in rows[:opt.limit]:
+                print("%10.1f %10.1f  %s" % (self_us / 1000, cumulative_us / 1000, name))
+        print("%d modules imported in %.1f ms" % (len(timings), total / 1000))
+
+    @staticmethod
+    def measure(modules):
+        """ Import the given modules in a new interpreter, and return a dict
+        mapping the names of the imported modules to their import time and
+        cumulative import time in microseconds.
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(wdoo.__file__)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import %s' % ', '.join(modules)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env, universal_newlines=True,
+        )
+        timings, errors = parse_importtime(proc.stderr)
+        if proc.returncode:
+            sys.exit("\n".join(errors) or "Failed to import %s" % ', '.join(modules))
+        return timings
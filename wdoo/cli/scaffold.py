@@ -2,12 +2,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 import argparse
+import functools
 import os
 import re
 import sys
 
-import jinja2
-
 from . import Command
 
 class Scaffold(Command):
@@ -76,9 +75,15 @@ def directory(p, create=False):
         die("%s is not a directory" % p)
     return expanded
 
-env = jinja2.Environment()
-env.filters['snake'] = snake
-env.filters['pascal'] = pascal
+@functools.lru_cache(maxsize=None)
+def jinja_env():
+    # jinja2 is only imported when a template is actually rendered
+    import jinja2
+    env = jinja2.Environment()
+    env.filters['snake'] = snake
+    env.filters['pascal'] = pascal
+    return env
+
 class template(object):
     def __init__(self, identifier):
         # TODO: archives (zipfile, tarfile)
@@ -124,7 +129,7 @@ class template(object):
                 if ext not in ('.py', '.xml', '.csv', '.js', '.rst', '.html', '.template'):
                     f.write(content)
                 else:
-                    env.from_string(content.decode('utf-8'))\
+                    jinja_env().from_string(content.decode('utf-8'))\
                        .stream(params or {})\
                        .dump(f, encoding='utf-8')
 
@@ -3589,6 +3589,7 @@ class Many2many(_RelationalMulti):
                 CREATE INDEX ON "{rel}" ("{id2}","{id1}");
             """.format(rel=self.relation, id1=self.column1, id2=self.column2)
             cr.execute(query, ['RELATION BETWEEN %s AND %s' % (model._table, comodel._table)])
+            sql.drop_schema_snapshot(cr, self.relation)
             _schema.debug("Create table %r: m2m relation between %r and %r", self.relation, model._table, comodel._table)
             model.pool.post_init(self.update_db_foreign_keys, model)
             return True
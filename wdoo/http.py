@@ -1265,12 +1265,22 @@ class Response(werkzeug.wrappers.Response):
         self.qcontext['request'] = request
         return env["ir.ui.view"]._render_template(self.template, self.qcontext)
 
+    def render_stream(self):
+        """ Renders the Response's template, returns an iterator of strings
+        """
+        env = request.env(user=self.uid or request.uid or wdoo.SUPERUSER_ID)
+        self.qcontext['request'] = request
+        return env["ir.ui.view"]._render_template_stream(self.template, self.qcontext)
+
     def flatten(self):
         """ Forces the rendering of the response's template, sets the result
         as response body and unsets :attr:`.template`
         """
         if self.template:
-            self.response.append(self.render())
+            # the body is kept as the encoded chunks of the rendering, instead
+            # of joining the whole page in several intermediate copies
+            body = [chunk.encode(self.charset) for chunk in self.render_stream()]
+            self.response.extend(body)
             self.template = None
 
 class DisableCacheMiddleware(object):
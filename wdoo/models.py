@@ -277,6 +277,9 @@ IdType = (int, str, NewId)
 # maximum number of prefetched records
 PREFETCH_MAX = 1000
 
+# default number of records created or updated at once by load()
+IMPORT_CHUNK_SIZE = 1000
+
 # special columns automatically created by the ORM
 LOG_ACCESS_COLUMNS = ['create_uid', 'create_date', 'write_uid', 'write_date']
 MAGIC_COLUMNS = ['id'] + LOG_ACCESS_COLUMNS
@@ -1090,6 +1093,8 @@ class BaseModel(metaclass=MetaModel):
         # list of (xid, vals, info) for records to be created in batch
         batch = []
         batch_xml_ids = set()
+        # results of name_search() on the referenced models, see db_id_for()
+        name_cache = {}
         # models in which we may have created / modified data, therefore might
         # require flushing in order to name_search: the root model and any
         # o2m
@@ -1130,6 +1135,8 @@ class BaseModel(metaclass=MetaModel):
             ]
             batch.clear()
             batch_xml_ids.clear()
+            # the records to load may match the names searched so far
+            name_cache.clear()
 
             # try to create in batch
             try:
@@ -1178,14 +1185,25 @@ class BaseModel(metaclass=MetaModel):
                     })
                     break
 
-        # make 'flush' available to the methods below, in the case where XMLID
-        # resolution fails, for instance
-        flush_self = self.with_context(import_flush=flush, import_cache=LRU(1024))
-
         # TODO: break load's API instead of smuggling via context?
         limit = self._context.get('_import_limit')
         if limit is None:
             limit = float('inf')
+        chunk_size = self._context.get('import_chunk_size') or IMPORT_CHUNK_SIZE
+
+        # resolve the references of the relational columns at once
+        prefetched = self.env['ir.fields.converter']._prefetch_references(
+            self, fields, data if limit == float('inf') else data[:limit],
+        )
+        import_cache = LRU(1024 + len(prefetched))
+        for key, value in prefetched.items():
+            import_cache[key] = value
+
+        # make 'flush' available to the methods below, in the case where XMLID
+        # resolution fails, for instance
+        flush_self = self.with_context(
+            import_flush=flush, import_cache=import_cache, import_name_cache=name_cache,
+        )
         extracted = flush_self._extract_records(fields, data, log=messages.append, limit=limit)
 
         converted = flush_self._convert_records(extracted, log=messages.append)
@@ -1201,6 +1219,10 @@ class BaseModel(metaclass=MetaModel):
             elif id:
                 record['id'] = id
             batch.append((xid, record, info))
+            # load the records by chunks: if a chunk fails, only its records
+            # are loaded again one by one to find the faulty ones
+            if len(batch) >= chunk_size:
+                flush()
 
         flush()
         if any(message['type'] == 'error' for message in messages):
@@ -1717,7 +1739,7 @@ class BaseModel(metaclass=MetaModel):
             view = view.with_context(base_model_name=result['base_model'])
 
         # Apply post processing, groups and modifiers etc...
-        xarch, xfields = view.postprocess_and_fields(etree.fromstring(result['arch']), model=self._name)
+        xarch, xfields = view._postprocess_arch(result['arch'], model=self._name)
         result['arch'] = xarch
         result['fields'] = xfields
 
@@ -2725,22 +2747,18 @@ class BaseModel(metaclass=MetaModel):
         # fields which were required but have been removed (or will be added by
         # another module)
         cr = self._cr
-        cols = [name for name, field in self._fields.items()
-                     if field.store and field.column_type]
-        cr.execute("SELECT a.attname, a.attnotnull"
-                   "  FROM pg_class c, pg_attribute a"
-                   " WHERE c.relname=%s"
-                   "   AND c.oid=a.attrelid"
-                   "   AND a.attisdropped=%s"
-                   "   AND pg_catalog.format_type(a.atttypid, a.atttypmod) NOT IN ('cid', 'tid', 'oid', 'xid')"
-                   "   AND a.attname NOT IN %s", (self._table, False, tuple(cols))),
-
-        for row in cr.dictfetchall():
+        cols = {name for name, field in self._fields.items()
+                     if field.store and field.column_type}
+        columns = tools.table_columns(cr, self._table)
+
+        for name, column in columns.items():
+            if name in cols:
+                continue
             if log:
                 _logger.debug("column %s is in the table %s but not in the corresponding object %s",
-                              row['attname'], self._table, self._name)
-            if row['attnotnull']:
-                tools.drop_not_null(cr, self._table, row['attname'])
+                              name, self._table, self._name)
+            if column['is_nullable'] == 'NO':
+                tools.drop_not_null(cr, self._table, name)
 
     def _init_column(self, column_name):
         """ Initialize the value of the given column for existing rows. """
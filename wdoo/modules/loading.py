@@ -16,7 +16,8 @@ import wdoo.modules.graph
 import wdoo.modules.migration
 import wdoo.modules.registry
 from .. import SUPERUSER_ID, api, tools
-from .module import adapt_version, initialize_sys_path, load_wdoo_module
+from .module import adapt_version, get_resource_path, initialize_sys_path, load_wdoo_module
+from wdoo.tools.convert import prevalidate_xml_files
 
 _logger = logging.getLogger(__name__)
 _test_logger = logging.getLogger('wdoo.tests')
@@ -108,6 +109,27 @@ def force_demo(cr):
     env['res.groups']._update_user_groups_view()
 
 
+def _get_xml_files_to_load(graph, skip_modules=None):
+    """ Return the paths of the XML data files of the modules of ``graph``
+    that will be installed or updated, including their demo files only if
+    their demo data should be loaded. """
+    paths = []
+    for package in graph:
+        if skip_modules and package.name in skip_modules:
+            continue
+        if not (hasattr(package, 'init') or hasattr(package, 'update')
+                or package.state in ('to install', 'to upgrade')):
+            continue
+        kinds = ['init_xml', 'update_xml', 'data']
+        if package.should_have_demo():
+            kinds += ['demo_xml', 'demo']
+        for kind in kinds:
+            for filename in package.data.get(kind, ()):
+                path = filename.endswith('.xml') and get_resource_path(package.name, filename)
+                if path:
+                    paths.append(path)
+    return paths
+
 def load_module_graph(cr, graph, perform_checks=True,
                       skip_modules=None, report=None, models_to_check=None):
     """Migrates+Updates or Installs all module nodes from ``graph``
@@ -117,6 +139,12 @@ def load_module_graph(cr, graph, perform_checks=True,
        :param skip_modules: optional list of module names (packages) which have previously been loaded and can be skipped
        :return: list of modules that were installed or updated
     """
+    # validate the XML data files of the modules to update in parallel
+    with prevalidate_xml_files(cr, _get_xml_files_to_load(graph, skip_modules)):
+        return _load_module_graph(cr, graph, perform_checks, skip_modules, report, models_to_check)
+
+def _load_module_graph(cr, graph, perform_checks=True,
+                       skip_modules=None, report=None, models_to_check=None):
     if models_to_check is None:
         models_to_check = set()
 
@@ -156,7 +184,9 @@ def load_module_graph(cr, graph, perform_checks=True,
         _logger.log(module_log_level, 'Loading module %s (%d/%d)', module_name, index, module_count)
 
         if needs_update:
-            if package.name != 'base':
+            # the models are already set up if the previous module has been
+            # updated, and no module has been loaded since then
+            if package.name != 'base' and not registry.models_set_up:
                 registry.setup_models(cr)
             migrations.migrate_module(package, 'pre')
             if package.name != 'base':
@@ -259,7 +289,7 @@ def load_module_graph(cr, graph, perform_checks=True,
             loader = wdoo.tests.loader
             suite = loader.make_suite([module_name], 'at_install')
             if suite.countTestCases():
-                if not needs_update:
+                if not registry.models_set_up:
                     registry.setup_models(cr)
                 # Python tests
                 env['ir.http']._clear_routing_map()     # force routing map to be rebuilt
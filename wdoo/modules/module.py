@@ -2,7 +2,9 @@
 # Part of wdoo. See LICENSE file for full copyright and licensing details.
 
 import ast
+import bisect
 import collections.abc
+import glob
 import importlib
 import logging
 import os
@@ -185,6 +187,117 @@ def get_module_filetree(module, dir='.'):
 
     return tree
 
+
+class AddonFilesIndex(object):
+    """ Per-process index of the files of the addons, used to resolve glob
+    patterns without walking the file system each time.
+
+    The files of an addon are listed the first time a pattern targets it.
+    The index is only trusted outside of dev mode, or when a file system
+    watcher keeps it up-to-date by calling :meth:`invalidate`. The results
+    derived from the index must be cached along with :attr:`generation`,
+    which changes each time the index is invalidated.
+    """
+    MAGIC_CHARS = re.compile(r'[*?[]')
+
+    def __init__(self):
+        self.files = {}         # addon directory: sorted list of file paths
+        self.watched = False    # whether a file system watcher invalidates the index
+        self.generation = 0     # number of invalidations of the index
+
+    @property
+    def enabled(self):
+        return self.watched or not tools.config['dev_mode']
+
+    def invalidate(self, path=None):
+        """ Drop the listing of the addon containing ``path``, or of all
+        addons if no path is given.
+        """
+        if path is None:
+            self.files.clear()
+            self.generation += 1
+            return
+        for root in list(self.files):
+            if path.startswith(root + os.sep):
+                self.files.pop(root, None)
+                self.generation += 1
+
+    def _list(self, root):
+        files = self.files.get(root)
+        if files is None:
+            files = []
+            for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+                # glob wildcards never match hidden files and directories
+                dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+                files.extend(opj(dirpath, name) for name in filenames if not name.startswith('.'))
+            files.sort()
+            self.files[root] = files
+        return files
+
+    def glob(self, addon_dir, pattern):
+        """ Return the sorted list of files matching ``pattern``, like
+        ``sorted(glob(pattern, recursive=True))`` would, directories excepted.
+
+        :param addon_dir: the directory of the addon ``pattern`` is part of
+        :param pattern: a normalized absolute glob pattern inside ``addon_dir``
+        """
+        if not self.MAGIC_CHARS.search(pattern):
+            return [pattern] if os.path.isfile(pattern) else []
+
+        parts = pattern[len(addon_dir) + 1:].split(os.sep)
+        if any(part.startswith('.') for part in parts):
+            # hidden files and directories are not indexed
+            return sorted(path for path in glob.iglob(pattern, recursive=True) if os.path.isfile(path))
+        # literal leading directories are used to narrow down the candidates
+        prefix = addon_dir
+        while len(parts) > 1 and not self.MAGIC_CHARS.search(parts[0]):
+            prefix = opj(prefix, parts.pop(0))
+        regex = re.compile(re.escape(prefix + os.sep) + self._translate(parts))
+
+        files = self._list(addon_dir)
+        start = bisect.bisect_left(files, prefix + os.sep)
+        stop = bisect.bisect_left(files, prefix + chr(ord(os.sep) + 1))
+        return [path for path in files[start:stop] if regex.fullmatch(path)]
+
+    @staticmethod
+    def _translate(parts):
+        """ Translate the components of a glob pattern into a regular expression. """
+        sep = re.escape(os.sep)
+        name = r'[^.%s][^%s]*' % (sep, sep)
+        regex = []
+        for index, part in enumerate(parts):
+            last = index == len(parts) - 1
+            if part == '**':
+                regex.append('(?:%s(?:%s%s)*)?' % (name, sep, name) if last else '(?:%s%s)*' % (name, sep))
+                continue
+            if part[:1] in ('*', '?', '['):
+                regex.append(r'(?!\.)')
+            i = 0
+            while i < len(part):
+                char = part[i]
+                i += 1
+                if char == '*':
+                    regex.append('[^%s]*' % sep)
+                elif char == '?':
+                    regex.append('[^%s]' % sep)
+                elif char == '[' and part.find(']', i + 1) != -1:
+                    end = part.find(']', i + 1)
+                    chars = part[i:end].replace('\\', '\\\\')
+                    i = end + 1
+                    if chars[:1] == '!':
+                        chars = '^' + chars[1:]
+                    elif chars[:1] == '^':
+                        chars = '\\' + chars
+                    regex.append('[%s]' % chars)
+                else:
+                    regex.append(re.escape(char))
+            if not last:
+                regex.append(sep)
+        return ''.join(regex)
+
+
+addon_files_index = AddonFilesIndex()
+
 def get_resource_path(module, *args):
     """Return the full path of a resource of the given module.
     :param module: module name
@@ -8,8 +8,11 @@ from collections.abc import Mapping
 from contextlib import closing, contextmanager
 from functools import partial
 from operator import attrgetter
+import hashlib
 import logging
+import marshal
 import os
+import sys
 import threading
 import time
 
@@ -26,6 +29,9 @@ from wdoo.tools.lru import LRU
 _logger = logging.getLogger(__name__)
 _schema = logging.getLogger('wdoo.schema')
 
+# maximum age in seconds of the unused field triggers stored in data_dir
+FIELD_TRIGGERS_MAX_AGE = 30 * 24 * 3600
+
 
 class Registry(Mapping):
     """ Model registry for a particular database.
@@ -34,6 +40,7 @@ class Registry(Mapping):
     """
     _lock = threading.RLock()
     _saved_lock = None
+    _field_triggers_pruned = False
 
     @lazy_classproperty
     def registries(cls):
@@ -129,6 +136,7 @@ class Registry(Mapping):
         # Indicates that the registry is
         self.loaded = False             # whether all modules are loaded
         self.ready = False              # whether everything is set up
+        self.models_set_up = False      # whether the models are set up since the last load
 
         # field dependencies
         self.field_depends = Collector()
@@ -224,6 +232,7 @@ class Registry(Mapping):
         self.__cache.clear()
 
         lazy_property.reset_all(self)
+        self.models_set_up = False
 
         # Instantiate registered classes (via the MetaModel automatic discovery
         # or via explicit constructor call), and add them to the pool.
@@ -303,6 +312,14 @@ class Registry(Mapping):
                 model._register_hook()
             env['base'].flush()
 
+        self.models_set_up = True
+
+    @lazy_property
+    def field_paths(self):
+        """ Return a dict caching the resolution of field paths in views, see
+        ``ir.ui.view._check_field_paths``. """
+        return {}
+
     @lazy_property
     def field_computed(self):
         """ Return a dict mapping each field to the fields computed by the same method. """
@@ -321,6 +338,116 @@ class Registry(Mapping):
 
     @lazy_property
     def field_triggers(self):
+        if not Registry._field_triggers_pruned:
+            # remove the field triggers of other versions and the unused ones
+            Registry._field_triggers_pruned = True
+            wdoo.tools.prune_cache_directory(
+                os.path.join(config['data_dir'], 'registry'),
+                self._get_field_triggers_version(), FIELD_TRIGGERS_MAX_AGE,
+            )
+        signature = self._get_field_triggers_signature()
+        triggers = self._load_field_triggers(signature)
+        if triggers is None:
+            triggers = self._build_field_triggers()
+            self._store_field_triggers(signature, triggers)
+        return triggers
+
+    def _get_field_triggers_signature(self):
+        """ Return a hash of everything the field triggers are derived from:
+        the fields of all models, their dependencies and inverses. """
+        sha = hashlib.sha256()
+        sha.update(wdoo.release.version.encode())
+        for model_name in sorted(self.models):
+            Model = self.models[model_name]
+            sha.update(repr((model_name, Model._abstract, Model._transient)).encode())
+            for field in Model._fields.values():
+                sha.update(repr((
+                    field.name, field.type, field.comodel_name,
+                    getattr(field, 'inverse_name', None),
+                    bool(field.base_field.manual),
+                    self.field_depends.get(field),
+                    [(inv.model_name, inv.name) for inv in self.field_inverses[field]],
+                )).encode())
+        return sha.hexdigest()
+
+    def _get_field_triggers_version(self):
+        """ Return the directory of the field triggers stored by the current
+        version of wdoo and python. """
+        return '%s-%s' % (wdoo.release.version, sys.implementation.cache_tag)
+
+    def _get_field_triggers_path(self, signature):
+        return os.path.join(config['data_dir'], 'registry', self._get_field_triggers_version(),
+                            'triggers-%s' % signature)
+
+    def _load_field_triggers(self, signature):
+        """ Return the field triggers stored for ``signature``, or ``None`` if
+        there are none or they do not match the fields of the registry. """
+        if 'reload' in config['dev_mode']:
+            return None
+        path = self._get_field_triggers_path(signature)
+        try:
+            with open(path, 'rb') as f:
+                data = marshal.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            _logger.warning("Could not load the field triggers from %s", path, exc_info=True)
+            return None
+        # keep the file in use from being pruned
+        with ignore(OSError):
+            os.utime(path)
+
+        def field(key):
+            return self.models[key[0]]._fields[key[1]]
+
+        def restore(tree):
+            return {
+                None if key is None else field(key):
+                    OrderedSet(map(field, value)) if key is None else restore(value)
+                for key, value in tree.items()
+            }
+
+        try:
+            triggers = restore(data['triggers'])
+            recursive = [field(key) for key in data['recursive']]
+        except (KeyError, TypeError, AttributeError):
+            _logger.warning("Field triggers in %s do not match the registry, rebuilding them", path)
+            return None
+        # restore the flags set as a side effect of resolving the dependencies
+        for field_ in recursive:
+            field_.recursive = True
+        return triggers
+
+    def _store_field_triggers(self, signature, triggers):
+        if 'reload' in config['dev_mode']:
+            return
+
+        def key(field):
+            return (field.model_name, field.name)
+
+        def dump(tree):
+            return {
+                None if label is None else key(label):
+                    [key(field) for field in value] if label is None else dump(value)
+                for label, value in tree.items()
+            }
+
+        data = {
+            'triggers': dump(triggers),
+            'recursive': [
+                key(field)
+                for Model in self.models.values()
+                for field in Model._fields.values()
+                if field.recursive
+            ],
+        }
+        path = self._get_field_triggers_path(signature)
+        try:
+            wdoo.tools.write_marshal_file(path, data)
+        except OSError:
+            _logger.debug("Could not store the field triggers in %s", path, exc_info=True)
+
+    def _build_field_triggers(self):
         # determine field dependencies
         dependencies = {}
         for Model in self.models.values():
@@ -413,14 +540,44 @@ class Registry(Mapping):
         env = wdoo.api.Environment(cr, SUPERUSER_ID, context)
         models = [env[model_name] for model_name in model_names]
 
+        # the tables of the models and of their many2many fields
+        tablenames = {
+            name
+            for model in models
+            for name in [model._table] + [
+                field.relation
+                for field in model._fields.values()
+                if field.type == 'many2many' and field.store
+            ]
+        }
+
         try:
             self._post_init_queue = deque()
             self._foreign_keys = {}
             self._is_install = install
 
+            sql.load_schema_snapshot(cr, tablenames)
             for model in models:
+                # overrides of _auto_init() and init() may change any table
+                # without the helpers of tools.sql, which keep the schema
+                # snapshot up-to-date: the tables of the model are read from
+                # the database, and reloaded in the snapshot afterwards
+                overridden = (
+                    type(model)._auto_init is not wdoo.models.BaseModel._auto_init
+                    or type(model).init is not wdoo.models.BaseModel.init
+                )
+                if overridden:
+                    dropped = [model._table] + [
+                        field.relation
+                        for field in model._fields.values()
+                        if field.type == 'many2many' and field.store
+                    ]
+                    for tablename in dropped:
+                        sql.drop_schema_snapshot(cr, tablename)
                 model._auto_init()
                 model.init()
+                if overridden:
+                    sql.load_schema_snapshot(cr, dropped)
 
             env['ir.model']._reflect_models(model_names)
             env['ir.model.fields']._reflect_fields(model_names)
@@ -435,6 +592,7 @@ class Registry(Mapping):
 
             self.check_indexes(cr, model_names)
             self.check_foreign_keys(cr)
+            sql.drop_schema_snapshot(cr)
 
             env['base'].flush()
 
@@ -442,6 +600,7 @@ class Registry(Mapping):
             self.check_tables_exist(cr)
 
         finally:
+            sql.drop_schema_snapshot(cr)
             del self._post_init_queue
             del self._foreign_keys
             del self._is_install
@@ -459,10 +618,9 @@ class Registry(Mapping):
         if not expected:
             return
 
-        # retrieve existing indexes with their corresponding table
-        cr.execute("SELECT indexname, tablename FROM pg_indexes WHERE indexname IN %s",
-                   [tuple(row[0] for row in expected)])
-        existing = dict(cr.fetchall())
+        # retrieve existing indexes with their corresponding table; an index
+        # with the expected name on another table is detected by create_index()
+        existing = sql.existing_indexes(cr, {row[1] for row in expected})
 
         for indexname, tablename, columnname, index in expected:
             if index and indexname not in existing:
@@ -491,20 +649,7 @@ class Registry(Mapping):
             return
 
         # determine existing foreign keys on the tables
-        query = """
-            SELECT fk.conname, c1.relname, a1.attname, c2.relname, a2.attname, fk.confdeltype
-            FROM pg_constraint AS fk
-            JOIN pg_class AS c1 ON fk.conrelid = c1.oid
-            JOIN pg_class AS c2 ON fk.confrelid = c2.oid
-            JOIN pg_attribute AS a1 ON a1.attrelid = c1.oid AND fk.conkey[1] = a1.attnum
-            JOIN pg_attribute AS a2 ON a2.attrelid = c2.oid AND fk.confkey[1] = a2.attnum
-            WHERE fk.contype = 'f' AND c1.relname IN %s
-        """
-        cr.execute(query, [tuple({table for table, column in self._foreign_keys})])
-        existing = {
-            (table1, column1): (name, table2, column2, deltype)
-            for name, table1, column1, table2, column2, deltype in cr.fetchall()
-        }
+        existing = sql.existing_foreign_keys(cr, {table for table, column in self._foreign_keys})
 
         # create or update foreign keys
         for key, val in self._foreign_keys.items():
@@ -3,6 +3,7 @@
 #-----------------------------------------------------------
 import datetime
 import errno
+import gc
 import logging
 import os
 import os.path
@@ -54,6 +55,7 @@ except ImportError:
 
 import wdoo
 from wdoo.modules import get_modules
+from wdoo.modules.module import addon_files_index
 from wdoo.modules.registry import Registry
 from wdoo.release import nt_service_name
 from wdoo.tools import config
@@ -76,6 +78,20 @@ def memory_info(process):
     return pmem.vms
 
 
+def memory_sharing(process):
+    """
+    :return: a pair ``(private, shared)`` with the memory of the process that
+        is not shared with other processes, and the resident memory it
+        shares with them (e.g. with its parent after a fork), in bytes;
+        ``(None, None)`` if the OS does not provide them.
+    """
+    try:
+        pmem = process.memory_full_info()
+        return pmem.uss, pmem.rss - pmem.uss
+    except (AttributeError, psutil.Error):
+        return None, None
+
+
 def set_limit_memory_hard():
     if os.name == 'posix' and config['limit_memory_hard']:
         rlimit = resource.RLIMIT_RSS if platform.system() == 'Darwin' else resource.RLIMIT_AS
@@ -218,6 +234,8 @@ class ThreadedWSGIServerReloadable(LoggingBaseWSGIServerMixIn, werkzeug.serving.
 #----------------------------------------------------------
 class FSWatcherBase(object):
     def handle_file(self, path):
+        # keep the index of the addons files used to resolve assets up-to-date
+        addon_files_index.invalidate(path)
         if path.endswith('.py') and not os.path.basename(path).startswith('.~'):
             try:
                 source = open(path, 'rb').read() + b'\n'
@@ -248,6 +266,7 @@ class FSWatcherWatchdog(FSWatcherBase):
 
     def start(self):
         self.observer.start()
+        addon_files_index.watched = True
         _logger.info('AutoReload watcher running with watchdog')
 
     def stop(self):
@@ -289,6 +308,7 @@ class FSWatcherInotify(FSWatcherBase):
 
     def start(self):
         self.started = True
+        addon_files_index.watched = True
         self.thread = threading.Thread(target=self.run, name="wdoo.service.autoreload.watcher")
         self.thread.daemon = True
         self.thread.start()
@@ -607,7 +627,10 @@ class ThreadedServer(CommonServer):
 class GeventServer(CommonServer):
     def __init__(self, app):
         super(GeventServer, self).__init__(app)
-        self.port = config['longpolling_port']
+        # either only the longpolling requests are dispatched to this server,
+        # or it serves all the HTTP traffic (--gevent-http)
+        self.serve_all = config['gevent_http']
+        self.port = config['http_port'] if self.serve_all else config['longpolling_port']
         self.httpd = None
 
     def process_limits(self):
@@ -630,6 +653,18 @@ class GeventServer(CommonServer):
             self.process_limits()
             gevent.sleep(beat)
 
+    def app_time_limited(self, environ, start_response):
+        """ Dispatch the request to the application, interrupting it once it
+        has been running for ``limit_time_real`` seconds, like the threaded and
+        prefork servers do. As greenlets are cooperative, the interruption
+        happens at the next I/O (typically a query) of the request.
+        """
+        import gevent
+        limit = config['limit_time_real']
+        error = TimeoutError("Request exceeded the real time limit of %ss" % limit)
+        with gevent.Timeout(limit, error):
+            return self.app(environ, start_response)
+
     def start(self):
         import gevent
         try:
@@ -655,20 +690,32 @@ class GeventServer(CommonServer):
                 finally:
                     self.client_address = old_address
 
-        set_limit_memory_hard()
         if os.name == 'posix':
-            # Set process memory limit as an extra safeguard
             signal.signal(signal.SIGQUIT, dumpstacks)
             signal.signal(signal.SIGUSR1, log_ormcache_stats)
-            gevent.spawn(self.watchdog)
+        if not self.serve_all:
+            # the longpolling process is restarted by its parent when it
+            # exceeds its limits; when serving all the HTTP traffic, there is
+            # no parent to restart the server
+            set_limit_memory_hard()
+            if os.name == 'posix':
+                gevent.spawn(self.watchdog)
+        elif config['max_cron_threads']:
+            _logger.info("Cron jobs are not processed by the evented HTTP server, "
+                         "run them in a separate server started with --no-http")
+
+        app = self.app
+        if self.serve_all and config['limit_time_real']:
+            app = self.app_time_limited
 
         self.httpd = WSGIServer(
-            (self.interface, self.port), self.app,
+            (self.interface, self.port), app,
             log=logging.getLogger('longpolling'),
             error_log=logging.getLogger('longpolling'),
             handler_class=ProxyHandler,
         )
-        _logger.info('Evented Service (longpolling) running on %s:%s', self.interface, self.port)
+        _logger.info('Evented Service (%s) running on %s:%s',
+                     'HTTP' if self.serve_all else 'longpolling', self.interface, self.port)
         try:
             self.httpd.serve_forever()
         except:
@@ -682,8 +729,14 @@ class GeventServer(CommonServer):
         gevent.shutdown()
 
     def run(self, preload, stop):
+        rc = None
+        if self.serve_all:
+            rc = preload_registries(preload)
+            if stop:
+                return rc
         self.start()
         self.stop()
+        return rc
 
 class PreforkServer(CommonServer):
     """ Multiprocessing inspired by (g)unicorn.
@@ -709,6 +762,7 @@ class PreforkServer(CommonServer):
         self.generation = 0
         self.queue = []
         self.long_polling_pid = None
+        self.memory_report_time = time.time()
 
     def pipe_new(self):
         pipe = os.pipe()
@@ -824,6 +878,27 @@ class PreforkServer(CommonServer):
                               worker.watchdog_timeout)
                 self.worker_kill(pid, signal.SIGKILL)
 
+    def process_memory_report(self):
+        """ Periodically log the private and shared memory of the workers. """
+        now = time.time()
+        if now - self.memory_report_time < SLEEP_INTERVAL:
+            return
+        self.memory_report_time = now
+        total_private = total_shared = 0
+        for pid, worker in list(self.workers.items()):
+            try:
+                private, shared = memory_sharing(psutil.Process(pid))
+            except psutil.Error:
+                continue
+            if private is None:
+                return
+            _logger.debug("%s (%s) private memory: %s, shared memory: %s",
+                          worker.__class__.__name__, pid, private, shared)
+            total_private += private
+            total_shared += shared
+        _logger.info("%d workers, private memory: %s, shared memory: %s",
+                     len(self.workers), total_private, total_shared)
+
     def process_spawn(self):
         if config['http_enable']:
             while len(self.workers_http) < self.population:
@@ -908,9 +983,19 @@ class PreforkServer(CommonServer):
             self.stop()
             return rc
 
+        if config['preload_warmup'] and preload:
+            warmup_registries(preload)
+
         # Empty the cursor pool, we dont want them to be shared among forked workers.
         wdoo.sql_db.close_all()
 
+        if config['preload_warmup']:
+            # move the objects of the main process in a permanent generation:
+            # the garbage collections of the workers no longer touch them, so
+            # their memory pages remain shared with the main process
+            gc.collect()
+            gc.freeze()
+
         _logger.debug("Multiprocess starting")
         while 1:
             try:
@@ -918,6 +1003,7 @@ class PreforkServer(CommonServer):
                 self.process_signals()
                 self.process_zombie()
                 self.process_timeout()
+                self.process_memory_report()
                 self.process_spawn()
                 self.sleep()
             except KeyboardInterrupt:
@@ -986,7 +1072,9 @@ class Worker(object):
         # Reset the worker if it consumes too much memory (e.g. caused by a memory leak).
         memory = memory_info(psutil.Process(os.getpid()))
         if config['limit_memory_soft'] and memory > config['limit_memory_soft']:
-            _logger.info('Worker (%d) virtual memory limit (%s) reached.', self.pid, memory)
+            private, shared = memory_sharing(psutil.Process(os.getpid()))
+            _logger.info('Worker (%d) virtual memory limit (%s) reached (private: %s, shared: %s).',
+                         self.pid, memory, private, shared)
             self.alive = False      # Commit suicide after the request.
 
         set_limit_memory_hard()
@@ -1034,9 +1122,12 @@ class Worker(object):
             t.daemon = True
             t.start()
             t.join()
-            _logger.info("Worker (%s) exiting. request_count: %s, registry count: %s.",
+            private, shared = memory_sharing(psutil.Process(os.getpid()))
+            _logger.info("Worker (%s) exiting. request_count: %s, registry count: %s, "
+                         "private memory: %s, shared memory: %s.",
                          self.pid, self.request_count,
-                         len(wdoo.modules.registry.Registry.registries))
+                         len(wdoo.modules.registry.Registry.registries),
+                         private, shared)
             self.stop()
         except Exception:
             _logger.exception("Worker (%s) Exception occurred, exiting...", self.pid)
@@ -1284,11 +1375,62 @@ def preload_registries(dbnames):
             return -1
     return rc
 
+def warmup_registries(dbnames):
+    """ Fill the caches of the given preloaded registries that do not depend
+    on the user: the workers forked afterwards inherit them.
+    """
+    for dbname in dbnames:
+        registry = Registry.registries.get(dbname)
+        if registry is None:
+            continue
+        t0 = time.time()
+        threading.current_thread().dbname = dbname
+        try:
+            with registry.cursor() as cr:
+                env = wdoo.api.Environment(cr, wdoo.SUPERUSER_ID, {})
+                # the caches are keyed by the arguments and context of the
+                # requests of the web client: the same modules as
+                # /web/webclient/translations, the debug mode of a new session
+                # (''), and the language of the user
+                mods = list(registry._init_modules) + (wdoo.conf.server_wide_modules or [])
+                for lang, _name in env['res.lang'].get_installed():
+                    env['ir.translation']._get_code_translations(lang)
+                    env['ir.translation'].get_web_translations(mods, lang)
+
+                # menus are cached per group set and language
+                users = {}
+                for user in env['res.users'].search([('share', '=', False)]):
+                    users.setdefault((frozenset(user.groups_id.ids), user.lang), user)
+                for user in users.values():
+                    menus = env['ir.ui.menu'].with_user(user).with_context(lang=user.lang)
+                    if hasattr(menus, '_load_web_menus_json'):
+                        menus._load_web_menus_json('')
+                    else:
+                        menus.load_menus('')
+
+                views = env['ir.ui.view'].search([('mode', '=', 'primary'), ('type', '!=', 'qweb')])
+                for view in views:
+                    try:
+                        view._get_combined_arch()
+                    except Exception:
+                        _logger.debug("Could not combine view %s", view.xml_id, exc_info=True)
+                cr.rollback()
+            _logger.info("Caches of database %s warmed up in %.2fs", dbname, time.time() - t0)
+        except Exception:
+            _logger.warning("Could not warm up the caches of database %s", dbname, exc_info=True)
+
+
 def start(preload=None, stop=False):
     """ Start the wdoo http server and cron processor.
     """
     global server
 
+    if config['gevent_http'] and not wdoo.evented:
+        # gevent must patch the standard library before anything else is
+        # imported: restart the process in evented mode
+        _logger.info('Restarting the server in evented mode (--gevent-http)')
+        os.execv(sys.executable, [sys.executable, sys.argv[0], 'gevent'] + sys.argv[1:])
+
     load_server_wide_modules()
 
     if wdoo.evented:
@@ -42,6 +42,7 @@ def undecimalize(symb, cr):
 psycopg2.extensions.register_type(psycopg2.extensions.new_type((700, 701, 1700,), 'float', undecimalize))
 
 
+import wdoo
 from . import tools
 from .tools.func import frame_codeinfo
 
@@ -532,10 +533,23 @@ class ConnectionPool(object):
                 self._lock.release()
         return _locked
 
-    def __init__(self, maxconn=64):
+    def __init__(self, maxconn=64, wait_timeout=None, maxconn_per_db=0):
+        """
+        :param int maxconn: maximum number of connections kept open
+        :param wait_timeout: when the pool is full, wait up to that many
+            seconds for a connection to be given back instead of failing
+            right away; meant for the evented server, where many greenlets
+            share the pool
+        :param int maxconn_per_db: when waiting is enabled, maximum number of
+            connections used at the same time on a given database (0 means
+            no limit besides ``maxconn``)
+        """
         self._connections = []
         self._maxconn = max(maxconn, 1)
         self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._wait_timeout = wait_timeout
+        self._maxconn_per_db = maxconn_per_db
 
     def __repr__(self):
         used = len([1 for c, u in self._connections[:] if u])
@@ -545,12 +559,42 @@ class ConnectionPool(object):
     def _debug(self, msg, *args):
         _logger.debug(('%r ' + msg), self, *args)
 
+    def _is_full(self, connection_info):
+        """ Return whether no connection to the given database can be borrowed now. """
+        used = [cnx for cnx, u in self._connections if u and not cnx.closed]
+        if len(used) >= self._maxconn:
+            return True
+        if self._maxconn_per_db:
+            database = connection_info.get('database') or connection_info.get('dsn')
+            count = sum(
+                1 for cnx in used
+                if (cnx._original_dsn.get('database') or cnx._original_dsn.get('dsn')) == database
+            )
+            return count >= self._maxconn_per_db
+        return False
+
+    def _wait_available(self, connection_info):
+        """ Wait (with the pool lock released) until a connection to the given
+        database can be borrowed, or raise a PoolError after ``wait_timeout``
+        seconds.
+        """
+        deadline = time.time() + self._wait_timeout
+        while self._is_full(connection_info):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise PoolError('The Connection Pool Is Full')
+            self._debug('Waiting for a connection to %r', connection_info.get('database'))
+            self._available.wait(remaining)
+
     @locked
     def borrow(self, connection_info):
         """
         :param dict connection_info: dict of psql connection keywords
         :rtype: PsycoConnection
         """
+        if self._wait_timeout:
+            self._wait_available(connection_info)
+
         # free dead and leaked connections
         for i, (cnx, _) in tools.reverse_enumerate(self._connections):
             if cnx.closed:
@@ -616,6 +660,9 @@ class ConnectionPool(object):
                 else:
                     self._debug('Forgot connection to %r', cnx.dsn)
                     cnx.close()
+                # wake all the waiters: the ones waiting for another database
+                # may not be able to use the connection given back
+                self._available.notify_all()
                 break
         else:
             raise PoolError('This connection does not belong to the pool')
@@ -683,7 +730,15 @@ _Pool = None
 def db_connect(to, allow_uri=False):
     global _Pool
     if _Pool is None:
-        _Pool = ConnectionPool(int(tools.config['db_maxconn']))
+        if wdoo.evented:
+            # greenlets wait for a connection instead of failing when the pool is full
+            _Pool = ConnectionPool(
+                int(tools.config['db_maxconn']),
+                wait_timeout=tools.config['limit_time_real'] or 120,
+                maxconn_per_db=int(tools.config['db_maxconn_per_db'] or 0),
+            )
+        else:
+            _Pool = ConnectionPool(int(tools.config['db_maxconn']))
 
     db, info = connection_info_for(to)
     if not allow_uri and db != to:
@@ -9,7 +9,6 @@ from . import cloc
 from .config import config
 from .misc import *
 from .translate import *
-from .image import *
 from .sql import *
 from .float_utils import *
 from .html import *
@@ -21,4 +20,22 @@ from .convert import *
 from .template_inheritance import *
 from . import osutil
 from .js_transpiler import transpile_javascript, is_wdoo_module, URL_RE, WDOO_MODULE_RE
-from .sourcemap_generator import SourceMapGenerator
\ No newline at end of file
+from .sourcemap_generator import SourceMapGenerator
+
+
+# tools.image imports PIL, which most processes only need when they actually
+# manipulate images: its public names are imported on first access
+_IMAGE_NAMES = frozenset([
+    'FILETYPE_BASE64_MAGICWORD', 'EXIF_TAG_ORIENTATION', 'EXIF_TAG_ORIENTATION_TO_TRANSPOSE_METHODS',
+    'IMAGE_MAX_RESOLUTION', 'ImageProcess', 'image_process', 'average_dominant_color',
+    'image_fix_orientation', 'base64_to_image', 'image_apply_opt', 'image_to_base64',
+    'is_image_size_above', 'image_guess_size_from_field_name', 'image_data_uri',
+    'get_saturation', 'get_lightness', 'hex_to_rgb', 'rgb_to_hex',
+])
+
+def __getattr__(name):
+    if name not in _IMAGE_NAMES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    from . import image
+    value = globals()[name] = getattr(image, name)
+    return value
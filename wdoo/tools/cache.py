@@ -54,6 +54,7 @@ class ormcache(object):
         self.determine_key()
         lookup = decorator(self.lookup, method)
         lookup.clear_cache = self.clear
+        lookup.discard = self.discard
         return lookup
 
     def determine_key(self):
@@ -94,6 +95,15 @@ class ormcache(object):
         """ Clear the registry cache """
         model.pool._clear_cache()
 
+    def discard(self, model, *args, **kwargs):
+        """ Remove the value cached for the given arguments of the method
+        from the registry cache of the current process only. """
+        d, key0, counter = self.lru(model)
+        try:
+            d.pop(key0 + self.key(model, *args, **kwargs))
+        except KeyError:
+            pass
+
 
 class ormcache_context(ormcache):
     """ This LRU cache decorator is a variant of :class:`ormcache`, with an
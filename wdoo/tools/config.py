@@ -132,6 +132,11 @@ class configmanager(object):
         group.add_option("--proxy-mode", dest="proxy_mode", action="store_true", my_default=False,
                          help="Activate reverse proxy WSGI wrappers (headers rewriting) "
                               "Only enable this when running behind a trusted web proxy!")
+        group.add_option("--gevent-http", dest="gevent_http", action="store_true", my_default=False,
+                         help="Serve all the HTTP traffic on the main HTTP port with the cooperative "
+                              "(gevent) server instead of threads or prefork workers. Cron jobs are "
+                              "not processed by this server: run them in a separate server "
+                              "started with --no-http. The memory limits do not apply.")
         # HTTP: hidden backwards-compatibility for "*xmlrpc*" options
         hidden = optparse.SUPPRESS_HELP
         group.add_option("--xmlrpc-interface", dest="http_interface", help=hidden)
@@ -229,6 +234,10 @@ class configmanager(object):
                          help="specify the database ssl connection mode (see PostgreSQL documentation)")
         group.add_option("--db_maxconn", dest="db_maxconn", type='int', my_default=64,
                          help="specify the maximum number of physical connections to PostgreSQL")
+        group.add_option("--db-maxconn-per-db", dest="db_maxconn_per_db", type='int', my_default=0,
+                         help="specify the maximum number of connections used at the same time on a "
+                              "database by the gevent server, further requests wait for a connection "
+                              "(default: no limit besides db_maxconn)")
         group.add_option("--db-template", dest="db_template", my_default="template0",
                          help="specify a custom database template to create a new database")
         parser.add_option_group(group)
@@ -316,6 +325,10 @@ class configmanager(object):
             group.add_option("--limit-request", dest="limit_request", my_default=8192,
                              help="Maximum number of request to be processed per worker (default 8192).",
                              type="int")
+            group.add_option("--preload-warmup", dest="preload_warmup", action="store_true", my_default=False,
+                             help="Warm the caches of the preloaded databases in the main process and freeze "
+                                  "its heap before forking the workers, so that they share the memory of the "
+                                  "registries and answer their first requests faster.")
             parser.add_option_group(group)
 
         # Copy all optparse options (i.e. MyOption) into self.options.
@@ -405,7 +418,7 @@ class configmanager(object):
         keys = ['http_interface', 'http_port', 'longpolling_port', 'http_enable',
                 'db_name', 'db_user', 'db_password', 'db_host', 'db_sslmode',
                 'db_port', 'db_template', 'logfile', 'pidfile',                
-                'db_maxconn', 'addons_path', 'upgrade_path',
+                'db_maxconn', 'db_maxconn_per_db', 'addons_path', 'upgrade_path',
                 'syslog', 'screencasts', 'screenshots',
                 'dbfilter', 'log_level', 'log_db',
                 'log_db_level', 'geoip_database', 'dev_mode', 'shell_interface'
@@ -429,7 +442,7 @@ class configmanager(object):
             'language', 'translate_out', 'translate_in', 'overwrite_existing_translations',
             'dev_mode', 'shell_interface', 'load_language',
             'stop_after_init', 'http_enable', 'syslog',
-            'list_db', 'proxy_mode',
+            'list_db', 'proxy_mode', 'gevent_http',
             'test_file', 'test_tags',
             'osv_memory_count_limit', 'osv_memory_age_limit', 'transient_age_limit', 'max_cron_threads', 'unaccent',
             'data_dir',
@@ -439,7 +452,8 @@ class configmanager(object):
         posix_keys = [
             'workers',
             'limit_memory_hard', 'limit_memory_soft',
-            'limit_time_cpu', 'limit_time_real', 'limit_request', 'limit_time_real_cron'
+            'limit_time_cpu', 'limit_time_real', 'limit_request', 'limit_time_real_cron',
+            'preload_warmup',
         ]
 
         if os.name == 'posix':
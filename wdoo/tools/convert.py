@@ -7,14 +7,19 @@ __all__ = [
 ]
 
 import base64
+import functools
 import io
 import logging
+import multiprocessing
 import os.path
 import pprint
 import re
 import subprocess
+import threading
 import warnings
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
@@ -270,12 +275,15 @@ form: module.record_id""" % (xml_id,)
 
         if records:
             records.unlink()
+            self._xmlid_refs.clear()
 
     def _tag_function(self, rec):
         if self.noupdate and self.mode != 'init':
             return
         env = self.get_env(rec)
         _eval_xml(self, rec, env)
+        # the function may have changed any record
+        self._xmlid_refs.clear()
 
     def _tag_menuitem(self, rec, parent=None):
         rec_id = rec.attrib["id"]
@@ -335,6 +343,7 @@ form: module.record_id""" % (xml_id,)
             'noupdate': self.noupdate,
         }
         menu = self.env['ir.ui.menu']._load_records([data], self.mode == 'update')
+        self._xmlid_refs.pop(data['xml_id'], None)
         for child in rec.iterchildren('menuitem'):
             self._tag_menuitem(child, parent=menu.id)
 
@@ -354,6 +363,9 @@ form: module.record_id""" % (xml_id,)
 
         self._test_xml_id(rec_id)
         xid = self.make_xml_id(rec_id)
+        if xid and xid in self._batch_xmlids:
+            # the record is defined twice in the same batch
+            self._flush_records()
 
         # in update mode, the record won't be updated if the data node explicitly
         # opt-out using @noupdate="1". A second check will be performed in
@@ -395,6 +407,9 @@ form: module.record_id""" % (xml_id,)
             f_use = field.get("use",'') or 'id'
             f_val = False
 
+            if self._depends_on_batch(field):
+                self._flush_records()
+
             if f_search:
                 idref2 = _get_idref(self, env, f_model, self.idref)
                 q = safe_eval(f_search, idref2)
@@ -431,13 +446,105 @@ form: module.record_id""" % (xml_id,)
             res[f_name] = f_val
 
         data = dict(xml_id=xid, values=res, noupdate=self.noupdate)
+        if env is self.env and self._can_batch(rec_model):
+            self._batch_record(rec, env[rec_model], data)
+            return None
+
+        self._flush_records()
         record = model._load_records([data], self.mode == 'update')
-        if rec_id:
-            self.idref[rec_id] = record.id
+        self._record_loaded(rec_id, xid, record)
         if config.get('import_partial'):
             env.cr.commit()
         return rec_model, record.id
 
+    # batches of records: consecutive records of the same model are loaded
+    # with a single call to _load_records(), unless a record depends on a
+    # record of the batch; the latter is then loaded first
+
+    BATCH_SIZE = 500
+    UNBATCHED_MODELS = ('ir.ui.view', 'theme.ir.ui.view')
+
+    def _can_batch(self, model_name):
+        return model_name not in self.UNBATCHED_MODELS and not config.get('import_partial')
+
+    def _batch_record(self, rec, model, data):
+        key = (model._name, model.env)
+        if self._batch and self._batch[0] != key:
+            self._flush_records()
+        if not self._batch:
+            if self.xml_filename:
+                model = model.with_context(
+                    install_module=self.module,
+                    install_filename=self.xml_filename,
+                )
+            self._batch = (key, model, [])
+        self._batch[2].append((rec, data))
+        if data['xml_id']:
+            self._batch_xmlids.add(data['xml_id'])
+            self._batch_names.add(rec.get('id'))
+        if len(self._batch[2]) >= self.BATCH_SIZE:
+            self._flush_records()
+
+    def _depends_on_batch(self, node):
+        """ Return whether evaluating ``node`` may read the records of the
+        current batch. References to their xmlids are handled by ``id_get``.
+        """
+        if not self._batch:
+            return False
+        for el in node.xpath('descendant-or-self::*[@search or @eval]'):
+            if el.get('search'):
+                return True
+            names = set(re.findall(r'\w+', el.get('eval')))
+            if 'obj' in names or not names.isdisjoint(self._batch_names):
+                return True
+        return False
+
+    def _flush_records(self):
+        """ Load the records of the current batch. """
+        if not self._batch:
+            return
+        (_key, model, items), self._batch = self._batch, None
+        self._batch_xmlids.clear()
+        self._batch_names.clear()
+        update = self.mode == 'update'
+        try:
+            # _load_records() modifies its arguments, keep them for the retry
+            data_list = [dict(data, values=dict(data['values'])) for _rec, data in items]
+            with model.env.cr.savepoint():
+                records = model._load_records(data_list, update)
+        except Exception:
+            # load the records one by one to report the faulty one
+            for rec, data in items:
+                with self._parse_error_context(rec):
+                    record = model.with_context(install_xmlid=rec.get('id'))._load_records([data], update)
+                self._record_loaded(rec.get('id'), data['xml_id'], record)
+            return
+        for (rec, data), record in zip(items, records):
+            self._record_loaded(rec.get('id'), data['xml_id'], record)
+
+    def _record_loaded(self, rec_id, xid, record):
+        if rec_id:
+            self.idref[rec_id] = record.id
+        if xid:
+            self._xmlid_refs.pop(xid, None)
+
+    def _prefetch_refs(self, el):
+        """ Resolve the xmlids referenced by the records of ``el`` at once. """
+        xmlids = set()
+        for node in el.iter('field', 'menuitem', 'template'):
+            for attr in ('ref', 'parent', 'action', 'inherit_id'):
+                if node.get(attr):
+                    xmlids.add(node.get(attr))
+            if node.get('eval') and 'ref(' in node.get('eval'):
+                xmlids.update(re.findall(r"\bref\(\s*['\"]([\w.]+)['\"]\s*\)", node.get('eval')))
+        xmlids = {
+            self.make_xml_id(xmlid)
+            for xmlid in xmlids
+            if xmlid not in self.idref and xmlid.count('.') <= 1
+        }
+        if xmlids:
+            self._xmlid_refs.update(self.env['ir.model.data']._xmlids_to_res_model_res_ids(xmlids))
+
     def _tag_template(self, el):
         # This helper transforms a <template> element into a <record> and forwards it
         tpl_id = el.get('id', el.get('t-name'))
@@ -517,6 +624,10 @@ form: module.record_id""" % (xml_id,)
     def model_id_get(self, id_str, raise_if_not_found=True):
         if '.' not in id_str:
             id_str = '%s.%s' % (self.module, id_str)
+        if id_str in self._batch_xmlids:
+            self._flush_records()
+        if id_str in self._xmlid_refs:
+            return self._xmlid_refs[id_str]
         return self.env['ir.model.data']._xmlid_to_res_model_res_id(id_str, raise_if_not_found=raise_if_not_found)
 
     def _tag_root(self, el):
@@ -524,32 +635,41 @@ form: module.record_id""" % (xml_id,)
             f = self._tags.get(rec.tag)
             if f is None:
                 continue
+            if rec.tag != 'record':
+                self._flush_records()
 
             self.envs.append(self.get_env(el))
             self._noupdate.append(nodeattr2bool(el, 'noupdate', self.noupdate))
             try:
-                f(rec)
-            except ParseError:
-                raise
-            except ValidationError as err:
-                msg = "while parsing {file}:{viewline}\n{err}\n\nView error context:\n{context}\n".format(
-                    file=rec.getroottree().docinfo.URL,
-                    viewline=rec.sourceline,
-                    context=pprint.pformat(getattr(err, 'context', None) or '-no context-'),
-                    err=err.args[0],
-                )
-                _logger.debug(msg, exc_info=True)
-                raise ParseError(msg) from None  # Restart with "--log-handler wdoo.tools.convert:DEBUG" for complete traceback
-            except Exception as e:
-                raise ParseError('while parsing %s:%s, somewhere inside\n%s' % (
-                    rec.getroottree().docinfo.URL,
-                    rec.sourceline,
-                    etree.tostring(rec, encoding='unicode').rstrip()
-                )) from e
+                with self._parse_error_context(rec):
+                    f(rec)
             finally:
                 self._noupdate.pop()
                 self.envs.pop()
 
+    @contextmanager
+    def _parse_error_context(self, rec):
+        """ Report the errors raised while processing ``rec`` as parse errors. """
+        try:
+            yield
+        except ParseError:
+            raise
+        except ValidationError as err:
+            msg = "while parsing {file}:{viewline}\n{err}\n\nView error context:\n{context}\n".format(
+                file=rec.getroottree().docinfo.URL,
+                viewline=rec.sourceline,
+                context=pprint.pformat(getattr(err, 'context', None) or '-no context-'),
+                err=err.args[0],
+            )
+            _logger.debug(msg, exc_info=True)
+            raise ParseError(msg) from None  # Restart with "--log-handler wdoo.tools.convert:DEBUG" for complete traceback
+        except Exception as e:
+            raise ParseError('while parsing %s:%s, somewhere inside\n%s' % (
+                rec.getroottree().docinfo.URL,
+                rec.sourceline,
+                etree.tostring(rec, encoding='unicode').rstrip()
+            )) from e
+
     @property
     def env(self):
         return self.envs[-1]
@@ -565,6 +685,10 @@ form: module.record_id""" % (xml_id,)
         self.idref = {} if idref is None else idref
         self._noupdate = [noupdate]
         self.xml_filename = xml_filename
+        self._batch = None              # (key, model, [(rec, data)]) of records to load
+        self._batch_xmlids = set()      # xmlids of the records in the batch
+        self._batch_names = set()       # ids of the records in the batch
+        self._xmlid_refs = {}           # prefetched {xmlid: (res_model, res_id)}
         self._tags = {
             'record': self._tag_record,
             'delete': self._tag_delete,
@@ -577,7 +701,9 @@ form: module.record_id""" % (xml_id,)
 
     def parse(self, de):
         assert de.tag in self.DATA_ROOTS, "Root xml tag must be <wdoo>, <wdoo> or <data>."
+        self._prefetch_refs(de)
         self._tag_root(de)
+        self._flush_records()
     DATA_ROOTS = ['wdoo', 'data', 'wdoo']
 
 def convert_file(cr, module, filename, idref, mode='update', noupdate=False, kind=None, pathname=None):
@@ -635,26 +761,90 @@ def convert_csv_import(cr, module, fname, csvcontent, idref=None, mode='init',
         warning_msg = "\n".join(msg['message'] for msg in result['messages'])
         raise Exception(_('Module loading %s failed: file %s could not be processed:\n %s') % (module, fname, warning_msg))
 
-def convert_xml_import(cr, module, xmlfile, idref=None, mode='init', noupdate=False, report=None):
-    doc = etree.parse(xmlfile)
-    schema = os.path.join(config['root_path'], 'import_xml.rng')
-    relaxng = etree.RelaxNG(etree.parse(schema))
+# maximum number of processes validating XML files ahead of their import
+PREVALIDATE_MAX_WORKERS = 4
+
+def _get_xml_schema_path():
+    return os.path.join(config['root_path'], 'import_xml.rng')
+
+@functools.lru_cache(maxsize=None)
+def _get_relaxng(schema):
+    return etree.RelaxNG(etree.parse(schema))
+
+def _validate_xml_file(pathname):
+    """ Return whether the XML data file ``pathname`` fits the schema. """
     try:
-        relaxng.assert_(doc)
+        return _get_relaxng(_get_xml_schema_path()).validate(etree.parse(pathname))
     except Exception:
-        _logger.exception("The XML file '%s' does not fit the required schema !", xmlfile.name)
-        if jingtrang:
-            p = subprocess.run(['pyjing', schema, xmlfile.name], stdout=subprocess.PIPE)
-            _logger.warning(p.stdout.decode())
-        else:
-            for e in relaxng.error_log:
-                _logger.warning(e)
-            _logger.info("Install 'jingtrang' for more precise and useful validation messages.")
-        raise
+        return False
+
+@contextmanager
+def prevalidate_xml_files(cr, pathnames):
+    """ Validate the given XML data files against the schema in a pool of
+    processes while the context is active: their import with the cursor
+    ``cr`` then no longer validates them, unless the validation failed, in
+    which case the import validates them again and reports the errors.
+
+    The pool is only forked by a single-threaded process, since forking a
+    process running other threads (e.g. the threaded HTTP server) may
+    deadlock the children on the locks held by those threads.
+    """
+    validations = cr.cache.setdefault('xml_validations', {})
+    pathnames = [
+        path for path in dict.fromkeys(map(os.path.realpath, pathnames))
+        if path not in validations
+    ]
+    if len(pathnames) < 2 or os.name != 'posix' or wdoo.evented or threading.active_count() > 1:
+        yield
+        return
 
+    # the children only run the validation of the files
+    executor = ProcessPoolExecutor(
+        max_workers=min(len(pathnames), os.cpu_count() or 1, PREVALIDATE_MAX_WORKERS),
+        mp_context=multiprocessing.get_context('fork'),
+    )
+    try:
+        for path in pathnames:
+            validations[path] = executor.submit(_validate_xml_file, path)
+        yield
+    finally:
+        for path in pathnames:
+            future = validations.pop(path, None)
+            if future is not None:
+                future.cancel()
+        executor.shutdown()
+
+def _is_xml_file_valid(cr, xml_filename):
+    """ Return whether the file has been validated ahead of its import. """
+    future = cr.cache.get('xml_validations', {}).get(os.path.realpath(xml_filename))
+    if future is None:
+        return False
+    try:
+        return future.result()
+    except Exception:
+        return False
+
+def convert_xml_import(cr, module, xmlfile, idref=None, mode='init', noupdate=False, report=None):
     if isinstance(xmlfile, str):
         xml_filename = xmlfile
     else:
         xml_filename = xmlfile.name
+    doc = etree.parse(xmlfile)
+    if not _is_xml_file_valid(cr, xml_filename):
+        schema = _get_xml_schema_path()
+        relaxng = _get_relaxng(schema)
+        try:
+            relaxng.assert_(doc)
+        except Exception:
+            _logger.exception("The XML file '%s' does not fit the required schema !", xml_filename)
+            if jingtrang:
+                p = subprocess.run(['pyjing', schema, xml_filename], stdout=subprocess.PIPE)
+                _logger.warning(p.stdout.decode())
+            else:
+                for e in relaxng.error_log:
+                    _logger.warning(e)
+                _logger.info("Install 'jingtrang' for more precise and useful validation messages.")
+            raise
+
     obj = xml_import(cr, module, idref, mode, noupdate=noupdate, xml_filename=xml_filename)
     obj.parse(doc.getroot())
\ No newline at end of file
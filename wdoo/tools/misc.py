@@ -12,12 +12,15 @@ import hmac as hmac_lib
 import hashlib
 import io
 import itertools
+import marshal
 import os
 import pickle as pickle_
 import re
+import shutil
 import socket
 import subprocess
 import sys
+import tempfile
 import threading
 import time
 import traceback
@@ -35,9 +38,7 @@ from operator import itemgetter
 import babel
 import babel.dates
 import markupsafe
-import passlib.utils
 import pytz
-import werkzeug.utils
 from lxml import etree
 
 import wdoo
@@ -200,6 +201,81 @@ def file_open(name, mode="r", filter_ext=None):
         return open(path, mode)
     raise FileNotFoundError("Not a file: " + name)
 
+def write_marshal_file(path, value, key=None):
+    """Write ``value`` serialized with :mod:`marshal` in the file ``path``,
+    creating its directory if needed. The data is written in a temporary file
+    which is then renamed, so that concurrent processes never read a partial
+    file.
+    :param bytes key: if given, the data is prefixed by its HMAC-SHA256 with
+        that key, see :func:`read_marshal_file`
+    :raise OSError: if the file cannot be written
+    """
+    data = marshal.dumps(value)
+    if key is not None:
+        data = hmac_lib.new(key, data, hashlib.sha256).digest() + data
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with ignore(OSError):
+            os.unlink(tmp_path)
+        raise
+
+def read_marshal_file(path, key=None):
+    """Return the value written by :func:`write_marshal_file` in the file
+    ``path``. If ``key`` is given, the HMAC of the data is checked before the
+    data is deserialized.
+    :raise OSError: if the file cannot be read
+    :raise ValueError: if the signature does not match ``key``, or the data
+        is invalid
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if key is not None:
+        digest, data = data[:32], data[32:]
+        if not hmac_lib.compare_digest(digest, hmac_lib.new(key, data, hashlib.sha256).digest()):
+            raise ValueError("Invalid signature of %s" % path)
+    try:
+        return marshal.loads(data)
+    except (EOFError, TypeError) as e:
+        raise ValueError("Invalid data in %s" % path) from e
+
+def prune_cache_directory(root, current, max_age):
+    """Clean up a cache directory whose entries are specific to a version.
+    Remove the entries of ``root`` other than ``current``, and the files in
+    ``root/current`` that have not been modified for ``max_age`` seconds.
+    Errors are ignored, as another process may clean up the same directory,
+    or the directory may be read-only.
+    :param str root: path of the cache directory
+    :param str current: name of the entry of ``root`` in use
+    :param float max_age: maximum age of the files in seconds
+    :return: the number of removed files and directories
+    """
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return 0
+    removed = 0
+    for entry in entries:
+        if entry != current:
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+            removed += 1
+    limit = time.time() - max_age
+    for dirpath, _dirnames, filenames in os.walk(os.path.join(root, current)):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                if os.stat(path).st_mtime < limit:
+                    os.unlink(path)
+                    removed += 1
+            except OSError:
+                pass
+    return removed
+
 #----------------------------------------------------------
 # iterables
 #----------------------------------------------------------
@@ -313,8 +389,11 @@ def merge_sequences(*iterables):
     return topological_sort(deps)
 
 
-try:
-    import xlwt
+def _import_xlwt():
+    try:
+        import xlwt
+    except ImportError:
+        return None
 
     # add some sanitization to respect the excel sheet name restrictions
     # as the sheet name is often translatable, can not control the input
@@ -328,12 +407,14 @@ try:
             return super(PatchedWorkbook, self).add_sheet(name, cell_overwrite_ok=cell_overwrite_ok)
 
     xlwt.Workbook = PatchedWorkbook
+    return xlwt
 
-except ImportError:
-    xlwt = None
 
-try:
-    import xlsxwriter
+def _import_xlsxwriter():
+    try:
+        import xlsxwriter
+    except ImportError:
+        return None
 
     # add some sanitization to respect the excel sheet name restrictions
     # as the sheet name is often translatable, can not control the input
@@ -350,9 +431,22 @@ try:
             return super(PatchedXlsxWorkbook, self).add_worksheet(name, **kw)
 
     xlsxwriter.Workbook = PatchedXlsxWorkbook
+    return xlsxwriter
+
+
+# the spreadsheet libraries are imported and patched on first access to
+# ``misc.xlwt`` or ``misc.xlsxwriter``, which are ``None`` if not installed
+_LAZY_MODULES = {
+    'xlwt': _import_xlwt,
+    'xlsxwriter': _import_xlsxwriter,
+}
 
-except ImportError:
-    xlsxwriter = None
+
+def __getattr__(name):
+    if name not in _LAZY_MODULES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    module = globals()[name] = _LAZY_MODULES[name]()
+    return module
 
 
 def to_xml(s):
@@ -1431,12 +1525,8 @@ def format_duration(value):
     return '%02d:%02d' % (hours, minutes)
 
 
-def _consteq(str1, str2):
-    """ Constant-time string comparison. Suitable to compare bytestrings of fixed,
-        known length only, because length difference is optimized. """
-    return len(str1) == len(str2) and sum(ord(x)^ord(y) for x, y in zip(str1, str2)) == 0
-
-consteq = getattr(passlib.utils, 'consteq', _consteq)
+# same as passlib.utils.consteq, without importing passlib
+consteq = hmac_lib.compare_digest
 
 # forbid globals entirely: str/unicode, int/long, float, bool, tuple, list, dict, None
 class Unpickler(pickle_.Unpickler, object):
@@ -349,6 +349,10 @@ class QwebTracker():
         for hook in self.qweb_hooks:
             hook('leave', self.cr.sql_log_count)
 
+    def cache_fragment(self, hit):
+        for hook in self.qweb_hooks:
+            hook('cache', self.cr.sql_log_count, hit=hit)
+
 
 class QwebCollector(Collector):
     """
@@ -399,6 +403,7 @@ class QwebCollector(Collector):
         stack = []
         results = []
         archs = {}
+        cache_stats = {'cache_hit': 0, 'cache_miss': 0}
         for event, kwargs, sql_count, time in self.events:
             if event == 'render':
                 archs[kwargs['view_id']] = kwargs['arch']
@@ -422,11 +427,16 @@ class QwebCollector(Collector):
                 }
                 results.append(data)
                 stack.append(data)
+            elif event == 'cache':
+                counter = 'cache_hit' if kwargs['hit'] else 'cache_miss'
+                cache_stats[counter] += 1
+                if stack:
+                    stack[-1][counter] = stack[-1].get(counter, 0) + 1
             else:
                 assert event == "leave"
                 data = stack.pop()
 
-        self.add({'results': {'archs': archs, 'data': results}})
+        self.add({'results': {'archs': archs, 'data': results, 'cache': cache_stats}})
         super().post_process()
 
 
@@ -23,6 +23,7 @@ from types import CodeType
 import werkzeug
 from psycopg2 import OperationalError
 
+from .lru import LRU
 from .misc import ustr
 
 import wdoo
@@ -184,6 +185,25 @@ def test_expr(expr, allowed_codes, mode="eval"):
     return code_obj
 
 
+# code objects of the expressions validated by safe_eval(), keyed by
+# (expression, mode): the same expressions (domains, contexts, rules, attrs)
+# are evaluated over and over
+_safe_code_cache = LRU(4096)
+
+
+def _get_safe_code(expr, mode):
+    """ Return the code object of ``expr`` validated with ``_SAFE_OPCODES``,
+    see :func:`test_expr`. Code objects are immutable, so they are shared.
+    """
+    key = (expr, mode)
+    try:
+        return _safe_code_cache[key]
+    except KeyError:
+        pass
+    code = _safe_code_cache[key] = test_expr(expr, _SAFE_OPCODES, mode=mode)
+    return code
+
+
 def const_eval(expr):
     """const_eval(expression) -> value
     Safe Python constant evaluation
@@ -309,7 +329,7 @@ def safe_eval(expr, globals_dict=None, locals_dict=None, mode="eval", nocopy=Fal
         if locals_dict is None:
             locals_dict = {}
         locals_dict.update(_BUILTINS)
-    c = test_expr(expr, _SAFE_OPCODES, mode=mode)
+    c = _get_safe_code(expr, mode)
     try:
         return unsafe_eval(c, globals_dict, locals_dict)
     except wdoo.exceptions.UserError:
@@ -16,8 +16,90 @@ _CONFDELTYPES = {
     'SET DEFAULT': 'd',
 }
 
+def load_schema_snapshot(cr, tablenames):
+    """ Fetch the kind, columns, constraints, foreign keys and indexes of the
+        given tables in a few catalog queries, and add them to the snapshot kept
+        on the cursor until :func:`drop_schema_snapshot` is called.  The other
+        tables of the snapshot are left untouched.  Meanwhile, the functions below
+        read those tables from the snapshot instead of querying the catalog,
+        and the ones that modify a table drop it from the snapshot.
+
+        The snapshot is only valid as long as the tables are modified with the
+        functions of this module: code that modifies a table with
+        ``cr.execute()`` while a snapshot is loaded must call
+        :func:`drop_schema_snapshot` for that table.  See
+        :meth:`~wdoo.modules.registry.Registry.init_models`, which takes care
+        of the overrides of ``_auto_init()`` and ``init()``.
+    """
+    tablenames = tuple(set(tablenames))
+    snapshot = {
+        tablename: {'kind': None, 'columns': {}, 'constraints': {}, 'foreign_keys': {}, 'indexes': {}}
+        for tablename in tablenames
+    }
+    if tablenames:
+        cr.execute("""
+            SELECT c.relname, c.relkind
+              FROM pg_class c
+              JOIN pg_namespace n ON (n.oid = c.relnamespace)
+             WHERE c.relname IN %s
+               AND n.nspname = current_schema
+        """, [tablenames])
+        for tablename, kind in cr.fetchall():
+            snapshot[tablename]['kind'] = kind
+
+        # see table_columns() about the selected fields
+        cr.execute(""" SELECT table_name, column_name, udt_name, character_maximum_length, is_nullable
+                       FROM information_schema.columns WHERE table_name IN %s """, [tablenames])
+        for row in cr.dictfetchall():
+            snapshot[row.pop('table_name')]['columns'][row['column_name']] = row
+
+        cr.execute("""
+            SELECT t.relname, c.conname, COALESCE(d.description, pg_get_constraintdef(c.oid))
+            FROM pg_constraint c
+            JOIN pg_class t ON t.oid = c.conrelid
+            LEFT JOIN pg_description d ON c.oid = d.objoid
+            WHERE t.relname IN %s
+        """, [tablenames])
+        for tablename, constraintname, definition in cr.fetchall():
+            snapshot[tablename]['constraints'].setdefault(constraintname, definition)
+
+        for key, spec in _fetch_foreign_keys(cr, tablenames).items():
+            snapshot[key[0]]['foreign_keys'][key] = spec
+
+        cr.execute("SELECT tablename, indexname FROM pg_indexes WHERE tablename IN %s", [tablenames])
+        for tablename, indexname in cr.fetchall():
+            snapshot[tablename]['indexes'][indexname] = tablename
+
+    cr.cache.setdefault('schema_snapshot', {}).update(snapshot)
+
+def drop_schema_snapshot(cr, tablename=None):
+    """ Drop the given table from the schema snapshot, or the whole snapshot
+        if no table is given.  This must be called after modifying a table
+        without the functions of this module.
+    """
+    if tablename is None:
+        cr.cache.pop('schema_snapshot', None)
+    elif 'schema_snapshot' in cr.cache:
+        cr.cache['schema_snapshot'].pop(tablename, None)
+
+def _get_snapshots(cr, tablenames):
+    """ Return the snapshots of the given tables, and the names of the tables
+        that are not in the schema snapshot.
+    """
+    snapshot = cr.cache.get('schema_snapshot', {})
+    found = {tablename: snapshot[tablename] for tablename in tablenames if tablename in snapshot}
+    return found, [tablename for tablename in tablenames if tablename not in found]
+
 def existing_tables(cr, tablenames):
     """ Return the names of existing tables among ``tablenames``. """
+    found, tablenames = _get_snapshots(cr, tablenames)
+    result = [
+        tablename
+        for tablename, snapshot in found.items()
+        if snapshot['kind'] in ('r', 'v', 'm')
+    ]
+    if not tablenames:
+        return result
     query = """
         SELECT c.relname
           FROM pg_class c
@@ -27,7 +109,7 @@ def existing_tables(cr, tablenames):
            AND n.nspname = current_schema
     """
     cr.execute(query, [tuple(tablenames)])
-    return [row[0] for row in cr.fetchall()]
+    return result + [row[0] for row in cr.fetchall()]
 
 def table_exists(cr, tablename):
     """ Return whether the given table exists. """
@@ -38,6 +120,9 @@ def table_kind(cr, tablename):
         ``'f'`` (foreign table), ``'t'`` (temporary table),
         ``'m'`` (materialized view), or ``None``.
     """
+    found, _missing = _get_snapshots(cr, [tablename])
+    if found:
+        return found[tablename]['kind']
     query = """
         SELECT c.relkind
           FROM pg_class c
@@ -50,6 +135,7 @@ def table_kind(cr, tablename):
 
 def create_model_table(cr, tablename, comment=None, columns=()):
     """ Create the table for a model. """
+    drop_schema_snapshot(cr, tablename)
     colspecs = ['id SERIAL NOT NULL'] + [
         '"{}" {}'.format(columnname, columntype)
         for columnname, columntype, columncomment in columns
@@ -75,6 +161,9 @@ def table_columns(cr, tablename):
     # Do not select the field `character_octet_length` from `information_schema.columns`
     # because specific access right restriction in the context of shared hosting (Heroku, OVH, ...)
     # might prevent a postgres user to read this field.
+    found, _missing = _get_snapshots(cr, [tablename])
+    if found:
+        return dict(found[tablename]['columns'])
     query = '''SELECT column_name, udt_name, character_maximum_length, is_nullable
                FROM information_schema.columns WHERE table_name=%s'''
     cr.execute(query, (tablename,))
@@ -82,6 +171,9 @@ def table_columns(cr, tablename):
 
 def column_exists(cr, tablename, columnname):
     """ Return whether the given column exists. """
+    found, _missing = _get_snapshots(cr, [tablename])
+    if found:
+        return int(columnname in found[tablename]['columns'])
     query = """ SELECT 1 FROM information_schema.columns
                 WHERE table_name=%s AND column_name=%s """
     cr.execute(query, (tablename, columnname))
@@ -89,6 +181,7 @@ def column_exists(cr, tablename, columnname):
 
 def create_column(cr, tablename, columnname, columntype, comment=None):
     """ Create a column with the given type. """
+    drop_schema_snapshot(cr, tablename)
     coldefault = (columntype.upper()=='BOOLEAN') and 'DEFAULT false' or ''
     cr.execute('ALTER TABLE "{}" ADD COLUMN "{}" {} {}'.format(tablename, columnname, columntype, coldefault))
     if comment:
@@ -97,11 +190,13 @@ def create_column(cr, tablename, columnname, columntype, comment=None):
 
 def rename_column(cr, tablename, columnname1, columnname2):
     """ Rename the given column. """
+    drop_schema_snapshot(cr, tablename)
     cr.execute('ALTER TABLE "{}" RENAME COLUMN "{}" TO "{}"'.format(tablename, columnname1, columnname2))
     _schema.debug("Table %r: renamed column %r to %r", tablename, columnname1, columnname2)
 
 def convert_column(cr, tablename, columnname, columntype):
     """ Convert the column to the given type. """
+    drop_schema_snapshot(cr, tablename)
     try:
         with cr.savepoint(flush=False):
             cr.execute('ALTER TABLE "{}" ALTER COLUMN "{}" TYPE {}'.format(tablename, columnname, columntype),
@@ -119,6 +214,7 @@ def convert_column(cr, tablename, columnname, columntype):
 
 def set_not_null(cr, tablename, columnname):
     """ Add a NOT NULL constraint on the given column. """
+    drop_schema_snapshot(cr, tablename)
     query = 'ALTER TABLE "{}" ALTER COLUMN "{}" SET NOT NULL'.format(tablename, columnname)
     try:
         with cr.savepoint(flush=False):
@@ -129,11 +225,15 @@ def set_not_null(cr, tablename, columnname):
 
 def drop_not_null(cr, tablename, columnname):
     """ Drop the NOT NULL constraint on the given column. """
+    drop_schema_snapshot(cr, tablename)
     cr.execute('ALTER TABLE "{}" ALTER COLUMN "{}" DROP NOT NULL'.format(tablename, columnname))
     _schema.debug("Table %r: column %r: dropped constraint NOT NULL", tablename, columnname)
 
 def constraint_definition(cr, tablename, constraintname):
     """ Return the given constraint's definition. """
+    found, _missing = _get_snapshots(cr, [tablename])
+    if found:
+        return found[tablename]['constraints'].get(constraintname)
     query = """
         SELECT COALESCE(d.description, pg_get_constraintdef(c.oid))
         FROM pg_constraint c
@@ -145,6 +245,7 @@ def constraint_definition(cr, tablename, constraintname):
 
 def add_constraint(cr, tablename, constraintname, definition):
     """ Add a constraint on the given table. """
+    drop_schema_snapshot(cr, tablename)
     query1 = 'ALTER TABLE "{}" ADD CONSTRAINT "{}" {}'.format(tablename, constraintname, definition)
     query2 = 'COMMENT ON CONSTRAINT "{}" ON "{}" IS %s'.format(constraintname, tablename)
     try:
@@ -157,6 +258,7 @@ def add_constraint(cr, tablename, constraintname, definition):
 
 def drop_constraint(cr, tablename, constraintname):
     """ drop the given constraint. """
+    drop_schema_snapshot(cr, tablename)
     try:
         with cr.savepoint(flush=False):
             cr.execute('ALTER TABLE "{}" DROP CONSTRAINT "{}"'.format(tablename, constraintname))
@@ -166,12 +268,41 @@ def drop_constraint(cr, tablename, constraintname):
 
 def add_foreign_key(cr, tablename1, columnname1, tablename2, columnname2, ondelete):
     """ Create the given foreign key, and return ``True``. """
+    drop_schema_snapshot(cr, tablename1)
     query = 'ALTER TABLE "{}" ADD FOREIGN KEY ("{}") REFERENCES "{}"("{}") ON DELETE {}'
     cr.execute(query.format(tablename1, columnname1, tablename2, columnname2, ondelete))
     _schema.debug("Table %r: added foreign key %r references %r(%r) ON DELETE %s",
                   tablename1, columnname1, tablename2, columnname2, ondelete)
     return True
 
+def existing_foreign_keys(cr, tablenames):
+    """ Return the single-column foreign keys of the given tables, as a dict
+        mapping ``(table, column)`` to ``(name, table2, column2, deltype)``.
+    """
+    found, tablenames = _get_snapshots(cr, tablenames)
+    result = {}
+    for snapshot in found.values():
+        result.update(snapshot['foreign_keys'])
+    if tablenames:
+        result.update(_fetch_foreign_keys(cr, tuple(tablenames)))
+    return result
+
+def _fetch_foreign_keys(cr, tablenames):
+    query = """
+        SELECT fk.conname, c1.relname, a1.attname, c2.relname, a2.attname, fk.confdeltype
+        FROM pg_constraint AS fk
+        JOIN pg_class AS c1 ON fk.conrelid = c1.oid
+        JOIN pg_class AS c2 ON fk.confrelid = c2.oid
+        JOIN pg_attribute AS a1 ON a1.attrelid = c1.oid AND fk.conkey[1] = a1.attnum
+        JOIN pg_attribute AS a2 ON a2.attrelid = c2.oid AND fk.confkey[1] = a2.attnum
+        WHERE fk.contype = 'f' AND c1.relname IN %s
+    """
+    cr.execute(query, [tablenames])
+    return {
+        (table1, column1): (name, table2, column2, deltype)
+        for name, table1, column1, table2, column2, deltype in cr.fetchall()
+    }
+
 def get_foreign_keys(cr, tablename1, columnname1, tablename2, columnname2, ondelete):
     cr.execute(
         """
@@ -215,6 +346,19 @@ def fix_foreign_key(cr, tablename1, columnname1, tablename2, columnname2, ondele
     if not found:
         return add_foreign_key(cr, tablename1, columnname1, tablename2, columnname2, ondelete)
 
+def existing_indexes(cr, tablenames):
+    """ Return a dict mapping the names of the indexes on the given tables to
+        their table.
+    """
+    found, tablenames = _get_snapshots(cr, tablenames)
+    result = {}
+    for snapshot in found.values():
+        result.update(snapshot['indexes'])
+    if tablenames:
+        cr.execute("SELECT indexname, tablename FROM pg_indexes WHERE tablename IN %s", [tuple(tablenames)])
+        result.update(cr.fetchall())
+    return result
+
 def index_exists(cr, indexname):
     """ Return whether the given index exists. """
     cr.execute("SELECT 1 FROM pg_indexes WHERE indexname=%s", (indexname,))
@@ -224,6 +368,7 @@ def create_index(cr, indexname, tablename, expressions):
     """ Create the given index unless it exists. """
     if index_exists(cr, indexname):
         return
+    drop_schema_snapshot(cr, tablename)
     args = ', '.join(expressions)
     cr.execute('CREATE INDEX "{}" ON "{}" ({})'.format(indexname, tablename, args))
     _schema.debug("Table %r: created index %r (%s)", tablename, indexname, args)
@@ -232,16 +377,19 @@ def create_unique_index(cr, indexname, tablename, expressions):
     """ Create the given index unless it exists. """
     if index_exists(cr, indexname):
         return
+    drop_schema_snapshot(cr, tablename)
     args = ', '.join(expressions)
     cr.execute('CREATE UNIQUE INDEX "{}" ON "{}" ({})'.format(indexname, tablename, args))
     _schema.debug("Table %r: created index %r (%s)", tablename, indexname, args)
 
 def drop_index(cr, indexname, tablename):
     """ Drop the given index if it exists. """
+    drop_schema_snapshot(cr, tablename)
     cr.execute('DROP INDEX IF EXISTS "{}"'.format(indexname))
     _schema.debug("Table %r: dropped index %r", tablename, indexname)
 
 def drop_view_if_exists(cr, viewname):
+    drop_schema_snapshot(cr, viewname)
     cr.execute("DROP view IF EXISTS %s CASCADE" % (viewname,))
 
 def escape_psql(to_escape):
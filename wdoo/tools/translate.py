@@ -455,6 +455,12 @@ class GettextAlias(object):
             frame = frame.f_back
             if not frame:
                 return source
+            # fast path for the most common case, a call in a method of a model
+            frame_locals = frame.f_locals
+            model = frame_locals.get('self')
+            if isinstance(model, wdoo.models.BaseModel) and model.env.lang and \
+                    not frame_locals.keys() & {'context', 'kwargs', 'cr', 'cursor'}:
+                return model.env['ir.translation']._get_source(None, ('code',), model.env.lang, source) or ''
             lang = self._get_lang(frame)
             if lang:
                 cr, is_new_cr = self._get_cr(frame)